@@ -1,15 +1,81 @@
+import uuid
+
 from rest_framework.throttling import AnonRateThrottle, SimpleRateThrottle, UserRateThrottle
 
+from utilities.cache_backend import CacheScript
+
+# Sliding window on a sorted set: trim, count, admit — one round trip.
+# Returns {allowed, requests in window, oldest timestamp in window}.
+_SLIDING_WINDOW_LUA = """
+local now = tonumber(ARGV[1])
+local duration = tonumber(ARGV[2])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - duration)
+local count = redis.call('ZCARD', KEYS[1])
+local oldest = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')[2] or ARGV[1]
+if count >= tonumber(ARGV[3]) then
+    return {0, count, oldest}
+end
+redis.call('ZADD', KEYS[1], now, ARGV[4])
+redis.call('EXPIRE', KEYS[1], math.ceil(duration))
+return {1, count + 1, oldest}
+"""
+
+
+def _sliding_window_local(backend, keys, args):
+    """DRF's own history-list algorithm, for LocMem / non-Redis caches."""
+    now, duration, limit = float(args[0]), float(args[1]), int(args[2])
+    history = [ts for ts in backend.get(keys[0], []) if ts > now - duration]  # newest first
+    oldest = history[-1] if history else now
+    if len(history) >= limit:
+        return [0, len(history), oldest]
+    backend.set(keys[0], [now, *history], duration)
+    return [1, len(history) + 1, oldest]
+
+
+SLIDING_WINDOW = CacheScript(_SLIDING_WINDOW_LUA, _sliding_window_local)
+
+
+class ScriptedThrottleMixin:
+    """
+    ``allow_request`` in one cache round trip instead of DRF's get + set:
+    the window is trimmed, counted and extended by ``SLIDING_WINDOW``.
+    """
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+        self.now = self.timer()
+        allowed, count, oldest = SLIDING_WINDOW(
+            # Own key: the sorted set must not collide with DRF's history lists.
+            [f"{self.key}:window"],
+            [self.now, self.duration, self.num_requests, f"{self.now}:{uuid.uuid4().hex[:8]}"],
+            backend=self.cache,
+        )
+        # ``wait()`` only reads len(history) and history[-1] (the oldest request).
+        self.history = [float(oldest)] * int(count)
+        return bool(allowed)
+
+
+class AnonThrottle(ScriptedThrottleMixin, AnonRateThrottle):
+    """Default per-IP throttle (``DEFAULT_THROTTLE_CLASSES``)."""
+
+
+class UserThrottle(ScriptedThrottleMixin, UserRateThrottle):
+    """Default per-user throttle (``DEFAULT_THROTTLE_CLASSES``)."""
+
 
-class SignupThrottle(AnonRateThrottle):
+class SignupThrottle(ScriptedThrottleMixin, AnonRateThrottle):
     scope = "signup"
 
 
-class LoginIPThrottle(AnonRateThrottle):
+class LoginIPThrottle(ScriptedThrottleMixin, AnonRateThrottle):
     scope = "login"  # per-IP
 
 
-class LoginUserThrottle(SimpleRateThrottle):
+class LoginUserThrottle(ScriptedThrottleMixin, SimpleRateThrottle):
     scope = "login_user"  # per-email (to slow attacks on a single account)
 
     def get_cache_key(self, request, view):
@@ -22,7 +88,7 @@ class LoginUserThrottle(SimpleRateThrottle):
 
 
 
-class VerifyOtpIPThrottle(AnonRateThrottle):
+class VerifyOtpIPThrottle(ScriptedThrottleMixin, AnonRateThrottle):
     """
     Per-IP throttle for OTP verification attempts.
     Rate configured by DEFAULT_THROTTLE_RATES['verify_otp'].
@@ -30,7 +96,7 @@ class VerifyOtpIPThrottle(AnonRateThrottle):
     scope = "verify_otp"
 
 
-class AiAskThrottle(UserRateThrottle):
+class AiAskThrottle(ScriptedThrottleMixin, UserRateThrottle):
     """Per-user throttle for Gemini-backed AI endpoints.
 
     Limits are intentionally low to protect API cost budget.
@@ -39,12 +105,12 @@ class AiAskThrottle(UserRateThrottle):
     scope = "ai_ask"
 
 
-class AiEndSessionThrottle(UserRateThrottle):
+class AiEndSessionThrottle(ScriptedThrottleMixin, UserRateThrottle):
     """Per-user throttle for the end-session endpoint."""
     scope = "ai_end_session"
 
 
-class VerifyOtpUserThrottle(SimpleRateThrottle):
+class VerifyOtpUserThrottle(ScriptedThrottleMixin, SimpleRateThrottle):
     """
     Per-email throttle for OTP verification attempts.
     Rate configured by DEFAULT_THROTTLE_RATES['verify_otp_user'].
@@ -7,6 +7,8 @@ from .models import (
     Category, UserDailyStat, UserPlanItem,
     BreathworkExercise, AmbientSound, SearchConfig,
 )
+from .logic.rollups import recompute_playlist_rates
+from utilities.cache_keys import bump_tags, content_tag
 from django.utils import timezone
 
 
@@ -21,6 +23,7 @@ class PlaylistAdmin(admin.ModelAdmin):
         "short_description",
         "impressions",
         "clicks",
+        "unique_viewers_7d",
         "ctr_percent",             # cached CTR
         "completion_percent",      # cached completions/starts
         "avg_watch_hms",
@@ -45,11 +48,12 @@ class PlaylistAdmin(admin.ModelAdmin):
         "created_at", "updated_at",
         # counters (keep read-only in admin; mutate via services/tasks)
         "impressions", "clicks", "starts", "completes",
+        "unique_viewers_7d", "unique_viewers_30d",
         "likes", "bookmarks", "shares",
         "total_watch_seconds", "avg_watch_seconds", "avg_progress_pct",
         "rating_count", "rating_sum",
         # cached rollups
-        "ctr", "completion_rate",
+        "ctr", "completion_rate", "bounce_rate",
         # derived quick-reads
         "average_rating_admin",
         "computed_ctr_admin",
@@ -75,6 +79,7 @@ class PlaylistAdmin(admin.ModelAdmin):
             "fields": (
                 ("impressions", "clicks"),
                 ("starts", "completes"),
+                ("unique_viewers_7d", "unique_viewers_30d"),
                 ("likes", "bookmarks", "shares"),
                 ("total_watch_seconds", "avg_watch_seconds", "avg_progress_pct"),
                 ("rating_count", "rating_sum"),
@@ -82,7 +87,7 @@ class PlaylistAdmin(admin.ModelAdmin):
         }),
         (_("Analytics – Rollups & Derived"), {
             "fields": (
-                ("ctr", "completion_rate"),
+                ("ctr", "completion_rate", "bounce_rate"),
                 ("average_rating_admin", "computed_ctr_admin", "computed_completion_rate_admin"),
             )
         }),
@@ -183,8 +188,11 @@ class PlaylistAdmin(admin.ModelAdmin):
 
     @admin.action(description=_("Recompute cached CTR/Completion from counters"))
     def recompute_rollups_action(self, request, queryset):
-        for obj in queryset:
-            obj.recompute_rollups()
+        summary = recompute_playlist_rates(queryset)
+        messages.success(
+            request,
+            _(f"Recomputed rates for {summary['playlists']} playlist(s) in {summary['ms']:.0f} ms."),
+        )
 
     @admin.action(description=_("Clear `breakdown` snapshot"))
     def reset_breakdown_action(self, request, queryset):
@@ -294,11 +302,13 @@ class VideoAdmin(admin.ModelAdmin):
     @admin.action(description=_("Publish selected now"))
     def publish_selected(self, request, queryset):
         updated = queryset.update(is_published=True, publish_at=timezone.now())
+        bump_tags(content_tag("video"))  # bulk update() sends no post_save
         messages.success(request, _(f"Published {updated} video(s)."))
 
     @admin.action(description=_("Unpublish selected"))
     def unpublish_selected(self, request, queryset):
         updated = queryset.update(is_published=False)
+        bump_tags(content_tag("video"))  # bulk update() sends no post_save
         messages.success(request, _(f"Unpublished {updated} video(s)."))
 
     actions = ["publish_selected", "unpublish_selected"]
@@ -394,11 +404,12 @@ class RecipeAdmin(admin.ModelAdmin):
 @admin.register(Deal)
 class DealAdmin(admin.ModelAdmin):
     list_display = ("item_name", "emoji", "category", "price", "original_price",
-                    "location", "is_active", "expires_at", "created_at")
+                    "discount_percent", "location", "is_active", "expires_at", "created_at")
     list_display_links = ("item_name",)
     list_editable = ("is_active",)
     list_filter = ("category", "is_active")
     search_fields = ("item_name", "description", "location")
+    readonly_fields = ("price_amount", "original_amount", "price_unit", "discount_percent")
     ordering = ("-created_at",)
 
 
@@ -430,7 +441,8 @@ class CategoryAdmin(admin.ModelAdmin):
     list_display = ("name", "icon_name", "color_swatch", "item_count",
                     "is_active", "order")
     list_display_links = ("name",)
-    list_editable = ("is_active", "order", "item_count")
+    list_editable = ("is_active", "order")
+    readonly_fields = ("item_count",)
     search_fields = ("name",)
     ordering = ("order", "name")
 
@@ -29,15 +29,18 @@ class ContentConfig(AppConfig):
                 return
             try:
                 from django.conf import settings
-                from django.core.cache import cache
+                from utilities.cache_compute import get_or_compute
+                from utilities.cache_keys import content_tag
+                from .logic.config import content_cfg
                 from .models import Category
                 from .serializers import CategoryReadSerializer
 
-                if cache.get(settings.CATEGORY_CACHE_KEY) is not None:
-                    return
+                def build():
+                    qs = Category.objects.filter(is_active=True).order_by("order", "name")
+                    return list(CategoryReadSerializer(qs, many=True).data)
 
-                qs = Category.objects.filter(is_active=True).order_by("order", "name")
-                items = list(CategoryReadSerializer(qs, many=True).data)
-                cache.set(settings.CATEGORY_CACHE_KEY, items, timeout=settings.CATEGORY_CACHE_TTL)
+                # A no-op when the entry is already cached.
+                get_or_compute(settings.CATEGORY_CACHE_KEY, build, settings.CATEGORY_CACHE_TTL,
+                               stale_ttl=content_cfg("CACHE_STALE_TTL"), tags=[content_tag("category")])
             except Exception:
                 pass
\ No newline at end of file
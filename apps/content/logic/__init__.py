@@ -0,0 +1,7 @@
+"""
+Content service layer.
+
+Hot-path helpers that the ``ContentViewSet``, model methods, admin actions
+and management commands share.  Each module owns one concern; tunables
+live in ``config.py``.
+"""
@@ -0,0 +1,235 @@
+"""
+In-memory autocomplete for the search box.
+
+Suggestions come from content titles (recipes, sessions, videos,
+playlists), recipe tags, video instructors and
+``SearchConfig.popular_searches``.  Each source is materialised as a
+compact list of ``(text, type, id, weight)`` tuples in the cache, tagged
+with that source's ``content:<resource>`` tag, so an edit only
+re-queries the one source it touched.
+
+Every worker keeps a ``SuggestIndex`` built from those lists:
+
+* a prefix trie keyed on every word start of every term (so "tik" finds
+  "Paneer Tikka" and "pro" finds the tag "high-protein"), where each node stores its top-K entries
+  pre-sorted by weight — a lookup is a walk of ``len(prefix)`` dicts;
+* a trigram map used as a fallback when the prefix matches nothing
+  (typos such as "panner").
+
+Workers re-check the tag generations at most every
+``AUTOCOMPLETE_CHECK_SECONDS`` and rebuild their index only when a
+generation moved; in between, ``/search/suggest`` never leaves the
+process.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+import unicodedata
+from collections import Counter
+
+from apps.content.models import Playlist, Recipe, SearchConfig, Session, Video
+from utilities.cache_compute import get_or_compute
+from utilities.cache_keys import autocomplete_source, content_tag, tag_generations
+from .config import content_cfg
+
+logger = logging.getLogger("content.autocomplete")
+
+_MAX_KEY_LEN = 24  # Deeper prefixes reuse this node and filter by substring
+
+
+def normalize(text: str) -> str:
+    """Lowercase, strip accents and collapse whitespace."""
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return " ".join(text.lower().split())
+
+
+def trigrams(text: str, partial: bool = False) -> set[str]:
+    """pg_trgm-style word trigrams; ``partial`` leaves the last word open-ended."""
+    grams = set()
+    words = text.split()
+    for n, word in enumerate(words):
+        tail = "" if partial and n == len(words) - 1 else " "
+        padded = f"  {word}{tail}"
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+# ── Sources ──────────────────────────────────────────────────────────
+
+def _recipes() -> list[tuple]:
+    entries, tags = [], set()
+    for pk, title, recipe_tags in Recipe.objects.filter(is_published=True).values_list("pk", "title", "tags"):
+        entries.append((title, "recipe", pk, 3))
+        tags.update(t for t in recipe_tags or () if isinstance(t, str) and t.strip())
+    return entries + [(tag, "tag", None, 2) for tag in sorted(tags)]
+
+
+def _sessions() -> list[tuple]:
+    return [
+        (title, "session", pk, 3)
+        for pk, title in Session.objects.filter(is_published=True).values_list("pk", "title")
+    ]
+
+
+def _videos() -> list[tuple]:
+    entries, instructors = [], set()
+    for pk, title, instructor in Video.objects.filter(is_published=True).values_list("pk", "title", "instructor"):
+        entries.append((title, "video", pk, 3))
+        if instructor and instructor.strip():
+            instructors.add(instructor.strip())
+    return entries + [(name, "instructor", None, 2) for name in sorted(instructors)]
+
+
+def _playlists() -> list[tuple]:
+    return [
+        (title, "playlist", pk, 3)
+        for pk, title in Playlist.objects.exclude(title__isnull=True).exclude(title="").values_list("pk", "title")
+    ]
+
+
+def _popular_searches() -> list[tuple]:
+    queries = []
+    for searches in SearchConfig.objects.filter(is_active=True).values_list("popular_searches", flat=True):
+        queries.extend(q for q in searches or () if isinstance(q, str) and q.strip())
+    return [(q, "query", None, 4) for q in dict.fromkeys(queries)]
+
+
+SOURCES = {
+    "recipe": _recipes,
+    "session": _sessions,
+    "video": _videos,
+    "playlist": _playlists,
+    "search_config": _popular_searches,
+}
+
+
+# ── Index ────────────────────────────────────────────────────────────
+
+class _Node:
+    __slots__ = ("children", "top")
+
+    def __init__(self):
+        self.children: dict[str, _Node] = {}
+        self.top: list[int] = []
+
+
+class SuggestIndex:
+    """Prefix trie with per-node top-K plus a trigram fallback."""
+
+    def __init__(self, entries, top_k: int | None = None):
+        top_k = top_k or content_cfg("AUTOCOMPLETE_LIMIT_MAX")
+        # Dedupe on (normalized text, type): two recipes with one title suggest once.
+        unique: dict[tuple[str, str], tuple] = {}
+        for text, kind, pk, weight in entries:
+            norm = normalize(text)
+            if norm and (norm, kind) not in unique:
+                unique[(norm, kind)] = (text, kind, pk, weight, norm)
+        self.entries = sorted(unique.values(), key=lambda e: (-e[3], e[4]))
+        self.root = _Node()
+        self.grams: dict[str, list[int]] = {}
+
+        for idx, (_, _, _, _, norm) in enumerate(self.entries):
+            starts = [0] + [i + 1 for i, ch in enumerate(norm) if ch in " -"]
+            for start in starts:
+                node = self.root
+                for ch in norm[start:start + _MAX_KEY_LEN]:
+                    node = node.children.setdefault(ch, _Node())
+                    if len(node.top) < top_k and (not node.top or node.top[-1] != idx):
+                        node.top.append(idx)
+            for gram in trigrams(norm):
+                self.grams.setdefault(gram, []).append(idx)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def suggest(self, prefix: str, limit: int = 10) -> list[dict]:
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        picked = self._prefix(prefix, limit)
+        if not picked and len(prefix) >= 3:
+            picked = self._fuzzy(prefix)[:limit]
+        return [
+            {"text": text, "type": kind, "id": pk}
+            for text, kind, pk, _, _ in (self.entries[i] for i in picked)
+        ]
+
+    def _prefix(self, prefix: str, limit: int) -> list[int]:
+        node = self.root
+        for ch in prefix[:_MAX_KEY_LEN]:
+            node = node.children.get(ch)
+            if node is None:
+                return []
+        if len(prefix) <= _MAX_KEY_LEN:
+            return node.top[:limit]
+        return [i for i in node.top if prefix in self.entries[i][4]][:limit]
+
+    def _fuzzy(self, prefix: str) -> list[int]:
+        wanted = trigrams(prefix, partial=True)
+        hits = Counter()
+        for gram in wanted:
+            hits.update(self.grams.get(gram, ()))
+        threshold = content_cfg("AUTOCOMPLETE_TRIGRAM_MIN") * len(wanted)
+        # Entries are stored best-first, so idx breaks score ties by weight.
+        return [idx for idx, n in sorted(hits.items(), key=lambda kv: (-kv[1], kv[0])) if n >= threshold]
+
+
+# ── Per-process cache ────────────────────────────────────────────────
+
+_lock = threading.Lock()
+_state = {"index": None, "generations": None, "checked": 0.0}
+
+
+class Autocomplete:
+    """Serve suggestions from this worker's index, refreshing it when content changes."""
+
+    @staticmethod
+    def source_entries(name: str) -> list[tuple]:
+        """Cached entry list for one source (rebuilt from the DB by one worker on a miss)."""
+        return get_or_compute(
+            autocomplete_source(name), SOURCES[name], content_cfg("AUTOCOMPLETE_SOURCE_TTL"),
+            stale_ttl=content_cfg("CACHE_STALE_TTL"), tags=[content_tag(name)],
+        )
+
+    @staticmethod
+    def index() -> SuggestIndex:
+        now = time.monotonic()
+        index = _state["index"]
+        if index is not None and now - _state["checked"] < content_cfg("AUTOCOMPLETE_CHECK_SECONDS"):
+            return index
+
+        with _lock:
+            if _state["index"] is not None and now - _state["checked"] < content_cfg("AUTOCOMPLETE_CHECK_SECONDS"):
+                return _state["index"]
+            # One small get_many of the tag counters; the entry lists are
+            # only fetched when one of them moved.
+            current = tag_generations([content_tag(name) for name in SOURCES])
+            if _state["index"] is None or current != _state["generations"]:
+                started = time.monotonic()
+                entries = []
+                for name in SOURCES:
+                    entries.extend(Autocomplete.source_entries(name))
+                _state["index"] = SuggestIndex(entries)
+                # Read before the fetch: a bump racing it triggers one more rebuild.
+                _state["generations"] = current
+                logger.info(
+                    "content.autocomplete action=rebuild entries=%d ms=%.1f",
+                    len(_state["index"]), (time.monotonic() - started) * 1000,
+                )
+            _state["checked"] = now
+            return _state["index"]
+
+    @staticmethod
+    def suggest(prefix: str, limit: int | None = None) -> list[dict]:
+        limit = max(1, min(limit or content_cfg("AUTOCOMPLETE_LIMIT"), content_cfg("AUTOCOMPLETE_LIMIT_MAX")))
+        return Autocomplete.index().suggest(prefix, limit)
+
+    @staticmethod
+    def reset() -> None:
+        """Drop this worker's index (tests, after settings changes)."""
+        with _lock:
+            _state.update(index=None, generations=None, checked=0.0)
@@ -0,0 +1,90 @@
+"""
+Centralized configuration for the content service layer.
+
+Every tunable parameter is sourced from Django settings (``CONTENT_CONFIG``)
+with sensible defaults so the system works out-of-the-box without any
+extra settings entry.
+
+Usage::
+
+    from apps.content.logic.config import content_cfg
+    interval = content_cfg("COUNTER_FLUSH_INTERVAL")
+"""
+
+from django.conf import settings
+
+_DEFAULTS = {
+    # ── Playlist counter write-behind buffer ─────────────────────────
+    "COUNTER_BUFFER_ENABLED": False,      # Opt-in: buffer inc_* calls instead of UPDATE per hit
+    "COUNTER_FLUSH_INTERVAL": 5,          # Seconds between flushes (command loop + local buffer)
+    "COUNTER_FLUSH_CHUNK": 1000,          # Playlists per UPDATE ... FROM (VALUES ...) statement
+    "COUNTER_SNAPSHOT_STALE": 300,        # Seconds before an unfinished flush snapshot is re-drained
+
+    # ── Analytics ingestion ──────────────────────────────────────────
+    "INGEST_MAX_EVENTS": 100_000,         # Events accepted per upload (rest rejected as over_limit)
+    "INGEST_MAX_BYTES": 16 * 1024 * 1024, # Hard cap on a streamed upload body
+
+    # ── Event log & rollups ──────────────────────────────────────────
+    "EVENT_LOG_ENABLED": True,            # Append ingested events to PlaylistEvent
+    "EVENT_LOG_BATCH": 5000,              # Rows per bulk INSERT
+    "EVENT_RETENTION_DAYS": 90,           # Days of raw events kept by --prune
+    "ROLLUP_BATCH": 50_000,               # Events folded per rollup transaction
+    "ROLLUP_SETTLE_SECONDS": 5,           # Non-PostgreSQL only: skip events younger than this (in-flight inserts)
+    "BOUNCE_SECONDS": 10,                 # Exit with less watch time than this = bounce
+    "ROLLUP_RECOMPUTE_CHUNK": 5000,       # Playlists per UPDATE in recompute_playlist_rollups
+
+    # ── Featured playlists ───────────────────────────────────────────
+    "FEATURED_SIZE": 20,                  # Playlists in the pre-rendered featured payload
+    "FEATURED_LOCK_WAIT": 2.0,            # Seconds a lock loser waits for the rebuild
+
+    # ── List caching ─────────────────────────────────────────────────
+    "LIST_FRAGMENT_TTL": 24 * 3600,       # Seconds a per-object serialized fragment is kept
+    "CACHE_STALE_TTL": 300,               # Seconds an expired entry is served while one worker rebuilds it
+    "STATIC_CONTENT_TTL": 6 * 3600,       # Seconds breathwork/ambient/search-config payloads are cached
+
+    # ── Facets ───────────────────────────────────────────────────────
+    "FACETS_TTL": 6 * 3600,               # Seconds facet counts are cached (tags invalidate sooner)
+
+    # ── Nutrition ────────────────────────────────────────────────────
+    "NUTRITION_BACKFILL_CHUNK": 2000,     # Recipes per bulk UPDATE in backfill_recipe_nutrition
+
+    # ── Search ───────────────────────────────────────────────────────
+    "SEARCH_CONFIG": "english",           # PostgreSQL text search configuration
+    "SEARCH_LIMIT": 50,                   # Max hits returned by /search
+    "SEARCH_REBUILD_CHUNK": 2000,         # Rows per bulk UPDATE in rebuild_search_index
+
+    # ── Autocomplete ─────────────────────────────────────────────────
+    "AUTOCOMPLETE_LIMIT": 8,              # Default suggestions per /search/suggest call
+    "AUTOCOMPLETE_LIMIT_MAX": 20,         # Cap on ?limit= (and top-K kept per trie node)
+    "AUTOCOMPLETE_TRIGRAM_MIN": 0.5,      # Share of prefix trigrams a fuzzy match must hit
+    "AUTOCOMPLETE_CHECK_SECONDS": 5,      # How often a worker re-checks source generations
+    "AUTOCOMPLETE_SOURCE_TTL": 24 * 3600, # Seconds a cached source entry list is kept
+
+    # ── Unique viewers ───────────────────────────────────────────────
+    "UNIQUE_VIEWERS_ENABLED": True,       # Per-day HyperLogLog of viewer ids per playlist
+    "UNIQUE_VIEWERS_LOCAL_MAX": 200_000,  # Viewer ids a process buffers while Redis is down
+
+    # ── Trending ─────────────────────────────────────────────────────
+    "TRENDING_ENABLED": True,             # Maintain Redis trending leaderboards
+    "TRENDING_HALF_LIFE_HOURS": 24,       # An event's weight halves every N hours
+    "TRENDING_GENERATION_HOURS": 168,     # Epoch roll-over period (bounds score growth)
+    "TRENDING_MAX_SIZE": 500,             # Members kept per leaderboard (top-K)
+    "TRENDING_WEIGHTS": {                 # Score contributed per event type
+        "impression": 0.1,
+        "click": 1.0,
+        "start": 2.0,
+        "complete": 4.0,
+    },
+}
+
+
+def content_cfg(key: str):
+    """
+    Return ``settings.CONTENT_CONFIG[key]`` if present,
+    otherwise fall back to the built-in default.
+    """
+    overrides = getattr(settings, "CONTENT_CONFIG", {})
+    try:
+        return overrides[key]
+    except KeyError:
+        return _DEFAULTS[key]
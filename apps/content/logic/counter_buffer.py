@@ -0,0 +1,289 @@
+"""
+Write-behind buffer for Playlist funnel counters.
+
+With ``COUNTER_BUFFER_ENABLED`` on, ``Playlist.inc_*`` and batch events
+stop issuing ``UPDATE playlist SET x = x + 1`` per hit.  Increments land in
+a single Redis hash (``HINCRBY``, fields ``"<pk>:<counter>"``) and the
+``flush_playlist_counters`` command applies everything pending in one
+set-based UPDATE per interval — a viral playlist no longer turns into a
+row-lock convoy.
+
+When ``FallbackCache`` is degraded the increments go to a per-process
+dict instead.  Because a separate flusher process cannot see that dict,
+each worker drains its own local buffer inline once it is older than
+``COUNTER_FLUSH_INTERVAL``.
+
+A flush renames the pending hash to a ``flushing:<started>-<id>``
+snapshot and deletes it only once the UPDATE has committed.  Live
+snapshots are listed in the ``playlist_counter_snapshots`` set, so
+``pending`` keeps counting them while the UPDATE runs, and snapshots left
+behind by a flusher that crashed (or whose UPDATE failed) are claimed and
+re-applied by the next flush: deltas are applied at least once rather
+than lost.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+import uuid
+from collections import defaultdict
+
+from django.db import transaction
+from django.utils import timezone
+
+from utilities.cache_backend import run_redis
+from utilities.cache_keys import (
+    playlist_counter_flushing, playlist_counter_pending, playlist_counter_snapshots,
+)
+from .config import content_cfg
+from .counters import COUNTER_FIELDS, apply_counter_deltas
+
+logger = logging.getLogger("content.counter_buffer")
+
+# ── Per-process fallback buffer ──────────────────────────────────────
+
+_local_lock = threading.Lock()
+_local: dict[tuple[int, str], int] = defaultdict(int)
+_local_started: float = 0.0
+
+
+def _field(pk: int, counter: str) -> str:
+    return f"{pk}:{counter}"
+
+
+def _parse(raw: dict) -> dict[int, dict[str, int]]:
+    """Turn a ``{"<pk>:<counter>": n}`` hash into ``{pk: {counter: n}}``."""
+    deltas: dict[int, dict[str, int]] = defaultdict(dict)
+    for key, value in raw.items():
+        key = key.decode() if isinstance(key, bytes) else key
+        pk, _, counter = key.partition(":")
+        if counter in COUNTER_FIELDS:
+            deltas[int(pk)][counter] = deltas[int(pk)].get(counter, 0) + int(value)
+    return deltas
+
+
+def _snapshot_started(key) -> int:
+    """Epoch second encoded in a ``flushing:<started>-<id>`` key (0 if unparseable)."""
+    key = key.decode() if isinstance(key, bytes) else key
+    started, _, _ = key.rpartition(":")[2].partition("-")
+    return int(started) if started.isdigit() else 0
+
+
+def _move_snapshot(client, src: str, dst: str) -> bool:
+    """
+    RENAME ``src`` to ``dst`` and swap it in the snapshot registry in one
+    MULTI; returns False when ``src`` no longer exists.
+    """
+    pipe = client.pipeline(transaction=True)
+    pipe.rename(src, dst)
+    pipe.srem(playlist_counter_snapshots(), src)
+    pipe.sadd(playlist_counter_snapshots(), dst)
+    if isinstance(pipe.execute(raise_on_error=False)[0], Exception):
+        client.srem(playlist_counter_snapshots(), dst)
+        return False
+    return True
+
+
+class PlaylistCounterBuffer:
+    """Buffered increments for ``Playlist.impressions/clicks/starts/completes``."""
+
+    @staticmethod
+    def enabled() -> bool:
+        return bool(content_cfg("COUNTER_BUFFER_ENABLED"))
+
+    # ----------------------------------------------------------------- write
+    @staticmethod
+    def incr(pk: int, counter: str, amount: int = 1) -> None:
+        """Buffer ``amount`` for one playlist counter."""
+        PlaylistCounterBuffer.incr_many({(pk, counter): amount})
+
+    @staticmethod
+    def incr_many(counts: dict[tuple[int, str], int]) -> None:
+        """Buffer many ``{(pk, counter): amount}`` increments in one pipeline."""
+        PlaylistCounterBuffer._buffer(counts)
+        PlaylistCounterBuffer._maybe_flush_local()
+
+    # ------------------------------------------------------------------ read
+    @staticmethod
+    def pending(pk: int) -> dict[str, int]:
+        """
+        Return not-yet-flushed deltas for one playlist: the pending hash,
+        any snapshot a flush is still applying, and the local buffer.
+        """
+        fields = [_field(pk, counter) for counter in COUNTER_FIELDS]
+
+        def _redis(client):
+            pipe = client.pipeline(transaction=False)
+            pipe.hmget(playlist_counter_pending(), fields)
+            pipe.smembers(playlist_counter_snapshots())
+            values, snapshots = pipe.execute()
+            rows = [values]
+            if snapshots:  # only while a flush is in progress
+                pipe = client.pipeline(transaction=False)
+                for key in snapshots:
+                    pipe.hmget(key, fields)
+                rows += pipe.execute()
+            return [sum(int(value or 0) for value in column) for column in zip(*rows)]
+
+        values = run_redis(_redis, lambda: [0] * len(fields))
+        result = dict(zip(COUNTER_FIELDS, values))
+        with _local_lock:
+            for counter in COUNTER_FIELDS:
+                result[counter] += _local.get((pk, counter), 0)
+        return result
+
+    @staticmethod
+    def overlay(obj) -> None:
+        """Add pending deltas onto a Playlist instance so reads look live."""
+        for counter, delta in PlaylistCounterBuffer.pending(obj.pk).items():
+            if delta:
+                setattr(obj, counter, (getattr(obj, counter) or 0) + delta)
+
+    # ----------------------------------------------------------------- flush
+    @staticmethod
+    def flush() -> int:
+        """
+        Apply every pending delta (Redis hash + this process's local buffer)
+        and return the number of playlist rows updated.
+
+        The Redis hash is atomically renamed to a snapshot before it is
+        read, so increments that arrive mid-flush start a fresh hash and are
+        picked up by the next interval.  The snapshot is deleted only after
+        the UPDATE commits; if the UPDATE fails it is marked for immediate
+        retry and the local deltas go back into the local buffer.
+        """
+        deltas, snapshots = PlaylistCounterBuffer._drain_redis()
+        local = PlaylistCounterBuffer._drain_local()
+        for (pk, counter), amount in local.items():
+            deltas[pk][counter] = deltas[pk].get(counter, 0) + amount
+        if not deltas:
+            PlaylistCounterBuffer._drop_snapshots(snapshots)
+            return 0
+
+        try:
+            updated = apply_counter_deltas(
+                deltas, timezone.now(), chunk_size=content_cfg("COUNTER_FLUSH_CHUNK"),
+            )
+        except Exception:
+            logger.exception("content.counter_buffer action=flush_failed playlists=%d", len(deltas))
+            PlaylistCounterBuffer._incr_local(local)
+            PlaylistCounterBuffer._release_snapshots(snapshots)
+            raise
+        transaction.on_commit(lambda: PlaylistCounterBuffer._drop_snapshots(snapshots))
+        return updated
+
+    # ─────────────────────────────────────────── internal housekeeping
+
+    @staticmethod
+    def _buffer(counts: dict[tuple[int, str], int]) -> None:
+        counts = {k: int(v) for k, v in counts.items() if v and k[1] in COUNTER_FIELDS}
+        if not counts:
+            return
+
+        def _redis(client):
+            pipe = client.pipeline(transaction=False)
+            for (pk, counter), amount in counts.items():
+                pipe.hincrby(playlist_counter_pending(), _field(pk, counter), amount)
+            pipe.execute()
+
+        run_redis(_redis, lambda: PlaylistCounterBuffer._incr_local(counts))
+
+    @staticmethod
+    def _drain_redis() -> tuple[dict[int, dict[str, int]], list[str]]:
+        """
+        Rename the pending hash to a fresh snapshot, claim any stale
+        snapshots an earlier flusher never deleted, and return the summed
+        deltas with the snapshot keys now owned by this flush.
+        """
+        token = f"{int(time.time())}-{uuid.uuid4().hex[:12]}"
+        stale_before = time.time() - content_cfg("COUNTER_SNAPSHOT_STALE")
+
+        def _redis(client):
+            owned = []
+            for key in client.smembers(playlist_counter_snapshots()):
+                key = key.decode() if isinstance(key, bytes) else key
+                if _snapshot_started(key) > stale_before:
+                    continue  # another flusher may still be applying it
+                claimed = playlist_counter_flushing(f"{token}.{len(owned)}")
+                if _move_snapshot(client, key, claimed):  # False: a concurrent flusher won it
+                    owned.append(claimed)
+            if owned:
+                logger.warning("content.counter_buffer action=redrain snapshots=%d", len(owned))
+            snapshot = playlist_counter_flushing(token)
+            if _move_snapshot(client, playlist_counter_pending(), snapshot):  # False: nothing buffered
+                owned.append(snapshot)
+            if not owned:
+                return [], []
+            pipe = client.pipeline(transaction=False)
+            for key in owned:
+                pipe.hgetall(key)
+            return owned, pipe.execute()
+
+        owned, raws = run_redis(_redis, lambda: ([], []))
+        deltas: dict[int, dict[str, int]] = defaultdict(dict)
+        for raw in raws:
+            for pk, fields in _parse(raw).items():
+                for counter, amount in fields.items():
+                    deltas[pk][counter] = deltas[pk].get(counter, 0) + amount
+        return deltas, owned
+
+    @staticmethod
+    def _drop_snapshots(snapshots: list[str]) -> None:
+        if not snapshots:
+            return
+
+        def _redis(client):
+            pipe = client.pipeline(transaction=True)
+            pipe.delete(*snapshots)
+            pipe.srem(playlist_counter_snapshots(), *snapshots)
+            pipe.execute()
+
+        run_redis(_redis, lambda: None)
+
+    @staticmethod
+    def _release_snapshots(snapshots: list[str]) -> None:
+        """Re-stamp failed snapshots as epoch 0 so the next flush retries them at once."""
+        if not snapshots:
+            return
+
+        def _redis(client):
+            for key in snapshots:
+                retry = playlist_counter_flushing(f"0-{key.rpartition(':')[2].partition('-')[2]}")
+                _move_snapshot(client, key, retry)
+
+        run_redis(_redis, lambda: None)
+
+    @staticmethod
+    def _incr_local(counts: dict[tuple[int, str], int]) -> None:
+        global _local_started  # noqa: PLW0603
+        with _local_lock:
+            if not _local:
+                _local_started = time.monotonic()
+            for key, amount in counts.items():
+                _local[key] += amount
+
+    @staticmethod
+    def _drain_local() -> dict[tuple[int, str], int]:
+        with _local_lock:
+            drained = dict(_local)
+            _local.clear()
+        return drained
+
+    @staticmethod
+    def _maybe_flush_local() -> None:
+        """Inline flush of the local buffer once it is older than the interval."""
+        with _local_lock:
+            due = _local and (time.monotonic() - _local_started) >= content_cfg("COUNTER_FLUSH_INTERVAL")
+        if not due:
+            return
+        drained = PlaylistCounterBuffer._drain_local()
+        deltas: dict[int, dict[str, int]] = defaultdict(dict)
+        for (pk, counter), amount in drained.items():
+            deltas[pk][counter] = amount
+        try:
+            apply_counter_deltas(deltas, timezone.now(), chunk_size=content_cfg("COUNTER_FLUSH_CHUNK"))
+        except Exception:
+            logger.exception("content.counter_buffer action=local_flush_failed")
+            PlaylistCounterBuffer._incr_local(drained)
@@ -0,0 +1,123 @@
+"""
+Set-based application of Playlist counter deltas.
+
+Every path that bumps funnel counters in bulk (the write-behind flusher,
+batch event ingestion) funnels through ``apply_counter_deltas`` so a batch
+touching N playlists costs one ``UPDATE ... FROM (VALUES ...)`` statement
+per chunk instead of N single-row UPDATEs.
+
+The statement is portable: PostgreSQL and SQLite (>= 3.33) both support
+``UPDATE ... FROM`` and name anonymous ``VALUES`` columns ``column1..N``.
+"""
+
+from __future__ import annotations
+
+import logging
+
+from django.db import connection, transaction
+
+from apps.content.models import Playlist
+
+logger = logging.getLogger("content.counters")
+
+# Event type (as sent by clients) → counter column.
+EVENT_COUNTERS = {
+    "impression": "impressions",
+    "click": "clicks",
+    "start": "starts",
+    "complete": "completes",
+}
+
+COUNTER_FIELDS = tuple(EVENT_COUNTERS.values())
+
+# Counter → "last activity" timestamps stamped when the counter moves.
+COUNTER_TIMESTAMPS = {
+    "impressions": ("last_impressed_at",),
+    "clicks": ("last_clicked_at",),
+    "starts": ("last_started_at", "last_interaction_at"),
+    "completes": ("last_completed_at", "last_interaction_at"),
+}
+
+
+def _cast(placeholder: str, field) -> str:
+    """Type a VALUES placeholder on PostgreSQL; SQLite relies on column affinity."""
+    if connection.vendor == "postgresql":
+        return f"CAST({placeholder} AS {field.db_type(connection)})"
+    return placeholder
+
+
+def _build_update_sql(row_count: int) -> str:
+    qn = connection.ops.quote_name
+    opts = Playlist._meta
+    counter_cols = [opts.get_field(f) for f in COUNTER_FIELDS]
+
+    # VALUES layout: column1 = pk, column2.. = one delta per counter.
+    first_row = ", ".join(
+        [_cast("%s", opts.pk)] + [_cast("%s", f) for f in counter_cols],
+    )
+    plain_row = ", ".join(["%s"] * (1 + len(counter_cols)))
+    rows = ", ".join([f"({first_row})"] + [f"({plain_row})"] * (row_count - 1))
+
+    # Each timestamp is stamped if *any* of the counters that own it moved.
+    stamp_sources: dict[str, list[str]] = {}
+    for idx, name in enumerate(COUNTER_FIELDS, start=2):
+        for ts in COUNTER_TIMESTAMPS[name]:
+            stamp_sources.setdefault(ts, []).append(f"v.column{idx} > 0")
+
+    ts_placeholder = _cast("%s", opts.get_field("last_interaction_at"))
+    assignments = [
+        f"{qn(f.column)} = p.{qn(f.column)} + v.column{idx}"
+        for idx, f in enumerate(counter_cols, start=2)
+    ]
+    assignments += [
+        f"{qn(opts.get_field(ts).column)} = CASE WHEN {' OR '.join(conds)} "
+        f"THEN {ts_placeholder} ELSE p.{qn(opts.get_field(ts).column)} END"
+        for ts, conds in stamp_sources.items()
+    ]
+
+    return (
+        f"UPDATE {qn(opts.db_table)} AS p SET {', '.join(assignments)} "
+        f"FROM (VALUES {rows}) AS v "
+        f"WHERE p.{qn(opts.pk.column)} = v.column1"
+    )
+
+
+def apply_counter_deltas(
+    deltas: dict[int, dict[str, int]],
+    when,
+    chunk_size: int = 1000,
+) -> int:
+    """
+    Add ``deltas`` (``{playlist_pk: {"impressions": n, ...}}``) to the
+    Playlist counters and stamp the matching ``last_*_at`` columns with
+    ``when``.
+
+    Unknown playlist PKs are ignored by the join.  Returns the number of
+    playlist rows updated.
+    """
+    rows = []
+    for pk, fields in deltas.items():
+        row = [int(fields.get(name, 0)) for name in COUNTER_FIELDS]
+        if any(row):
+            rows.append([int(pk), *row])
+    if not rows:
+        return 0
+
+    stamp = connection.ops.adapt_datetimefield_value(when)
+    stamp_count = len({ts for names in COUNTER_TIMESTAMPS.values() for ts in names})
+
+    updated = 0
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            for start in range(0, len(rows), chunk_size):
+                chunk = rows[start:start + chunk_size]
+                # SET placeholders (timestamps) precede the VALUES rows.
+                params = [stamp] * stamp_count
+                params += [value for row in chunk for value in row]
+                cursor.execute(_build_update_sql(len(chunk)), params)
+                updated += cursor.rowcount
+
+    logger.info(
+        "content.counters action=apply playlists=%d updated=%d", len(rows), updated,
+    )
+    return updated
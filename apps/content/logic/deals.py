@@ -0,0 +1,81 @@
+"""
+Deal pricing and expiry.
+
+``Deal.price`` / ``original_price`` stay free-form display strings
+("₹20/bunch", "Rs 1,200 per kg").  On save ``apply_pricing`` parses them
+into ``price_amount``, ``original_amount``, ``price_unit`` and
+``discount_percent`` so the list serializer never re-parses and
+``?sort=discount`` is an index scan.
+
+Active deals are ``is_active`` rows whose ``expires_at`` is unset or in
+the future (``active_q``).  PostgreSQL cannot put ``now()`` in an index
+predicate, so the partial indexes cover ``is_active = true`` and
+``sweep_expired`` (``manage.py deactivate_expired_deals``) keeps that
+set free of expired rows with one bulk UPDATE.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.content.models import Deal
+from utilities.cache_keys import bump_tags, content_tag
+
+logger = logging.getLogger("content.deals")
+
+_AMOUNT = re.compile(r"\d+(?:,\d{3})*(?:\.\d+)?|\.\d+")
+_UNIT = re.compile(r"(?:/|\bper\b)\s*([^\d\s/][^/]*)$", re.IGNORECASE)
+_CENT = Decimal("0.01")
+_AMOUNT_LIMIT = Decimal(10) ** 8  # DecimalField(max_digits=10, decimal_places=2)
+
+
+def parse_price(text: str) -> tuple[Decimal | None, str]:
+    """
+    ``"₹20/bunch"`` → ``(Decimal("20.00"), "bunch")``; ``(None, "")`` when
+    there is no number or it does not fit the two-place amount columns.
+    """
+    text = (text or "").strip()
+    match = _AMOUNT.search(text)
+    if not match:
+        return None, ""
+    try:
+        amount = Decimal(match.group().replace(",", "")).quantize(_CENT, rounding=ROUND_HALF_UP)
+    except InvalidOperation:
+        return None, ""
+    if amount >= _AMOUNT_LIMIT:
+        return None, ""  # would not fit price_amount / original_amount
+    unit = _UNIT.search(text[match.end():])
+    return amount, (unit.group(1).strip().lower()[:32] if unit else "")
+
+
+def discount_percent(price: Decimal | None, original: Decimal | None) -> int | None:
+    """Whole-percent saving of ``price`` against ``original`` (truncated, like the old display)."""
+    if price is None or not original or price > original:
+        return None
+    return int((original - price) * 100 / original)
+
+
+def apply_pricing(deal) -> None:
+    deal.price_amount, deal.price_unit = parse_price(deal.price)
+    deal.original_amount, _ = parse_price(deal.original_price)
+    deal.discount_percent = discount_percent(deal.price_amount, deal.original_amount)
+
+
+def active_q(now=None) -> Q:
+    now = now or timezone.now()
+    return Q(is_active=True) & (Q(expires_at__isnull=True) | Q(expires_at__gt=now))
+
+
+def sweep_expired(now=None) -> int:
+    """Deactivate every active deal past ``expires_at``; returns rows changed."""
+    now = now or timezone.now()
+    swept = Deal.objects.filter(is_active=True, expires_at__lte=now).update(is_active=False, updated_at=now)
+    if swept:
+        bump_tags(content_tag("deal"))  # bulk update() sends no post_save
+    logger.info("content.deals action=sweep deactivated=%d", swept)
+    return swept
@@ -0,0 +1,107 @@
+"""
+Append-only Playlist analytics event log.
+
+Ingestion writes raw events with batched multi-row INSERTs; nothing ever
+updates a row.  ``day`` is the partition key: retention drops whole days
+(only ones the rollup job has already folded in), and the rollup engine
+reads strictly by ``id`` past its high-water mark, so both stay
+O(affected rows) however large the table grows.
+
+On PostgreSQL every writer holds the ``_WRITE_FENCE`` advisory lock in
+shared mode until its transaction ends.  ``committed_high_water`` takes
+it exclusively for the length of one ``MAX(id)`` read, so it waits out
+every insert that already holds an id and the mark it returns can never
+have an uncommitted row below it.
+"""
+
+from __future__ import annotations
+
+import logging
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from apps.content.models import PlaylistEvent, RollupCursor
+from .config import content_cfg
+
+logger = logging.getLogger("content.events")
+
+ROLLUP_CURSOR = "playlist_events"
+
+# pg advisory lock key ("plev") shared by event-log writers, taken exclusively by the rollup.
+_WRITE_FENCE = 0x706C6576
+
+# Event types the log accepts; ``exit`` feeds bounce/progress but moves no counter.
+LOGGED_EVENT_TYPES = tuple(PlaylistEvent.EventType.values)
+
+
+class PlaylistEventLog:
+    """Batched writer and retention for ``PlaylistEvent``."""
+
+    @staticmethod
+    def enabled() -> bool:
+        return bool(content_cfg("EVENT_LOG_ENABLED"))
+
+    @staticmethod
+    def append(rows, *, user_id: int | None = None, when=None) -> int:
+        """
+        Insert ``rows`` of ``(playlist_id, event_type, watch_seconds,
+        progress_pct, device, language)`` in ``EVENT_LOG_BATCH``-sized
+        INSERTs.  Returns the number of events written.
+        """
+        when = when or timezone.now()
+        day = when.date()
+        objs = [
+            PlaylistEvent(
+                day=day, occurred_at=when, user_id=user_id,
+                playlist_id=pid, event_type=etype,
+                watch_seconds=watch, progress_pct=progress,
+                device=device, language=language,
+            )
+            for pid, etype, watch, progress, device, language in rows
+        ]
+        if objs:
+            with transaction.atomic():
+                if connection.vendor == "postgresql":
+                    with connection.cursor() as cursor:
+                        cursor.execute("SELECT pg_advisory_xact_lock_shared(%s)", [_WRITE_FENCE])
+                PlaylistEvent.objects.bulk_create(objs, batch_size=content_cfg("EVENT_LOG_BATCH"))
+        logger.info("content.events action=append rows=%d", len(objs))
+        return len(objs)
+
+    @staticmethod
+    def committed_high_water() -> int | None:
+        """
+        Highest event id with no in-flight insert below it (PostgreSQL), or
+        ``None`` when the backend has no write fence and callers must fall
+        back to the ``ROLLUP_SETTLE_SECONDS`` age cut-off.
+
+        Relies on READ COMMITTED: the ``MAX(id)`` statement takes its
+        snapshot after the fence is acquired.
+        """
+        if connection.vendor != "postgresql":
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_lock(%s)", [_WRITE_FENCE])
+            try:
+                return PlaylistEvent.objects.aggregate(m=Max("id"))["m"] or 0
+            finally:
+                cursor.execute("SELECT pg_advisory_unlock(%s)", [_WRITE_FENCE])
+
+    @staticmethod
+    def prune(retention_days: int | None = None) -> int:
+        """
+        Drop whole days older than the retention window — but never events
+        the rollup job has not consumed yet.  Returns rows deleted.
+        """
+        days = retention_days if retention_days is not None else content_cfg("EVENT_RETENTION_DAYS")
+        before = timezone.now().date() - timedelta(days=days)
+        last_id = (
+            RollupCursor.objects.filter(name=ROLLUP_CURSOR)
+            .values_list("last_id", flat=True).first()
+        ) or 0
+        deleted, _ = PlaylistEvent.objects.filter(day__lt=before, id__lte=last_id).delete()
+        logger.info("content.events action=prune before=%s deleted=%d", before, deleted)
+        return deleted
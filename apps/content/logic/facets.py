@@ -0,0 +1,119 @@
+"""
+Facet counts for the filter chips, and ``Category.item_count`` upkeep.
+
+``Facets.get()`` returns, for published content only::
+
+    {"recipe":  {"meal_type": {...}, "diet_tag": {...}},
+     "session": {"category": {...}, "difficulty": {...}},
+     "video":   {"content_genre": {...}, "language": {...}}}
+
+Each model costs one ``GROUP BY`` over all of its facet fields; the
+per-field counts are folded from those rows in Python.  The result is
+cached (via ``get_or_compute``) under the ``content:<type>`` tags, so it
+stays valid until an edit bumps one of them.
+
+A category's items are the published sessions whose ``category``
+matches its name (case-insensitively).  ``CategoryCounts.apply`` moves
+``item_count`` by ±1 when a session is published, unpublished,
+re-categorised or deleted; ``CategoryCounts.reconcile`` (run by
+``manage.py reconcile_category_counts``) recomputes every count with one
+GROUP BY to repair drift from bulk ``update()`` calls.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections import Counter
+
+from django.db.models import Count, F, Value
+from django.db.models.functions import Greatest, Lower
+
+from apps.content.models import Category, Recipe, Session, Video
+from utilities.cache_compute import get_or_compute
+from utilities.cache_keys import bump_tags, content_tag, facet_counts
+from .config import content_cfg
+
+logger = logging.getLogger("content.facets")
+
+FACETS = {
+    "recipe": (Recipe, ("meal_type", "diet_tag")),
+    "session": (Session, ("category", "difficulty")),
+    "video": (Video, ("content_genre", "language")),
+}
+
+
+class Facets:
+    """Cached per-field value counts for published content."""
+
+    @staticmethod
+    def compute(name: str) -> dict[str, dict[str, int]]:
+        model, fields = FACETS[name]
+        counts = {field: Counter() for field in fields}
+        rows = (
+            model.objects.filter(is_published=True)
+            .values(*fields).annotate(n=Count("pk")).order_by()
+        )
+        for row in rows:
+            for field in fields:
+                if row[field] not in (None, ""):
+                    counts[field][row[field]] += row["n"]
+        return {field: dict(sorted(c.items())) for field, c in counts.items()}
+
+    @staticmethod
+    def get(names=None) -> dict[str, dict[str, dict[str, int]]]:
+        result = {}
+        for name in names or FACETS:
+            result[name] = get_or_compute(
+                facet_counts(name), lambda: Facets.compute(name), content_cfg("FACETS_TTL"),
+                stale_ttl=content_cfg("CACHE_STALE_TTL"), tags=[content_tag(name)],
+            )
+        return result
+
+
+def _contributes(state) -> str | None:
+    """Lower-cased category name a session state counts towards, if any."""
+    if not state or not state.get("is_published") or not state.get("category"):
+        return None
+    return state["category"].lower()
+
+
+class CategoryCounts:
+    """Incremental and full maintenance of ``Category.item_count``."""
+
+    @staticmethod
+    def snapshot(session) -> dict:
+        return {"category": session.category, "is_published": session.is_published}
+
+    @staticmethod
+    def apply(old_state, new_state) -> None:
+        """Move ``item_count`` for a session going from ``old_state`` to ``new_state``."""
+        old, new = _contributes(old_state), _contributes(new_state)
+        if old == new:
+            return
+        categories = Category.objects.annotate(key=Lower("name"))
+        if old:
+            categories.filter(key=old).update(item_count=Greatest(F("item_count") - 1, Value(0)))
+        if new:
+            categories.filter(key=new).update(item_count=F("item_count") + 1)
+        bump_tags(content_tag("category"))
+
+    @staticmethod
+    def reconcile() -> int:
+        """Recompute every ``item_count`` from scratch; returns categories corrected."""
+        actual = dict(
+            Session.objects.filter(is_published=True)
+            .annotate(key=Lower("category")).values("key")
+            .annotate(n=Count("pk")).order_by()
+            .values_list("key", "n")
+        )
+        stale = []
+        for category in Category.objects.only("name", "item_count"):
+            count = actual.get(category.name.lower(), 0)
+            if category.item_count != count:
+                category.item_count = count
+                stale.append(category)
+        Category.objects.bulk_update(stale, ["item_count"])
+        if stale:
+            bump_tags(content_tag("category"))
+        logger.info("content.facets action=reconcile corrected=%d", len(stale))
+        return len(stale)
@@ -0,0 +1,89 @@
+"""
+Featured-playlist builder.
+
+Ranks playlists (trending leaderboard first, all-time ``(impressions,
+ctr)`` order to fill up), serializes them once and caches the encoded
+JSON together with its ETag and Last-Modified under
+``settings.FEATURED_KEY``.  The body is stored as text because the Redis
+cache uses django-redis's ``JSONSerializer``, which cannot hold bytes.
+The endpoint then serves a cache read, an ``If-None-Match`` string
+compare and the stored body — no per-hit serialization, ``json.dumps``
+or hashing.
+
+Built by ``manage.py build_featured_playlists`` (cron) and on demand
+through ``get_or_compute``: one worker rebuilds a missing or expiring
+entry while the others wait for it (or keep serving the stale copy), so
+misses never stampede the database.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import time
+
+from django.conf import settings
+from django.utils.http import http_date
+from rest_framework.renderers import JSONRenderer
+
+from apps.content.models import Playlist
+from apps.content.serializers import PlaylistReadSerializer
+from utilities.cache_compute import get_or_compute, refresh
+from .config import content_cfg
+from .trending import PlaylistTrending
+
+logger = logging.getLogger("content.featured")
+
+class FeaturedPlaylists:
+    """Build, store and fetch the pre-rendered featured payload."""
+
+    @staticmethod
+    def rank(limit: int) -> list[Playlist]:
+        """Top ``limit`` playlists: trending first, topped up by all-time popularity."""
+        ranked = PlaylistTrending.page(limit=limit)
+        ids = ranked[0] if ranked else []
+        rows = Playlist.objects.in_bulk(ids)
+        playlists = [rows[pk] for pk in ids if pk in rows]
+        if len(playlists) < limit:
+            playlists += list(
+                Playlist.objects.exclude(pk__in=[p.pk for p in playlists])
+                .order_by("-impressions", "-ctr")[: limit - len(playlists)],
+            )
+        return playlists
+
+    @staticmethod
+    def build() -> dict:
+        """Rank + serialize + encode once; return the cache entry (not stored)."""
+        playlists = FeaturedPlaylists.rank(content_cfg("FEATURED_SIZE"))
+        items = PlaylistReadSerializer(playlists, many=True).data
+        body = JSONRenderer().render({"items": items, "count": len(items)})
+        return {
+            "body": body.decode(),
+            "etag": f'W/"{hashlib.md5(body).hexdigest()}"',
+            "last_modified": http_date(time.time()),
+            "count": len(items),
+        }
+
+    @staticmethod
+    def _logged_build() -> dict:
+        started = time.monotonic()
+        entry = FeaturedPlaylists.build()
+        logger.info(
+            "content.featured action=rebuild items=%d bytes=%d ms=%.1f",
+            entry["count"], len(entry["body"].encode()), (time.monotonic() - started) * 1000,
+        )
+        return entry
+
+    @staticmethod
+    def rebuild() -> dict:
+        """Build and store the entry under ``settings.FEATURED_KEY``."""
+        return refresh(settings.FEATURED_KEY, FeaturedPlaylists._logged_build, settings.FEATURED_TTL,
+                       stale_ttl=content_cfg("CACHE_STALE_TTL"))
+
+    @staticmethod
+    def get() -> dict:
+        """Return the cached entry, built by one worker on a miss (see ``get_or_compute``)."""
+        return get_or_compute(
+            settings.FEATURED_KEY, FeaturedPlaylists._logged_build, settings.FEATURED_TTL,
+            stale_ttl=content_cfg("CACHE_STALE_TTL"), lock_wait=content_cfg("FEATURED_LOCK_WAIT"),
+        )
@@ -0,0 +1,331 @@
+"""
+High-volume playlist analytics ingestion.
+
+The mobile SDK uploads one batch per app session — tens of thousands of
+``impression/click/start/complete`` events.  The body is parsed
+incrementally (NDJSON line by line, or a JSON array element by element)
+so it is never held in memory as a whole, events are folded into one
+delta row per playlist, and the batch lands in the DB as a single
+set-based UPDATE (or in the write-behind buffer when that is enabled).
+
+Accepted event shapes (NDJSON line or array element)::
+
+    {"id": 12, "type": "click"}
+    {"id": 12, "type": "exit", "watch_seconds": 7, "progress": 4, "device": "ios", "language": "en"}
+    [12, "click"]
+
+Accepted events are also appended to the ``PlaylistEvent`` log (with the
+optional watch/progress/dimension fields) for the rollup job.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.utils import timezone
+
+from apps.content.models import Playlist
+from .config import content_cfg
+from .counter_buffer import PlaylistCounterBuffer
+from .counters import EVENT_COUNTERS, apply_counter_deltas
+from .events import LOGGED_EVENT_TYPES, PlaylistEventLog
+from .trending import PlaylistTrending
+from .unique_viewers import PlaylistUniqueViewers
+
+logger = logging.getLogger("content.ingest")
+
+_READ_SIZE = 64 * 1024
+_DIM_MAX_LENGTH = 16
+_PK_MAX = 2**63 - 1             # Playlist.id is a BigAutoField
+_WATCH_SECONDS_MAX = 2**31 - 1  # PlaylistEvent.watch_seconds is a PositiveIntegerField
+
+
+class IngestError(ValueError):
+    """Raised when the upload body is structurally unusable (not per-event errors)."""
+
+
+# ── Incremental body readers ─────────────────────────────────────────
+
+def _chunks(stream, max_bytes: int):
+    read = 0
+    while True:
+        chunk = stream.read(_READ_SIZE)
+        if not chunk:
+            return
+        read += len(chunk)
+        if read > max_bytes:
+            msg = f"Body exceeds {max_bytes} bytes"
+            raise IngestError(msg)
+        yield chunk
+
+
+def iter_ndjson(stream, max_bytes: int):
+    """Yield one decoded value per non-blank line; undecodable lines yield ``None``."""
+    tail = b""
+    for chunk in _chunks(stream, max_bytes):
+        lines = (tail + chunk).split(b"\n")
+        tail = lines.pop()
+        for line in lines:
+            if line.strip():
+                yield _loads(line)
+    if tail.strip():
+        yield _loads(tail)
+
+
+def _seek_events(buf: str, decoder: json.JSONDecoder) -> tuple[str, bool]:
+    """
+    Consume ``"key": value`` pairs from the head of an object body until the
+    top-level ``"events"`` key.  Returns ``(rest, found)``: when found, ``rest``
+    starts at the events value; otherwise it is the unconsumed remainder and
+    the caller should append the next chunk and retry.
+    """
+    while True:
+        buf = buf.lstrip(" \t\r\n,")
+        if not buf:
+            return buf, False
+        if buf[0] == "}":
+            msg = 'Expected an "events" array'
+            raise IngestError(msg)
+        try:
+            key, end = decoder.raw_decode(buf)
+        except json.JSONDecodeError:
+            if len(buf) > 2 * _READ_SIZE:
+                msg = "Malformed JSON object key"
+                raise IngestError(msg) from None
+            return buf, False
+        if not isinstance(key, str):
+            msg = "Malformed JSON object key"
+            raise IngestError(msg)
+        rest = buf[end:].lstrip()
+        if not rest:
+            return buf, False
+        if rest[0] != ":":
+            msg = "Malformed JSON object"
+            raise IngestError(msg)
+        rest = rest[1:].lstrip()
+        if not rest:
+            return buf, False
+        if key == "events":
+            return rest, True
+        try:
+            _, end = decoder.raw_decode(rest)
+        except json.JSONDecodeError:
+            if len(rest) > 2 * _READ_SIZE:
+                msg = "Malformed JSON object value"
+                raise IngestError(msg) from None
+            return buf, False
+        if not rest[end:].strip():
+            return buf, False  # a number may continue in the next chunk
+        buf = rest[end:]
+
+
+def iter_json_array(stream, max_bytes: int):
+    """
+    Yield the elements of a top-level JSON array (``[...]`` or
+    ``{"events": [...]}``) one at a time using ``raw_decode`` on a sliding
+    buffer, so only the unparsed remainder is ever held in memory.  Other
+    keys before ``"events"`` are decoded and skipped.
+    """
+    decoder = json.JSONDecoder()
+    buf = ""
+    started = False
+    in_object = False
+    closed = False
+    pending = b""
+    for chunk in _chunks(stream, max_bytes):
+        if closed:
+            continue  # keys after "events" are ignored; still bounded by max_bytes
+        # Keep incomplete UTF-8 sequences for the next chunk.
+        data = pending + chunk
+        try:
+            text = data.decode("utf-8")
+            pending = b""
+        except UnicodeDecodeError as exc:
+            text = data[:exc.start].decode("utf-8")
+            pending = data[exc.start:]
+        buf += text
+
+        if not started:
+            if not in_object:
+                buf = buf.lstrip()
+                if buf.startswith("{"):
+                    in_object = True
+                    buf = buf[1:]
+            if in_object:
+                buf, found = _seek_events(buf, decoder)
+                if not found:
+                    continue
+            if not buf:
+                continue
+            if not buf.startswith("["):
+                msg = "Expected a JSON array of events"
+                raise IngestError(msg)
+            buf = buf[1:]
+            started = True
+
+        while True:
+            buf = buf.lstrip(" \t\r\n,")
+            if not buf:
+                break
+            if buf[0] in "]}":
+                closed = True
+                break
+            try:
+                value, end = decoder.raw_decode(buf)
+            except json.JSONDecodeError:
+                if len(buf) > 2 * _READ_SIZE:
+                    msg = "Malformed JSON array element"
+                    raise IngestError(msg) from None
+                break  # element continues in the next chunk
+            yield value
+            buf = buf[end:]
+
+    if not started:
+        if in_object:
+            msg = 'Expected an "events" array'
+            raise IngestError(msg)
+        return
+    if in_object and closed:
+        return
+    if buf.strip(" \t\r\n,]}"):
+        yield None  # trailing garbage / truncated element
+
+
+def _loads(raw: bytes):
+    try:
+        return json.loads(raw)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+# ── Folding ──────────────────────────────────────────────────────────
+
+class EventBatch:
+    """
+    Folds raw events into ``{playlist_pk: {counter: n}}`` and tracks
+    accepted / rejected counts per event type.
+    """
+
+    def __init__(self, max_events: int | None = None, user_id: int | None = None):
+        self.max_events = max_events or content_cfg("INGEST_MAX_EVENTS")
+        self.user_id = user_id
+        self.seen = 0
+        self.counts: dict[int, Counter] = defaultdict(Counter)
+        self.rejected: Counter = Counter()
+        self.applied_pairs = 0  # distinct (playlist, type) pairs applied by commit()
+        self.log_rows: list[tuple] | None = [] if PlaylistEventLog.enabled() else None
+
+    def add(self, event) -> None:
+        self.seen += 1
+        if self.seen > self.max_events:
+            self.rejected["over_limit"] += 1
+            return
+        extra = {}
+        try:
+            if isinstance(event, dict):
+                pid, etype = event.get("id"), event.get("type")
+                extra = event
+            else:
+                pid, etype = event
+            pid = int(pid)
+            etype = str(etype).lower()
+            watch = min(max(int(extra.get("watch_seconds") or 0), 0), _WATCH_SECONDS_MAX)
+            progress = extra.get("progress")
+            progress = None if progress is None else min(max(int(progress), 0), 100)
+        except (TypeError, ValueError, OverflowError):  # OverflowError: Infinity / 1e400
+            self.rejected["invalid"] += 1
+            return
+        if not 0 < pid <= _PK_MAX:
+            self.rejected["invalid"] += 1
+            return
+        if etype not in LOGGED_EVENT_TYPES:
+            self.rejected["unknown_type"] += 1
+            return
+        self.counts[pid][etype] += 1
+        if self.log_rows is not None:
+            self.log_rows.append((
+                pid, etype, watch, progress,
+                str(extra.get("device") or "")[:_DIM_MAX_LENGTH].lower(),
+                str(extra.get("language") or "")[:_DIM_MAX_LENGTH].lower(),
+            ))
+
+    def extend(self, events) -> EventBatch:
+        for event in events:
+            self.add(event)
+        return self
+
+    def commit(self) -> dict:
+        """
+        Drop events for unknown playlists, then apply everything else in one
+        set-based statement (or hand it to the write-behind buffer).
+
+        The counter UPDATE and the event-log INSERT share one transaction,
+        so a failed batch leaves no counters behind for the client's retry
+        to double.  Redis side effects (buffered counters, trending, unique
+        viewers) run only once that transaction has committed.
+
+        Returns ``{"accepted": {type: n}, "rejected": {type|reason: n},
+        "playlists": n}``.
+        """
+        accepted: Counter = Counter()
+        rejected = Counter(self.rejected)
+        deltas: dict[int, dict[str, int]] = {}
+
+        # pk → (playlist_type, language) for every playlist that exists.
+        known = {
+            pk: (playlist_type, language)
+            for pk, playlist_type, language in Playlist.objects.filter(
+                pk__in=self.counts.keys(),
+            ).values_list("pk", "playlist_type", "language")
+        } if self.counts else {}
+
+        for pid, by_type in self.counts.items():
+            if pid not in known:
+                rejected.update(by_type)
+                continue
+            accepted.update(by_type)
+            fields = {EVENT_COUNTERS[etype]: n for etype, n in by_type.items() if etype in EVENT_COUNTERS}
+            if fields:
+                deltas[pid] = fields
+
+        self.applied_pairs = sum(len(fields) for fields in deltas.values())
+        buffered = PlaylistCounterBuffer.enabled()
+
+        def _after_commit():
+            if deltas and buffered:
+                PlaylistCounterBuffer.incr_many({
+                    (pid, counter): n
+                    for pid, fields in deltas.items()
+                    for counter, n in fields.items()
+                })
+            PlaylistTrending.record_many(
+                (pid, *known[pid], by_type) for pid, by_type in self.counts.items() if pid in known
+            )
+            PlaylistUniqueViewers.add_many(known, self.user_id)
+
+        with transaction.atomic():
+            if deltas and not buffered:
+                apply_counter_deltas(
+                    deltas, timezone.now(), chunk_size=content_cfg("COUNTER_FLUSH_CHUNK"),
+                )
+            if self.log_rows:
+                PlaylistEventLog.append(
+                    [row for row in self.log_rows if row[0] in known], user_id=self.user_id,
+                )
+            transaction.on_commit(_after_commit)
+
+        logger.info(
+            "content.ingest action=commit events=%d playlists=%d accepted=%d rejected=%d",
+            self.seen, len(known), sum(accepted.values()), sum(rejected.values()),
+        )
+        return {
+            "accepted": {etype: accepted.get(etype, 0) for etype in LOGGED_EVENT_TYPES},
+            "rejected": {
+                **{etype: rejected.get(etype, 0) for etype in LOGGED_EVENT_TYPES},
+                **{reason: n for reason, n in rejected.items() if reason not in LOGGED_EVENT_TYPES},
+            },
+            "playlists": len(known),
+        }
@@ -0,0 +1,153 @@
+"""
+Page-independent list caching for the catalog endpoints.
+
+A list request is served from two cache layers:
+
+* **ID list** — the filter is resolved once into the ordered
+  ``[(pk, version), ...]`` of *every* matching row and stored under the
+  filter digest, tagged ``content:<resource>`` (see ``utilities.cache_keys``).
+  Every page and page size of that filter is a slice of the same list,
+  and ``total`` is its length — no COUNT, no LIKE rescan per page.  It is
+  read through ``get_or_compute``, so concurrent misses for one filter
+  run the query once and an expiring list is refreshed in the background
+  of a single request.
+* **Fragments** — each row's serialized dict, JSON-encoded once and
+  cached as text (django-redis's ``JSONSerializer`` cannot hold bytes)
+  under ``list_fragment(resource, pk, version)`` where ``version`` is the
+  row's ``updated_at`` (plus the sparse fieldset, when the request
+  narrows it with ``?fields=`` / ``?omit=``).  A warm page is one ``get_many`` and no
+  query; misses are loaded with a single ``pk__in`` ``values()`` query,
+  rendered by the resource's ``Projection`` and written back with one
+  ``set_many``.  Fragments reach the
+  response as ``RawJSON`` and are spliced into the body undecoded.  An
+  edit moves ``updated_at`` (and bumps the tag), so an outdated fragment
+  is never asked for again and simply ages out.
+"""
+
+from __future__ import annotations
+
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from utilities.cache_compute import WithTTL, get_or_compute
+from utilities.cache_keys import content_tag, list_fragment
+from utilities.pagination import page_params
+from utilities.response import RawJSON, encode_json
+from .config import content_cfg
+
+logger = logging.getLogger("content.listing")
+
+
+def row_version(updated_at) -> int:
+    """Fragment version for a row: its ``updated_at`` in microseconds."""
+    return int(updated_at.timestamp() * 1_000_000)
+
+
+class CachedListing:
+    """
+    Cached, paginated list of one content type.
+
+    ``expires_field`` names a datetime field after which the serialized
+    form changes on its own (e.g. ``Deal.expires_at`` → ``is_expired``);
+    fragments are then never kept past that moment, and ID lists are
+    rebuilt once their earliest row expires.
+    """
+
+    def __init__(self, resource: str, projection, expires_field: str | None = None):
+        self.resource = resource
+        self.projection = projection
+        self.expires_field = expires_field
+
+    # ------------------------------------------------------------------ ids
+    def ids(self, queryset, cache_key: str) -> list[tuple[int, int]]:
+        """Ordered ``(pk, version)`` of every row in ``queryset``, cached under ``cache_key``."""
+
+        def build():
+            if not self.expires_field:
+                return [(pk, row_version(updated_at)) for pk, updated_at in queryset.values_list("pk", "updated_at")]
+            rows = list(queryset.values_list("pk", "updated_at", self.expires_field))
+            ids = [(pk, row_version(updated_at)) for pk, updated_at, _ in rows]
+            # The list must be rebuilt once its first row expires.
+            expiries = [expires for _, _, expires in rows if expires is not None]
+            if not expiries:
+                return ids
+            remaining = int((min(expiries) - timezone.now()).total_seconds())
+            return WithTTL(ids, min(settings.SEARCH_CACHE_TTL, remaining))
+
+        return get_or_compute(
+            cache_key, build, settings.SEARCH_CACHE_TTL,
+            stale_ttl=content_cfg("CACHE_STALE_TTL"), tags=[content_tag(self.resource)],
+        )
+
+    # ------------------------------------------------------------ fragments
+    def fragments(self, queryset, ids: list[tuple[int, int]], context: dict,
+                  fields: tuple[str, ...] | None = None) -> dict[int, RawJSON]:
+        """
+        ``{pk: encoded row}`` for ``ids`` in order, from cached fragments
+        where possible; ``fields`` narrows each row to a sparse fieldset.
+        """
+        if not ids:
+            return {}
+        projection = self.projection.subset(fields)
+        fieldset = projection.fieldset_key
+        keys = {pk: list_fragment(self.resource, pk, version, fieldset) for pk, version in ids}
+        found = cache.get_many(list(keys.values()))
+        fragments = {pk: found[key] for pk, key in keys.items() if key in found}
+
+        missing = [pk for pk in keys if pk not in fragments]
+        if missing:
+            extra = ("updated_at", self.expires_field) if self.expires_field else ("updated_at",)
+            rows = projection.rows(queryset.filter(pk__in=missing), *extra)
+            fresh = {}
+            for row, item in zip(rows, projection.render(rows, context)):
+                fragments[row["pk"]] = encoded = encode_json(item).decode()
+                expires = row[self.expires_field] if self.expires_field else None
+                fresh.setdefault(self._timeout(expires), {})[
+                    list_fragment(self.resource, row["pk"], row_version(row["updated_at"]), fieldset)
+                ] = encoded
+            for timeout, mapping in fresh.items():
+                cache.set_many(mapping, timeout=timeout)
+
+        logger.debug(
+            "content.listing action=items resource=%s hits=%d misses=%d",
+            self.resource, len(keys) - len(missing), len(missing),
+        )
+        # Rows deleted or unpublished since the ID list was built are skipped.
+        return {pk: RawJSON(fragments[pk]) for pk in keys if pk in fragments}
+
+    def items(self, queryset, ids: list[tuple[int, int]], context: dict,
+              fields: tuple[str, ...] | None = None) -> list[RawJSON]:
+        """Encoded rows for ``ids`` in order, spliced into the response as-is."""
+        return list(self.fragments(queryset, ids, context, fields).values())
+
+    def _timeout(self, expires) -> int:
+        timeout = content_cfg("LIST_FRAGMENT_TTL")
+        if expires is not None:
+            remaining = int((expires - timezone.now()).total_seconds())
+            if remaining > 0:
+                timeout = min(timeout, remaining)
+        return timeout
+
+    # ----------------------------------------------------------------- page
+    def page(self, request, queryset, cache_key: str,
+             fields: tuple[str, ...] | None = None) -> tuple[list[dict], dict]:
+        """
+        Return ``(items, meta)`` for the requested page, with ``meta`` shaped
+        like ``paginate_queryset``'s ``{page, page_size, total, has_next}``.
+        The ID list does not depend on ``fields``, so every fieldset of a
+        filter shares one.
+        """
+        page, page_size = page_params(request)
+        ids = self.ids(queryset, cache_key)
+        start = (page - 1) * page_size
+        end = start + page_size
+        items = self.items(queryset, ids[start:end], {"request": request}, fields)
+        return items, {
+            "page": page,
+            "page_size": page_size,
+            "total": len(ids),
+            "has_next": end < len(ids),
+        }
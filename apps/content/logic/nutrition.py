@@ -0,0 +1,171 @@
+"""
+Typed nutrition columns extracted from ``Recipe.nutrition_facts``.
+
+Editors keep writing free-form facts (``{"protein": "12g", "carbs":
+"45 g", "fat": 8, "sodium": "300mg"}``); on save ``extract`` copies the
+macros into the btree-indexed ``protein_g`` / ``carbs_g`` / ``fat_g``
+columns (and ``calories`` when it was left at 0), so "under 400 kcal,
+25 g+ protein" is an index range scan rather than JSON parsing.
+
+Rows written before the columns existed, or by bulk ``update()``, are
+filled by ``manage.py backfill_recipe_nutrition`` (see ``backfill``).
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+import time
+from decimal import Decimal, InvalidOperation
+
+from django.db.models import F
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from apps.content.models import Recipe
+from utilities.cache_keys import bump_tags, content_tag
+from .config import content_cfg
+
+logger = logging.getLogger("content.nutrition")
+
+# Column → accepted keys in nutrition_facts (matched case-insensitively).
+COLUMNS = {
+    "protein_g": ("protein",),
+    "carbs_g": ("carbs", "carbohydrates", "carbohydrate"),
+    "fat_g": ("fat", "fats", "total_fat"),
+}
+_CALORIE_KEYS = ("calories", "kcal", "energy")
+
+# Public param name → column, for ?min_<name>= / ?max_<name>= / ?sort=[-]<name>.
+FILTERS = {"calories": "calories", "protein": "protein_g", "carbs": "carbs_g", "fat": "fat_g"}
+
+_AMOUNT = re.compile(r"^\s*(\d+(?:[.,]\d+)?)\s*(mg|g|kg|kcal|cal)?\b", re.IGNORECASE)
+_TO_GRAMS = {"mg": Decimal("0.001"), "g": Decimal(1), "kg": Decimal(1000), None: Decimal(1)}
+
+
+def parse_amount(value, grams: bool = True) -> float | None:
+    """``"12.5 g"`` → 12.5, ``"300mg"`` → 0.3, ``8`` → 8.0; ``None`` when unreadable."""
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value) if value >= 0 else None
+    match = _AMOUNT.match(str(value))
+    if not match:
+        return None
+    try:
+        amount = Decimal(match.group(1).replace(",", "."))
+    except InvalidOperation:
+        return None
+    unit = (match.group(2) or "").lower() or None
+    if grams:
+        amount *= _TO_GRAMS.get(unit, Decimal(1))
+    return round(float(amount), 2)
+
+
+def _lookup(facts: dict, keys) -> object:
+    lowered = {str(k).strip().lower(): v for k, v in facts.items()}
+    return next((lowered[k] for k in keys if k in lowered), None)
+
+
+def extract(recipe) -> list[str]:
+    """Fill the typed columns on ``recipe`` from its facts; returns the fields changed."""
+    facts = recipe.nutrition_facts if isinstance(recipe.nutrition_facts, dict) else {}
+    changed = []
+    for column, keys in COLUMNS.items():
+        value = parse_amount(_lookup(facts, keys))
+        if getattr(recipe, column) != value:
+            setattr(recipe, column, value)
+            changed.append(column)
+    if not recipe.calories:
+        kcal = parse_amount(_lookup(facts, _CALORIE_KEYS), grams=False)
+        if kcal:
+            recipe.calories = int(round(kcal))
+            changed.append("calories")
+    return changed
+
+
+def backfill(chunk_size: int | None = None, progress=None) -> int:
+    """
+    Re-extract every recipe in keyset chunks of ``chunk_size`` rows; each
+    chunk is one SELECT plus one bulk UPDATE of the rows that changed
+    (bulk UPDATEs send no signals, so the ``content:recipe`` tag is bumped
+    once at the end).  Returns the number of rows updated.
+    """
+    chunk_size = chunk_size or content_cfg("NUTRITION_BACKFILL_CHUNK")
+    fields = [*COLUMNS, "calories", "updated_at"]
+    started = time.monotonic()
+    last_pk, scanned, updated = 0, 0, 0
+    while True:
+        rows = list(
+            Recipe.objects.filter(pk__gt=last_pk).order_by("pk")
+            .only("pk", "nutrition_facts", "calories", "updated_at", *COLUMNS)[:chunk_size]
+        )
+        if not rows:
+            break
+        dirty = [r for r in rows if extract(r)]
+        if dirty:
+            # Moving updated_at retires the rows' cached list fragments.
+            now = timezone.now()
+            for recipe in dirty:
+                recipe.updated_at = now
+            Recipe.objects.bulk_update(dirty, fields)
+        scanned += len(rows)
+        updated += len(dirty)
+        last_pk = rows[-1].pk
+        if progress is not None:
+            progress(scanned, updated, last_pk)
+    if updated:
+        bump_tags(content_tag("recipe"))
+    logger.info(
+        "content.nutrition action=backfill scanned=%d updated=%d ms=%.1f",
+        scanned, updated, (time.monotonic() - started) * 1000,
+    )
+    return updated
+
+
+def filter_params(query_params) -> dict[str, str]:
+    """
+    Validated range / sort params as a flat dict of strings (empty ones
+    dropped), suitable for both ``apply_filters`` and the list cache key.
+    Raises ``ValidationError`` for non-numeric bounds or unknown sorts.
+    """
+    params, errors = {}, {}
+    for name in FILTERS:
+        for bound in ("min", "max"):
+            key = f"{bound}_{name}"
+            raw = (query_params.get(key) or "").strip()
+            if not raw:
+                continue
+            try:
+                value = float(raw)
+            except ValueError:
+                errors[key] = "Must be a number."
+                continue
+            params[key] = f"{value:g}"
+    sort = (query_params.get("sort") or "").strip()
+    if sort:
+        if sort.lstrip("-") not in FILTERS:
+            errors["sort"] = f"Must be one of: {', '.join(sorted(FILTERS))} (prefix '-' for descending)."
+        else:
+            params["sort"] = sort
+    if errors:
+        raise ValidationError(errors)
+    return params
+
+
+def apply_filters(queryset, params: dict[str, str]):
+    """Narrow / reorder ``queryset`` by the output of ``filter_params``."""
+    lookups = {}
+    for name, column in FILTERS.items():
+        if f"min_{name}" in params:
+            lookups[f"{column}__gte"] = float(params[f"min_{name}"])
+        if f"max_{name}" in params:
+            lookups[f"{column}__lte"] = float(params[f"max_{name}"])
+    if lookups:
+        queryset = queryset.filter(**lookups)
+    sort = params.get("sort")
+    if sort:
+        column = F(FILTERS[sort.lstrip("-")])
+        order = column.desc(nulls_last=True) if sort.startswith("-") else column.asc(nulls_last=True)
+        queryset = queryset.order_by(order, "-created_at", "-pk")
+    return queryset
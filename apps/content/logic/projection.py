@@ -0,0 +1,332 @@
+"""
+``values()`` read path for the high-traffic list endpoints.
+
+A ``Projection`` renders exactly what a Read serializer would, without
+model instances or per-row serializer machinery:
+
+* the shape is the serializer's own ``Meta.fields`` — nothing is
+  declared twice;
+* plain model fields become ``.values()`` columns.  Each column gets the
+  cheapest conversion that matches its DRF field: strings, ints, bools
+  and floats pass through; JSON columns are selected as text and emitted
+  as ``RawJSON`` (never decoded — ``encode_json`` splices them in);
+  ISO datetimes are formatted inline in the request's timezone; other
+  values (decimals, custom formats) use the serializer field's own
+  ``to_representation``; files go straight to the storage's ``url()``;
+  foreign keys read ``<fk>_id``;
+* ``SerializerMethodField``s, properties and many-to-many fields are
+  declared once per projection as ``derived`` functions of the row (plus
+  the extra columns they need) or ``related`` loaders that fetch a whole
+  page in one query.
+
+``subset(fields)`` is the same projection restricted to a sparse
+fieldset (``?fields=`` / ``?omit=``, see ``SparseFieldsMixin``): pruned
+fields are neither selected nor rendered, and ``prune(queryset)`` applies
+the same column list to a model queryset via ``.only()``.
+
+Because of the ``RawJSON`` values the output is meant for the renderer,
+not for Python-side inspection.  ``tests.ProjectionTests`` asserts the
+encoded output matches the serializer's field-for-field, and ``manage.py bench_projection`` measures the gain.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from collections import defaultdict
+from dataclasses import dataclass, field as dc_field, replace
+from datetime import timezone as dt_timezone
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from django.db.models import TextField
+from django.db.models.functions import Cast
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.relations import ManyRelatedField, RelatedField
+from rest_framework.settings import api_settings
+
+from apps.content.models import AmbientSound, BreathworkExercise, Deal, Playlist, Recipe, Session, Video
+from apps.content.serializers import (
+    AmbientSoundSerializer,
+    BreathworkExerciseSerializer,
+    DealReadSerializer,
+    RecipeReadSerializer,
+    SessionReadSerializer,
+    VideoReadSerializer,
+)
+from utilities.response import RawJSON
+
+# DRF fields whose to_representation is the identity for values a model column returns.
+_PASS_THROUGH = (
+    serializers.CharField, serializers.ChoiceField, serializers.IntegerField,
+    serializers.BooleanField, serializers.FloatField,
+)
+_JSON_ALIAS = "_json_%s"
+
+
+def _raw_json(text):
+    if text is None:
+        return None
+    # encode_json applies these escapes to everything it encodes itself.
+    return RawJSON(text.replace("\u2028", "\\u2028").replace("\u2029", "\\u2029").encode())
+
+
+def _iso_datetime(field) -> bool:
+    """True when DRF would render ``field`` as plain ISO 8601 in the current timezone."""
+    return (
+        isinstance(field, serializers.DateTimeField)
+        and getattr(field, "format", api_settings.DATETIME_FORMAT).lower() == ISO_8601
+        and not hasattr(field, "timezone")
+    )
+
+
+def file_url(storage, name, request, absolute_only_if_relative: bool = False):
+    """URL for a stored file name the way DRF's ``FileField`` (or ``_thumbnail_url``) renders it."""
+    if not name:
+        return None
+    try:
+        url = storage.url(name)
+    except Exception:
+        return None
+    if request is None or (absolute_only_if_relative and url.startswith(("http://", "https://"))):
+        return url
+    return request.build_absolute_uri(url)
+
+
+@dataclass
+class Derived:
+    """A computed output field: ``fn(row, context)`` over the listed extra ``columns``."""
+
+    fn: object
+    columns: tuple[str, ...] = ()
+
+
+@dataclass
+class Projection:
+    """Read-serializer output built from ``values()`` rows."""
+
+    serializer_class: type
+    derived: dict[str, Derived] = dc_field(default_factory=dict)
+    # name -> loader(pks) -> {pk: value}; one query per page.
+    related: dict[str, object] = dc_field(default_factory=dict)
+    # Sparse fieldset to render; None renders every serializer field.
+    fields: tuple[str, ...] | None = None
+
+    def __post_init__(self):
+        self.model = self.serializer_class.Meta.model
+        self._plan = None
+        self._subsets = {}
+
+    def subset(self, fields: tuple[str, ...] | None) -> Projection:
+        """This projection restricted to ``fields`` (``None`` → ``self``)."""
+        if fields is None or fields == self.fields:
+            return self
+        if fields not in self._subsets:
+            self._subsets[fields] = replace(self, fields=fields)
+        return self._subsets[fields]
+
+    @property
+    def fieldset_key(self) -> str:
+        """Short digest of the sparse fieldset for cache keys; ``""`` for the full shape."""
+        if self.fields is None:
+            return ""
+        return hashlib.sha256(",".join(self.fields).encode()).hexdigest()[:12]
+
+    # ----------------------------------------------------------------- plan
+    def _build_plan(self):
+        opts = self.model._meta
+        columns = {"pk": None}
+        expressions = {}
+        steps = []
+        for name, field in self.serializer_class().fields.items():
+            if self.fields is not None and name not in self.fields:
+                continue
+            if name in self.derived:
+                spec = self.derived[name]
+                columns.update(dict.fromkeys(spec.columns))
+                steps.append((name, "derived", spec.fn))
+                continue
+            if name in self.related:
+                steps.append((name, "related", self.related[name]))
+                continue
+            if isinstance(field, (serializers.SerializerMethodField, ManyRelatedField)):
+                raise ImproperlyConfigured(
+                    f"{self.serializer_class.__name__}.{name} needs a derived or related entry",
+                )
+            try:
+                model_field = opts.get_field(field.source)
+            except FieldDoesNotExist as exc:
+                raise ImproperlyConfigured(
+                    f"{self.serializer_class.__name__}.{name} is not a column; declare it as derived",
+                ) from exc
+            # attname: "<fk>_id" for a PrimaryKeyRelatedField, the column otherwise.
+            column = model_field.attname
+            if isinstance(field, serializers.JSONField):
+                alias = _JSON_ALIAS % column
+                expressions[alias] = Cast(column, TextField())
+                steps.append((name, "json", alias))
+                continue
+            columns[column] = None
+            if isinstance(field, (RelatedField, *_PASS_THROUGH)):
+                steps.append((name, "column", column))
+            elif _iso_datetime(field):
+                steps.append((name, "datetime", column))
+            elif isinstance(field, serializers.FileField):
+                steps.append((name, "file", (column, model_field.storage)))
+            else:
+                steps.append((name, "convert", (column, field.to_representation)))
+        # Model fields to load for .only(): the columns plus the JSON ones selected as text.
+        loaded = [c for c in columns if c != "pk"] + [a.removeprefix(_JSON_ALIAS % "") for a in expressions]
+        return list(columns), expressions, steps, loaded
+
+    @property
+    def plan(self):
+        if self._plan is None:
+            self._plan = self._build_plan()
+        return self._plan
+
+    @property
+    def columns(self) -> list[str]:
+        return self.plan[0]
+
+    # ---------------------------------------------------------------- fetch
+    def prune(self, queryset):
+        """``queryset`` loading only what this projection renders (and no unused prefetches)."""
+        queryset = queryset.only(*self.plan[3])
+        return queryset if self.related else queryset.prefetch_related(None)
+
+    def rows(self, queryset, *extra: str) -> list[dict]:
+        """The projection's columns (plus ``extra``) for every row of ``queryset``."""
+        names = list(dict.fromkeys([*self.columns, *extra]))
+        return list(queryset.prefetch_related(None).values(*names, **self.plan[1]))
+
+    def render(self, rows: list[dict], context: dict) -> list[dict]:
+        """Serializer-identical dicts for ``rows`` (from ``rows()``), in order."""
+        request = context.get("request")
+        tz = timezone.get_current_timezone() if settings.USE_TZ else None
+        steps = self.plan[2]
+        loaded = {
+            name: loader([row["pk"] for row in rows])
+            for name, kind, loader in steps if kind == "related"
+        }
+        out = []
+        for row in rows:
+            item = {}
+            for name, kind, spec in steps:
+                if kind == "column":
+                    item[name] = row[spec]
+                elif kind == "json":
+                    item[name] = _raw_json(row[spec])
+                elif kind == "datetime":
+                    item[name] = _isoformat(row[spec], tz)
+                elif kind == "convert":
+                    value = row[spec[0]]
+                    item[name] = None if value is None else spec[1](value)
+                elif kind == "file":
+                    item[name] = file_url(spec[1], row[spec[0]], request)
+                elif kind == "derived":
+                    item[name] = spec(row, context)
+                else:
+                    item[name] = loaded[name].get(row["pk"], [])
+            out.append(item)
+        return out
+
+    def data(self, queryset, context: dict) -> list[dict]:
+        return self.render(self.rows(queryset), context)
+
+
+def _isoformat(value, tz):
+    """``DateTimeField.to_representation`` for ISO output, minus the per-value lookups."""
+    if not value:
+        return None
+    if tz is not None:
+        value = value.astimezone(tz) if timezone.is_aware(value) else timezone.make_aware(value, tz)
+    elif timezone.is_aware(value):
+        value = timezone.make_naive(value, dt_timezone.utc)
+    text = value.isoformat()
+    return text[:-6] + "Z" if text.endswith("+00:00") else text
+
+
+# ── Derived fields ───────────────────────────────────────────────────
+
+def _thumbnail(model):
+    storage = model._meta.get_field("thumbnail").storage
+
+    def thumbnail(row, context):
+        return file_url(storage, row["thumbnail"], context.get("request"), absolute_only_if_relative=True)
+
+    return Derived(thumbnail, ("thumbnail",))
+
+
+def _hours_minutes(total: int) -> str:
+    return f"{total} min" if total < 60 else f"{total // 60}h {total % 60} min"
+
+
+def _video_duration(row, context):
+    secs = row["duration_seconds"] or 0
+    if secs < 60:
+        return f"{secs}s"
+    mins = secs // 60
+    if mins < 60:
+        return f"{mins} min"
+    return f"{mins // 60}h {mins % 60} min"
+
+
+def _video_playlists(pks):
+    through = Video.playlist.through
+    ordering = [f"{'-' if o.startswith('-') else ''}playlist__{o.lstrip('-')}" for o in Playlist._meta.ordering]
+    grouped = defaultdict(list)
+    rows = through.objects.filter(video_id__in=pks).order_by(*ordering).values_list("video_id", "playlist_id")
+    for video_id, playlist_id in rows:
+        grouped[video_id].append(playlist_id)
+    return grouped
+
+
+def _deal_is_expired(row, context):
+    return row["expires_at"] < timezone.now() if row["expires_at"] else False
+
+
+def _deal_discount_text(row, context):
+    return f"{row['discount_percent']}% off" if row["discount_percent"] is not None else ""
+
+
+RECIPE_PROJECTION = Projection(RecipeReadSerializer, derived={
+    "thumbnail": _thumbnail(Recipe),
+    "total_time_minutes": Derived(
+        lambda row, ctx: (row["prep_time_minutes"] or 0) + (row["cook_time_minutes"] or 0),
+        ("prep_time_minutes", "cook_time_minutes"),
+    ),
+    "total_time_display": Derived(
+        lambda row, ctx: _hours_minutes((row["prep_time_minutes"] or 0) + (row["cook_time_minutes"] or 0)),
+        ("prep_time_minutes", "cook_time_minutes"),
+    ),
+    "calories_display": Derived(lambda row, ctx: f"{row['calories']} kcal", ("calories",)),
+})
+
+SESSION_PROJECTION = Projection(SessionReadSerializer, derived={
+    "thumbnail": _thumbnail(Session),
+    "duration_display": Derived(lambda row, ctx: f"{row['duration_minutes']} min", ("duration_minutes",)),
+    "calories_display": Derived(lambda row, ctx: f"{row['calories_estimate']} kcal", ("calories_estimate",)),
+})
+
+VIDEO_PROJECTION = Projection(VideoReadSerializer, derived={
+    "thumbnail": _thumbnail(Video),
+    "duration_display": Derived(_video_duration, ("duration_seconds",)),
+}, related={"playlists": _video_playlists})
+
+DEAL_PROJECTION = Projection(DealReadSerializer, derived={
+    "is_expired": Derived(_deal_is_expired, ("expires_at",)),
+    "discount_text": Derived(_deal_discount_text, ("discount_percent",)),
+})
+
+BREATHWORK_PROJECTION = Projection(BreathworkExerciseSerializer)
+AMBIENT_SOUND_PROJECTION = Projection(AmbientSoundSerializer)
+
+PROJECTIONS = {
+    Recipe: RECIPE_PROJECTION,
+    Session: SESSION_PROJECTION,
+    Video: VIDEO_PROJECTION,
+    Deal: DEAL_PROJECTION,
+    BreathworkExercise: BREATHWORK_PROJECTION,
+    AmbientSound: AMBIENT_SOUND_PROJECTION,
+}
@@ -0,0 +1,87 @@
+"""
+Tag and ingredient filters for the recipes list.
+
+``Recipe.tags`` and ``Recipe.ingredient_keys`` are ``jsonb`` columns with
+``jsonb_path_ops`` GIN indexes, so every filter here is expressed as a
+containment (``@>``) test the index can answer:
+
+    tags_all=a,b            tags @> '["a","b"]'
+    tags_any=a,b            tags @> '["a"]' OR tags @> '["b"]'
+    exclude_ingredient=x    NOT ingredient_keys @> '["x"]'
+
+That only works if stored values are spelled exactly like the query, so
+both are normalised on save (``signals.py``): tags become lower-case
+hyphenated slugs ("High Protein" → "high-protein") and
+``ingredient_keys`` is rebuilt from ``ingredients`` — each ``item``
+lower-cased and whitespace-collapsed.  ``ingredients`` itself is stored
+and served exactly as entered.
+
+SQLite has no JSON containment; there the same filters fall back to a
+substring match on the serialised JSON, which is exact enough for tests.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+
+from django.db import connection
+from django.db.models import Q
+
+_TAG_SEPARATORS = re.compile(r"[\s_]+")
+
+
+def normalize_tag(tag: str) -> str:
+    return _TAG_SEPARATORS.sub("-", (tag or "").strip().lower()).strip("-")
+
+
+def ingredient_key(name: str) -> str:
+    return " ".join((name or "").lower().split())
+
+
+def normalize_tags(tags) -> list[str]:
+    """Slugify, drop blanks and duplicates (first spelling wins the order)."""
+    if not isinstance(tags, list):
+        return tags
+    return list(dict.fromkeys(t for t in (normalize_tag(t) for t in tags if isinstance(t, str)) if t))
+
+
+def ingredient_keys(ingredients) -> list[str]:
+    """Match keys of every ``{"item": ...}`` entry, de-duplicated; other shapes are skipped."""
+    if not isinstance(ingredients, list):
+        return []
+    keys = (
+        ingredient_key(entry["item"]) for entry in ingredients
+        if isinstance(entry, dict) and isinstance(entry.get("item"), str)
+    )
+    return list(dict.fromkeys(key for key in keys if key))
+
+
+def split_param(raw: str | None, normalizer) -> list[str]:
+    """``"a, B ,,c"`` → ``["a", "b", "c"]`` (normalised, de-duplicated, sorted)."""
+    return sorted({v for v in (normalizer(p) for p in (raw or "").split(",")) if v})
+
+
+def _contains(field: str, value) -> Q:
+    if connection.vendor == "postgresql":
+        return Q(**{f"{field}__contains": value})
+    # Django stores JSON with the default ", " / ": " separators.
+    needle = json.dumps(value)[1:-1]
+    if isinstance(value[0], dict):
+        needle = needle[1:-1]
+    return Q(**{f"{field}__icontains": needle})
+
+
+def filter_recipes(queryset, tags_all=(), tags_any=(), exclude_ingredients=()):
+    """Apply the (already normalised) tag / ingredient filters to ``queryset``."""
+    if tags_all:
+        if connection.vendor == "postgresql":
+            queryset = queryset.filter(_contains("tags", list(tags_all)))
+        else:
+            for tag in tags_all:
+                queryset = queryset.filter(_contains("tags", [tag]))
+    if tags_any:
+        queryset = queryset.filter(Q(*[_contains("tags", [t]) for t in tags_any], _connector=Q.OR))
+    for key in exclude_ingredients:
+        queryset = queryset.exclude(_contains("ingredient_keys", [key]))
+    return queryset
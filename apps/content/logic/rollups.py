@@ -0,0 +1,292 @@
+"""
+Playlist rollups.
+
+``PlaylistRollupEngine`` — incremental rollup of the PlaylistEvent log into
+cached Playlist rates.
+
+Each run folds only events past the stored high-water mark
+(``RollupCursor``): the new slice is aggregated in the database with one
+GROUP BY, per-playlist accumulators (``PlaylistRollup``) are advanced, and
+``ctr``, ``completion_rate``, ``bounce_rate``, ``avg_progress_pct`` and
+``breakdown`` are written back with one bulk UPDATE per chunk.  Cost is
+O(new events + touched playlists), never a rescan of the table.
+
+The mark never passes an id whose insert transaction is still in flight,
+or that row would commit *below* it and be skipped forever.  On
+PostgreSQL the batch is capped at ``PlaylistEventLog.committed_high_water``,
+which waits out in-flight writers through an advisory lock; other
+backends fall back to leaving events younger than
+``ROLLUP_SETTLE_SECONDS`` for the next run.
+
+``recompute_playlist_rates`` — catalog-wide refresh of the counter-derived
+rates (``ctr``, ``completion_rate``, ``avg_watch_seconds``), computed by
+the database in one UPDATE per keyset-paginated chunk of primary keys.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from collections import defaultdict
+from datetime import timedelta
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.db import transaction
+from django.db.models import (
+    Case, Count, DecimalField, F, FloatField, Min, Q, Sum, Value, When,
+)
+from django.db.models.functions import Cast, Least
+from django.utils import timezone
+
+from apps.content.models import Playlist, PlaylistEvent, PlaylistRollup, RollupCursor
+from .config import content_cfg
+from .events import ROLLUP_CURSOR, PlaylistEventLog
+
+logger = logging.getLogger("content.rollups")
+
+_RATE_QUANT = Decimal("0.0001")
+_DIMENSIONS = ("device", "language")
+_ACCUMULATORS = ("starts", "bounces", "progress_sum", "progress_samples")
+
+
+def _rate(numerator: int, denominator: int) -> Decimal:
+    """Ratio clamped to [0, 1] and quantized for the DecimalField(6, 4) columns."""
+    if not denominator:
+        return Decimal(0)
+    value = min(max(numerator / denominator, 0.0), 1.0)
+    return Decimal(str(value)).quantize(_RATE_QUANT, rounding=ROUND_HALF_UP)
+
+
+def _merge_breakdown(current: dict | None, delta: dict) -> dict:
+    merged = {dim: {k: dict(v) for k, v in values.items()} for dim, values in (current or {}).items()}
+    for dim, values in delta.items():
+        for value, by_type in values.items():
+            bucket = merged.setdefault(dim, {}).setdefault(value, {})
+            for etype, n in by_type.items():
+                bucket[etype] = bucket.get(etype, 0) + n
+    return merged
+
+
+class PlaylistRollupEngine:
+    """Folds new ``PlaylistEvent`` rows into Playlist rollups."""
+
+    @staticmethod
+    def run(max_batches: int | None = None) -> dict:
+        """
+        Process pending events in ``ROLLUP_BATCH``-sized slices until
+        caught up (or ``max_batches`` slices).  Returns a summary dict.
+        """
+        started = time.monotonic()
+        events = playlists = batches = 0
+        while max_batches is None or batches < max_batches:
+            folded, touched = PlaylistRollupEngine._run_batch()
+            if not folded:
+                break
+            events += folded
+            playlists += touched
+            batches += 1
+
+        summary = {
+            "events": events,
+            "playlists": playlists,
+            "batches": batches,
+            "ms": round((time.monotonic() - started) * 1000, 1),
+        }
+        logger.info(
+            "content.rollups action=run events=%d playlists=%d batches=%d ms=%.1f",
+            events, playlists, batches, summary["ms"],
+        )
+        return summary
+
+    # ─────────────────────────────────────────── internal housekeeping
+
+    @staticmethod
+    def _run_batch() -> tuple[int, int]:
+        with transaction.atomic():
+            # Row lock on the cursor serialises concurrent runners.
+            cursor, _ = RollupCursor.objects.select_for_update().get_or_create(name=ROLLUP_CURSOR)
+            low = cursor.last_id
+            high = PlaylistRollupEngine._high_water(low)
+            if high is None:
+                return 0, 0
+
+            window = PlaylistEvent.objects.filter(id__gt=low, id__lte=high)
+            bounce = content_cfg("BOUNCE_SECONDS")
+            groups = list(
+                window.values("playlist_id", "event_type", "device", "language")
+                .annotate(
+                    n=Count("id"),
+                    short=Count("id", filter=Q(watch_seconds__lt=bounce)),
+                    progress_sum=Sum("progress_pct"),
+                    progress_n=Count("progress_pct"),
+                )
+                .order_by()
+            )
+            folded = sum(g["n"] for g in groups)
+            touched = PlaylistRollupEngine._apply(PlaylistRollupEngine._fold(groups))
+
+            cursor.last_id = high
+            cursor.save(update_fields=["last_id", "updated_at"])
+        return folded, touched
+
+    @staticmethod
+    def _high_water(low: int) -> int | None:
+        """Highest event id this batch may consume, or ``None`` if nothing is ready."""
+        committed = PlaylistEventLog.committed_high_water()
+        pending = PlaylistEvent.objects.filter(id__gt=low).order_by("id")
+        if committed is not None:
+            pending = pending.filter(id__lte=committed)
+
+        batch = content_cfg("ROLLUP_BATCH")
+        high = pending.values_list("id", flat=True)[batch - 1:batch].first()
+        if high is None:
+            high = pending.order_by("-id").values_list("id", flat=True).first()
+            if high is None:
+                return None
+
+        if committed is None:
+            # No write fence: never step past an event that is still settling.
+            cutoff = timezone.now() - timedelta(seconds=content_cfg("ROLLUP_SETTLE_SECONDS"))
+            young = pending.filter(id__lte=high, occurred_at__gte=cutoff).aggregate(m=Min("id"))["m"]
+            if young is not None:
+                high = young - 1
+        return high if high > low else None
+
+    @staticmethod
+    def _fold(groups: list[dict]) -> dict[int, dict]:
+        """Collapse GROUP BY rows into per-playlist accumulator and breakdown deltas."""
+        acc: dict[int, dict] = defaultdict(lambda: {
+            **dict.fromkeys(_ACCUMULATORS, 0),
+            "breakdown": {},
+        })
+        E = PlaylistEvent.EventType
+        for g in groups:
+            row = acc[g["playlist_id"]]
+            etype, n = g["event_type"], g["n"]
+            progress_sum = g["progress_sum"] or 0
+            if etype == E.START:
+                row["starts"] += n
+            elif etype == E.EXIT:
+                row["bounces"] += g["short"]
+                row["progress_sum"] += progress_sum
+                row["progress_samples"] += g["progress_n"]
+            elif etype == E.COMPLETE:
+                # A completion without an explicit progress value counts as 100%.
+                row["progress_sum"] += progress_sum + 100 * (n - g["progress_n"])
+                row["progress_samples"] += n
+
+            for dim in _DIMENSIONS:
+                if g[dim]:
+                    bucket = row["breakdown"].setdefault(dim, {}).setdefault(g[dim], {})
+                    bucket[etype] = bucket.get(etype, 0) + n
+        return acc
+
+    @staticmethod
+    def _apply(acc: dict[int, dict]) -> int:
+        if not acc:
+            return 0
+        chunk = content_cfg("COUNTER_FLUSH_CHUNK")
+        playlists = list(
+            Playlist.objects.filter(pk__in=acc.keys())
+            .only("impressions", "clicks", "starts", "completes", "breakdown"),
+        )
+        rollups = PlaylistRollup.objects.in_bulk([p.pk for p in playlists])
+
+        now = timezone.now()
+        created, updated = [], []
+        for playlist in playlists:
+            delta = acc[playlist.pk]
+            rollup = rollups.get(playlist.pk)
+            if rollup is None:
+                rollup = PlaylistRollup(playlist_id=playlist.pk)
+                created.append(rollup)
+            else:
+                updated.append(rollup)
+            for name in _ACCUMULATORS:
+                setattr(rollup, name, getattr(rollup, name) + delta[name])
+            rollup.updated_at = now
+
+            playlist.ctr = _rate(playlist.clicks, playlist.impressions)
+            playlist.completion_rate = _rate(playlist.completes, playlist.starts)
+            playlist.bounce_rate = _rate(rollup.bounces, rollup.starts)
+            playlist.avg_progress_pct = (
+                min(rollup.progress_sum / rollup.progress_samples, 100.0)
+                if rollup.progress_samples else 0.0
+            )
+            if delta["breakdown"]:
+                playlist.breakdown = _merge_breakdown(playlist.breakdown, delta["breakdown"])
+
+        PlaylistRollup.objects.bulk_create(created, batch_size=chunk)
+        PlaylistRollup.objects.bulk_update(updated, [*_ACCUMULATORS, "updated_at"], batch_size=chunk)
+        Playlist.objects.bulk_update(
+            playlists,
+            ["ctr", "completion_rate", "bounce_rate", "avg_progress_pct", "breakdown"],
+            batch_size=chunk,
+        )
+        return len(playlists)
+
+
+# ── Catalog-wide counter rates ───────────────────────────────────────
+
+def _ratio(numerator: str, denominator: str, output_field, cap: float | None = None):
+    """SQL ``numerator / denominator`` (0 when the denominator is 0), optionally capped."""
+    ratio = Cast(F(numerator), FloatField()) / Cast(F(denominator), FloatField())
+    if cap is not None:
+        ratio = Least(ratio, Value(cap))
+    return Case(
+        When(**{f"{denominator}__gt": 0}, then=Cast(ratio, output_field)),
+        default=Value(0),
+        output_field=output_field,
+    )
+
+
+def _rate_expressions() -> dict:
+    rate_field = DecimalField(max_digits=6, decimal_places=4)
+    return {
+        "ctr": _ratio("clicks", "impressions", rate_field, cap=1.0),
+        "completion_rate": _ratio("completes", "starts", rate_field, cap=1.0),
+        "avg_watch_seconds": _ratio("total_watch_seconds", "starts", FloatField()),
+    }
+
+
+def recompute_playlist_rates(queryset=None, chunk_size: int | None = None, progress=None) -> dict:
+    """
+    Recompute ``ctr``, ``completion_rate`` and ``avg_watch_seconds`` from
+    the counters for every playlist in ``queryset`` (default: all).
+
+    Walks the primary key in keyset-paginated chunks; each chunk is a
+    single ``UPDATE ... WHERE id > last AND id <= upper`` with the rates
+    computed in SQL, so nothing is loaded into Python.  ``progress`` is
+    called as ``progress(chunk_no, rows, last_pk, ms)`` after each chunk.
+    """
+    queryset = Playlist.objects.all() if queryset is None else queryset
+    chunk_size = chunk_size or content_cfg("ROLLUP_RECOMPUTE_CHUNK")
+    expressions = _rate_expressions()
+    keys = queryset.order_by("pk").values_list("pk", flat=True)
+
+    started = time.monotonic()
+    last_pk, rows, chunks = 0, 0, 0
+    while True:
+        chunk_started = time.monotonic()
+        upper = keys.filter(pk__gt=last_pk)[chunk_size - 1:chunk_size].first()
+        if upper is None:
+            upper = keys.filter(pk__gt=last_pk).order_by("-pk").first()
+            if upper is None:
+                break
+        updated = queryset.filter(pk__gt=last_pk, pk__lte=upper).update(**expressions)
+        rows += updated
+        chunks += 1
+        last_pk = upper
+        if progress is not None:
+            progress(chunks, updated, last_pk, (time.monotonic() - chunk_started) * 1000)
+
+    summary = {
+        "playlists": rows,
+        "chunks": chunks,
+        "ms": round((time.monotonic() - started) * 1000, 1),
+    }
+    logger.info(
+        "content.rollups action=recompute_rates playlists=%d chunks=%d ms=%.1f",
+        rows, chunks, summary["ms"],
+    )
+    return summary
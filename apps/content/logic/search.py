@@ -0,0 +1,213 @@
+"""
+Full-text search across recipes, sessions, videos and playlists.
+
+Each searchable model carries a ``search_vector`` column (GIN-indexed)
+built from three weighted documents:
+
+    A  title
+    B  tags / instructor / type-like fields
+    C  description and long-form text
+
+The vector is rewritten on every save (``signals.py`` → ``refresh``) and
+rebuilt in bulk by ``manage.py rebuild_search_index``.  ``ContentSearch``
+ranks all types with ``ts_rank`` in a single ``UNION ALL`` query and
+returns typed hits; callers hydrate them (see ``views.search``).
+
+On backends other than PostgreSQL the vector is left NULL and the same
+query falls back to ``icontains`` over the weighted fields, ranked by the
+best-weighted field that matched — good enough for SQLite test runs.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connection
+from django.db.models import Case, F, FloatField, Q, Value, When
+from django.db.models.functions import Coalesce
+
+from apps.content.models import Playlist, Recipe, Session, Video
+from .config import content_cfg
+from .listing import row_version
+
+logger = logging.getLogger("content.search")
+
+_WEIGHTS = ("A", "B", "C")
+_FALLBACK_RANK = {"A": 1.0, "B": 0.4, "C": 0.2}  # Mirrors ts_rank's default A/B/C weights
+
+
+def _text(value) -> str:
+    """Flatten CharField / JSON list / JSON dict values into plain text."""
+    if value is None:
+        return ""
+    if isinstance(value, dict):
+        return " ".join(_text(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return " ".join(_text(v) for v in value)
+    return str(value)
+
+
+@dataclass(frozen=True)
+class SearchSpec:
+    """Searchable model and its fields per weight."""
+
+    type: str
+    model: type
+    fields: dict[str, tuple[str, ...]]
+    published: Q
+
+    def documents(self, obj) -> dict[str, str]:
+        return {
+            weight: " ".join(filter(None, (_text(getattr(obj, f)) for f in self.fields[weight])))
+            for weight in _WEIGHTS
+        }
+
+
+SEARCH_SPECS: dict[str, SearchSpec] = {
+    spec.type: spec for spec in (
+        SearchSpec(
+            "recipe", Recipe,
+            {"A": ("title",), "B": ("tags", "cuisine", "meal_type", "diet_tag"),
+             "C": ("description", "ingredients")},
+            Q(is_published=True),
+        ),
+        SearchSpec(
+            "session", Session,
+            {"A": ("title",), "B": ("subtitle", "category", "difficulty"), "C": ("description", "benefits")},
+            Q(is_published=True),
+        ),
+        SearchSpec(
+            "video", Video,
+            {"A": ("title",), "B": ("instructor", "content_genre", "content_type"), "C": ("description",)},
+            Q(is_published=True),
+        ),
+        SearchSpec(
+            "playlist", Playlist,
+            {"A": ("title",), "B": ("playlist_type", "language"), "C": ("description",)},
+            Q(),
+        ),
+    )
+}
+SPECS_BY_MODEL = {spec.model: spec for spec in SEARCH_SPECS.values()}
+
+
+def _postgres() -> bool:
+    return connection.vendor == "postgresql"
+
+
+def _vector_expression(spec: SearchSpec, obj):
+    config = content_cfg("SEARCH_CONFIG")
+    vector = None
+    for weight, text in spec.documents(obj).items():
+        part = SearchVector(Value(text), weight=weight, config=config)
+        vector = part if vector is None else vector + part
+    return vector
+
+
+@dataclass(frozen=True)
+class SearchHit:
+    type: str
+    pk: int
+    version: int
+    rank: float
+
+
+class ContentSearch:
+    """Maintain ``search_vector`` columns and run ranked searches."""
+
+    # ----------------------------------------------------------------- write
+    @staticmethod
+    def refresh(obj) -> None:
+        """Rewrite ``obj.search_vector`` in place (one UPDATE, no signals)."""
+        spec = SPECS_BY_MODEL.get(type(obj))
+        if spec is None or not _postgres():
+            return
+        spec.model.objects.filter(pk=obj.pk).update(search_vector=_vector_expression(spec, obj))
+
+    @staticmethod
+    def rebuild(types=None, chunk_size: int | None = None, progress=None) -> dict:
+        """
+        Recompute the vector for every row of ``types`` (default: all), in
+        keyset chunks of ``chunk_size`` rows written with one bulk UPDATE each.
+        """
+        chunk_size = chunk_size or content_cfg("SEARCH_REBUILD_CHUNK")
+        summary = {}
+        if not _postgres():
+            return summary
+        for name in types or SEARCH_SPECS:
+            spec = SEARCH_SPECS[name]
+            started = time.monotonic()
+            last_pk, rows = 0, 0
+            while True:
+                objs = list(spec.model.objects.filter(pk__gt=last_pk).order_by("pk")[:chunk_size])
+                if not objs:
+                    break
+                for obj in objs:
+                    obj.search_vector = _vector_expression(spec, obj)
+                spec.model.objects.bulk_update(objs, ["search_vector"])
+                rows += len(objs)
+                last_pk = objs[-1].pk
+                if progress is not None:
+                    progress(name, rows, last_pk)
+            summary[name] = rows
+            logger.info(
+                "content.search action=rebuild type=%s rows=%d ms=%.1f",
+                name, rows, (time.monotonic() - started) * 1000,
+            )
+        return summary
+
+    # ------------------------------------------------------------------ read
+    @staticmethod
+    def matching(queryset, q: str):
+        """Narrow ``queryset`` to rows matching ``q``, annotated with ``rank``."""
+        return ContentSearch._ranked(SPECS_BY_MODEL[queryset.model], q, queryset)
+
+    @staticmethod
+    def _ranked(spec: SearchSpec, q: str, queryset=None):
+        qs = spec.model.objects.filter(spec.published) if queryset is None else queryset
+        if _postgres():
+            query = SearchQuery(q, config=content_cfg("SEARCH_CONFIG"), search_type="websearch")
+            return qs.filter(search_vector=query).annotate(
+                rank=SearchRank(F("search_vector"), query),
+            )
+
+        matches = {
+            weight: Q(*[Q(**{f"{field}__icontains": q}) for field in spec.fields[weight]], _connector=Q.OR)
+            for weight in _WEIGHTS
+        }
+        return qs.filter(matches["A"] | matches["B"] | matches["C"]).annotate(
+            rank=Case(
+                *[When(matches[w], then=Value(_FALLBACK_RANK[w])) for w in _WEIGHTS],
+                default=Value(0.0),
+                output_field=FloatField(),
+            ),
+        )
+
+    @staticmethod
+    def search(q: str, types=None, limit: int | None = None) -> list[SearchHit]:
+        """
+        Ranked hits for ``q`` across ``types`` (default: all) in one query,
+        best first.  Returns at most ``limit`` hits.
+        """
+        q = (q or "").strip()
+        names = [t for t in (types or SEARCH_SPECS) if t in SEARCH_SPECS]
+        if not q or not names:
+            return []
+        limit = limit or content_cfg("SEARCH_LIMIT")
+
+        parts = [
+            ContentSearch._ranked(SEARCH_SPECS[name], q)
+            .annotate(hit_type=Value(name), hit_rank=Coalesce("rank", Value(0.0)))
+            .values_list("hit_type", "pk", "updated_at", "hit_rank")
+            .order_by()
+            for name in names
+        ]
+        union = parts[0].union(*parts[1:], all=True) if len(parts) > 1 else parts[0]
+        rows = union.order_by("-hit_rank", "hit_type", "pk")[:limit]
+        return [
+            SearchHit(type=t, pk=pk, version=row_version(updated_at), rank=float(rank))
+            for t, pk, updated_at, rank in rows
+        ]
@@ -0,0 +1,135 @@
+"""
+Time-decayed trending scores for playlists, materialised in Redis.
+
+Every impression/click/start/complete adds ``weight * 2**((t - epoch) / half_life)``
+to the playlist's member in a handful of sorted sets (all, per
+``playlist_type``, per ``language``, per both).  This is *forward decay*:
+older contributions are never rewritten, newer ones are simply worth
+exponentially more, so the relative order is exactly that of an
+exponentially decayed score and the hot path is one pipelined
+``ZINCRBY`` batch.  Each set is trimmed to the top ``TRENDING_MAX_SIZE``.
+
+To keep scores bounded the epoch advances every ``TRENDING_GENERATION_HOURS``.
+Writes go to the current *and* the next generation (each with its own
+epoch), so when the clock rolls over the new generation is already warm
+and the old one simply expires — no rebase job, no shared state.
+
+Reads are one ``ZREVRANGE`` + ``ZCARD``.  When Redis is unavailable the
+writes are dropped and ``page`` returns ``None`` so callers can fall back
+to the all-time ``(impressions, ctr)`` ordering.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+
+from utilities.cache_backend import run_redis
+from utilities.cache_keys import playlist_trending
+from .config import content_cfg
+
+logger = logging.getLogger("content.trending")
+
+
+def _scopes(playlist_type: str | None, language: str | None) -> list[tuple[str, str]]:
+    playlist_type, language = (playlist_type or "").upper(), (language or "").upper()
+    scopes = [("", "")]
+    if playlist_type:
+        scopes.append((playlist_type, ""))
+    if language:
+        scopes.append(("", language))
+    if playlist_type and language:
+        scopes.append((playlist_type, language))
+    return scopes
+
+
+class PlaylistTrending:
+    """Decayed trending leaderboards keyed by playlist_type / language."""
+
+    @staticmethod
+    def enabled() -> bool:
+        return bool(content_cfg("TRENDING_ENABLED"))
+
+    @staticmethod
+    def _generation_seconds() -> float:
+        return float(content_cfg("TRENDING_GENERATION_HOURS")) * 3600
+
+    @staticmethod
+    def generation(now: float | None = None) -> int:
+        now = time.time() if now is None else now
+        return int(now // PlaylistTrending._generation_seconds())
+
+    @staticmethod
+    def weight(generation: int, now: float) -> float:
+        """Forward-decay multiplier for an event at ``now`` within ``generation``."""
+        epoch = generation * PlaylistTrending._generation_seconds()
+        half_life = float(content_cfg("TRENDING_HALF_LIFE_HOURS")) * 3600
+        return 2.0 ** ((now - epoch) / half_life)
+
+    # ----------------------------------------------------------------- write
+    @staticmethod
+    def record(pk: int, playlist_type: str | None, language: str | None, event_type: str) -> None:
+        PlaylistTrending.record_many([(pk, playlist_type, language, {event_type: 1})])
+
+    @staticmethod
+    def record_many(entries, now: float | None = None) -> None:
+        """
+        Add events to the leaderboards in one pipeline.  ``entries`` is an
+        iterable of ``(pk, playlist_type, language, {event_type: count})``.
+        """
+        if not PlaylistTrending.enabled():
+            return
+        weights = content_cfg("TRENDING_WEIGHTS")
+        now = time.time() if now is None else now
+        current = PlaylistTrending.generation(now)
+        generations = {gen: PlaylistTrending.weight(gen, now) for gen in (current, current + 1)}
+
+        increments: dict[str, dict[int, float]] = {}
+        for pk, playlist_type, language, counts in entries:
+            base = sum(weights.get(etype, 0.0) * n for etype, n in counts.items())
+            if not base:
+                continue
+            for scope in _scopes(playlist_type, language):
+                for gen, factor in generations.items():
+                    bucket = increments.setdefault(playlist_trending(gen, *scope), {})
+                    bucket[pk] = bucket.get(pk, 0.0) + base * factor
+        if not increments:
+            return
+
+        max_size = content_cfg("TRENDING_MAX_SIZE")
+        ttl = int(PlaylistTrending._generation_seconds() * 2)
+
+        def _redis(client):
+            pipe = client.pipeline(transaction=False)
+            for key, members in increments.items():
+                for pk, amount in members.items():
+                    pipe.zincrby(key, amount, pk)
+                pipe.zremrangebyrank(key, 0, -(max_size + 1))
+                pipe.expire(key, ttl)
+            pipe.execute()
+
+        run_redis(_redis, lambda: None)
+
+    # ------------------------------------------------------------------ read
+    @staticmethod
+    def page(
+        playlist_type: str | None = None,
+        language: str | None = None,
+        offset: int = 0,
+        limit: int = 20,
+    ) -> tuple[list[int], int] | None:
+        """
+        Return ``(playlist_ids, total)`` for one page of the leaderboard, or
+        ``None`` when Redis is unavailable.
+        """
+        scope = _scopes(playlist_type, language)[-1]
+        key = playlist_trending(PlaylistTrending.generation(), *scope)
+
+        def _redis(client):
+            pipe = client.pipeline(transaction=False)
+            pipe.zrevrange(key, offset, offset + limit - 1)
+            pipe.zcard(key)
+            ids, total = pipe.execute()
+            return [int(pk) for pk in ids], int(total)
+
+        return run_redis(_redis, lambda: None)
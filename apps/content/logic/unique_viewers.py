@@ -0,0 +1,240 @@
+"""
+Approximate unique viewers per playlist with HyperLogLog.
+
+Each (playlist, UTC day) gets a Redis HyperLogLog (``PFADD`` of user ids,
+~12 KB max per key, expiring after the longest window).  Windows are
+unions of day sketches — ``PFCOUNT`` over 7 or 30 keys — so a user who
+opens a playlist 50 times counts once.  ``refresh()`` writes the results
+into ``Playlist.unique_viewers_7d`` / ``unique_viewers_30d`` for every
+playlist seen within the last 30 days.
+
+When ``FallbackCache`` is degraded, viewers are buffered per process as
+plain id sets (``UNIQUE_VIEWERS_LOCAL_MAX`` ids at most, pruned to the
+30-day window) and replayed with ``PFADD`` in the same pipeline as that
+process's next successful Redis write or read, so nothing recorded during
+an outage is lost.  Reads replay first, so ``PFCOUNT`` sees the union;
+while Redis stays down, counts are the exact union of the local sets.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+
+from django.utils import timezone
+
+from apps.content.models import Playlist
+from utilities.cache_backend import run_redis
+from utilities.cache_keys import playlist_viewers, playlist_viewers_active
+from .config import content_cfg
+
+logger = logging.getLogger("content.unique_viewers")
+
+WINDOWS = (7, 30)
+_MAX_WINDOW = max(WINDOWS)
+
+# ── Per-process outage buffer ────────────────────────────────────────
+
+_local_lock = threading.Lock()
+_local: dict[tuple[int, date], set] = defaultdict(set)  # viewers not yet in Redis
+_local_active: dict[int, float] = {}
+_local_size = 0
+_local_dropped = 0
+_local_pruned_for: date | None = None
+
+
+def _prune_local(today: date, cutoff: float) -> None:
+    """Drop buffered days and playlists outside the window (caller holds the lock)."""
+    global _local_size
+    oldest = today - timedelta(days=_MAX_WINDOW - 1)
+    for key in [k for k in _local if k[1] < oldest]:
+        _local_size -= len(_local.pop(key))
+    for pk in [pk for pk, seen in _local_active.items() if seen < cutoff]:
+        del _local_active[pk]
+
+
+def _buffer_local(pks, user_id, day: date, seen_at: float) -> None:
+    global _local_size, _local_dropped, _local_pruned_for
+    with _local_lock:
+        if _local_pruned_for != day:
+            _prune_local(day, seen_at - _MAX_WINDOW * 86400)
+            _local_pruned_for = day
+        for pk in pks:
+            members = _local[(pk, day)]
+            if user_id not in members:
+                if _local_size >= content_cfg("UNIQUE_VIEWERS_LOCAL_MAX"):
+                    if not _local_dropped:
+                        logger.warning("content.unique_viewers action=buffer_full max=%d",
+                                       content_cfg("UNIQUE_VIEWERS_LOCAL_MAX"))
+                    _local_dropped += 1
+                    continue
+                members.add(user_id)
+                _local_size += 1
+            _local_active[pk] = max(_local_active.get(pk, 0.0), seen_at)
+
+
+def _take_local():
+    """Detach the buffered viewers for replay; ``_restore_local`` puts them back on failure."""
+    global _local, _local_active, _local_size
+    with _local_lock:
+        pending, active = _local, _local_active
+        _local, _local_active, _local_size = defaultdict(set), {}, 0
+    return pending, active
+
+
+def _restore_local(pending, active) -> None:
+    global _local_size
+    with _local_lock:
+        for key, members in pending.items():
+            current = _local[key]
+            _local_size += len(members - current)
+            current |= members
+        for pk, seen in active.items():
+            _local_active[pk] = max(_local_active.get(pk, 0.0), seen)
+
+
+def _queue_replay(pipe, pending, active) -> None:
+    ttl = (_MAX_WINDOW + 1) * 86400
+    for (pk, day), members in pending.items():
+        key = playlist_viewers(pk, day)
+        pipe.pfadd(key, *members)
+        pipe.expire(key, ttl)
+    if active:
+        pipe.zadd(playlist_viewers_active(), active, gt=True)
+    if pending:
+        logger.info("content.unique_viewers action=replay keys=%d", len(pending))
+
+
+def _days(today: date, window: int) -> list[date]:
+    return [today - timedelta(days=i) for i in range(window)]
+
+
+class PlaylistUniqueViewers:
+    """Per-playlist, per-day distinct-viewer sketches."""
+
+    @staticmethod
+    def enabled() -> bool:
+        return bool(content_cfg("UNIQUE_VIEWERS_ENABLED"))
+
+    # ----------------------------------------------------------------- write
+    @staticmethod
+    def add(pk: int, user_id, when=None) -> None:
+        PlaylistUniqueViewers.add_many([pk], user_id, when)
+
+    @staticmethod
+    def add_many(pks, user_id, when=None) -> None:
+        """Record ``user_id`` as a viewer of every playlist in ``pks`` (one pipeline)."""
+        pks = list(pks)
+        if user_id is None or not pks or not PlaylistUniqueViewers.enabled():
+            return
+        day = (when or timezone.now()).date()
+        seen_at = time.time()
+        ttl = (_MAX_WINDOW + 1) * 86400
+        pending, active = _take_local()
+
+        def _redis(client):
+            pipe = client.pipeline(transaction=False)
+            _queue_replay(pipe, pending, active)
+            for pk in pks:
+                key = playlist_viewers(pk, day)
+                pipe.pfadd(key, user_id)
+                pipe.expire(key, ttl)
+            pipe.zadd(playlist_viewers_active(), dict.fromkeys(pks, seen_at))
+            pipe.execute()
+
+        def _fallback():
+            _restore_local(pending, active)
+            _buffer_local(pks, user_id, day, seen_at)
+
+        run_redis(_redis, _fallback)
+
+    # ------------------------------------------------------------------ read
+    @staticmethod
+    def counts(pks, today: date | None = None) -> dict[int, dict[int, int]]:
+        """Return ``{pk: {7: n, 30: n}}`` estimated distinct viewers per window."""
+        pks = list(pks)
+        today = today or timezone.now().date()
+        pending, active = _take_local()
+        queries = len(pks) * len(WINDOWS)
+
+        def _redis(client):
+            pipe = client.pipeline(transaction=False)
+            _queue_replay(pipe, pending, active)  # local viewers join the Redis sketches first
+            for pk in pks:
+                for window in WINDOWS:
+                    pipe.pfcount(*[playlist_viewers(pk, d) for d in _days(today, window)])
+            return pipe.execute()[-queries:] if queries else []
+
+        def _fallback():
+            _restore_local(pending, active)
+
+        raw = run_redis(_redis, _fallback)
+        result: dict[int, dict[int, int]] = {}
+        if raw is not None:
+            values = iter(raw)
+            for pk in pks:
+                result[pk] = {window: int(next(values)) for window in WINDOWS}
+            return result
+
+        # Redis unreachable: exact union of this process's buffered viewers.
+        with _local_lock:
+            for pk in pks:
+                result[pk] = {
+                    window: len(set().union(*(_local.get((pk, d), ()) for d in _days(today, window))))
+                    for window in WINDOWS
+                }
+        return result
+
+    # ---------------------------------------------------------------- rollup
+    @staticmethod
+    def refresh(now=None) -> int:
+        """
+        Recompute ``unique_viewers_7d/30d`` for playlists seen in the last
+        30 days and zero the ones that dropped out.  Returns rows updated.
+        """
+        now = now or timezone.now()
+        cutoff = now.timestamp() - _MAX_WINDOW * 86400
+        pending, local_active = _take_local()
+
+        def _redis(client):
+            pipe = client.pipeline(transaction=False)
+            _queue_replay(pipe, pending, local_active)
+            pipe.zremrangebyscore(playlist_viewers_active(), "-inf", f"({cutoff}")
+            pipe.zrange(playlist_viewers_active(), 0, -1)
+            return [int(pk) for pk in pipe.execute()[-1]]
+
+        def _fallback():
+            _restore_local(pending, local_active)
+
+        redis_active = run_redis(_redis, _fallback)
+        with _local_lock:
+            _prune_local(now.date(), cutoff)
+            active = set(redis_active or ()) | set(_local_active)
+
+        counts = PlaylistUniqueViewers.counts(active, now.date())
+        playlists = list(Playlist.objects.filter(pk__in=active).only("pk"))
+        for playlist in playlists:
+            playlist.unique_viewers_7d = counts[playlist.pk][7]
+            playlist.unique_viewers_30d = counts[playlist.pk][30]
+        Playlist.objects.bulk_update(
+            playlists, ["unique_viewers_7d", "unique_viewers_30d"],
+            batch_size=content_cfg("COUNTER_FLUSH_CHUNK"),
+        )
+
+        zeroed = 0
+        if redis_active is not None:
+            # Only trust "not active" when the Redis index could actually be read.
+            zeroed = (
+                Playlist.objects.filter(unique_viewers_30d__gt=0)
+                .exclude(pk__in=active)
+                .update(unique_viewers_7d=0, unique_viewers_30d=0)
+            )
+
+        logger.info(
+            "content.unique_viewers action=refresh playlists=%d zeroed=%d",
+            len(playlists), zeroed,
+        )
+        return len(playlists) + zeroed
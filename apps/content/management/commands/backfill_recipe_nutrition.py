@@ -0,0 +1,38 @@
+"""
+Fill ``Recipe.protein_g`` / ``carbs_g`` / ``fat_g`` (and a zero
+``calories``) from ``nutrition_facts``.
+
+Saves keep the columns current; run this once after deploying the
+nutrition migration, and after bulk imports that bypass ``save()``::
+
+    python manage.py backfill_recipe_nutrition
+    python manage.py backfill_recipe_nutrition --chunk-size 500
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.content.logic.nutrition import backfill
+
+
+class Command(BaseCommand):
+    help = "Extract typed nutrition columns from Recipe.nutrition_facts in chunks."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size", type=int, default=None,
+            help="Recipes per bulk UPDATE (default: NUTRITION_BACKFILL_CHUNK).",
+        )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+
+        def progress(scanned, updated, last_pk):
+            if options["verbosity"] > 1:
+                self.stdout.write(f"  scanned {scanned} (updated {updated}) up to id {last_pk}")
+
+        updated = backfill(chunk_size=options["chunk_size"], progress=progress)
+        self.stdout.write(self.style.SUCCESS(
+            f"Updated {updated} recipe(s) in {(time.monotonic() - started) * 1000:.1f} ms",
+        ))
@@ -0,0 +1,123 @@
+"""
+Benchmark the ``values()`` projections against the Read serializers.
+
+Inserts ``--items`` rows per resource inside a transaction that is rolled
+back at the end, then times fetching and rendering one page both ways
+(cache not involved).  ``total`` includes the queries; ``python`` is
+``total`` minus the time the database spends executing and returning the
+same SQL through a bare cursor, i.e. model hydration plus serialization
+versus ``values()`` conversion plus ``render``::
+
+    python manage.py bench_projection
+    python manage.py bench_projection --items 100 --rounds 50
+"""
+
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory
+
+from apps.content.logic.projection import PROJECTIONS
+from apps.content.models import AmbientSound, BreathworkExercise, Deal, Playlist, Recipe, Session, Video
+
+
+class _Rollback(Exception):
+    pass
+
+
+def _seed(n: int) -> None:
+    playlists = Playlist.objects.bulk_create([Playlist(title=f"P{i}") for i in range(3)])
+    videos = Video.objects.bulk_create([
+        Video(title=f"Video {i}", duration_seconds=60 * i, is_published=True,
+              thumbnail=f"content/videos/{i}.jpg", video=f"content/videos/{i}.mp4")
+        for i in range(n)
+    ])
+    Video.playlist.through.objects.bulk_create([
+        Video.playlist.through(video_id=v.pk, playlist_id=p.pk) for v in videos for p in playlists
+    ])
+    Session.objects.bulk_create([
+        Session(title=f"Session {i}", category="yoga", video=videos[i], thumbnail=f"s/{i}.png",
+                benefits=["calm", "focus"], instructions=["Sit", "Breathe"], is_published=True)
+        for i in range(n)
+    ])
+    Recipe.objects.bulk_create([
+        Recipe(title=f"Recipe {i}", meal_type="lunch", prep_time_minutes=i, cook_time_minutes=30,
+               protein_g=12.5, ingredients=[{"item": "Dal", "key": "dal"}] * 5,
+               steps=[{"order": 1, "instruction": "Cook"}] * 5, tags=["quick"], is_published=True)
+        for i in range(n)
+    ])
+    Deal.objects.bulk_create([
+        Deal(item_name=f"Deal {i}", price="₹20/bunch", price_amount=20, original_amount=25,
+             discount_percent=20, expires_at=timezone.now() + timedelta(days=1))
+        for i in range(n)
+    ])
+    BreathworkExercise.objects.bulk_create([
+        BreathworkExercise(title=f"B{i}", pattern="4-7-8", duration="5 min", order=i) for i in range(n)
+    ])
+    AmbientSound.objects.bulk_create([AmbientSound(name=f"S{i}", emoji="🌧", order=i) for i in range(n)])
+
+
+def _timed(fn, rounds: int) -> float:
+    fn()
+    started = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - started) * 1000 / rounds
+
+
+def _cursor_time(querysets, rounds: int) -> float:
+    """Milliseconds to execute and fetch the SQL of ``querysets`` through a bare cursor."""
+    statements = [qs.query.sql_with_params() for qs in querysets]
+
+    def run():
+        with connection.cursor() as cursor:
+            for sql, params in statements:
+                cursor.execute(sql, params)
+                cursor.fetchall()
+
+    return _timed(run, rounds)
+
+
+class Command(BaseCommand):
+    help = "Time list pages rendered via values() projections vs ModelSerializer."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--items", type=int, default=100, help="Rows per page (default 100).")
+        parser.add_argument("--rounds", type=int, default=30, help="Pages per variant (default 30).")
+
+    def handle(self, *args, **options):
+        n, rounds = options["items"], options["rounds"]
+        context = {"request": APIRequestFactory().get("/api/content/")}
+        try:
+            with transaction.atomic():
+                _seed(n)
+                self.stdout.write(f"{n} rows per page x {rounds} rounds")
+                for model, projection in PROJECTIONS.items():
+                    qs = model.objects.order_by("pk")[:n]
+                    if model is Video:
+                        qs = qs.prefetch_related("playlist")
+                    elif model is Session:
+                        qs = qs.select_related("video")
+                    values_qs = qs.prefetch_related(None).values(*projection.columns, **projection.plan[1])
+                    sql = {"serializer": [qs], "projection": [values_qs]}
+                    if model is Video:
+                        playlist_ids = Video.playlist.through.objects.filter(video__in=[v.pk for v in qs])
+                        sql = {key: [*querysets, playlist_ids] for key, querysets in sql.items()}
+                    runs = {
+                        "serializer": lambda: projection.serializer_class(qs.all(), many=True, context=context).data,
+                        "projection": lambda: projection.data(qs, context),
+                    }
+                    total = {name: _timed(run, rounds) for name, run in runs.items()}
+                    python = {name: max(total[name] - _cursor_time(sql[name], rounds), 0.001) for name in runs}
+                    self.stdout.write(
+                        f"  {model.__name__:<18} total {total['serializer']:6.2f} -> {total['projection']:6.2f} ms"
+                        f" (x{total['serializer'] / total['projection']:4.1f})   "
+                        f"python {python['serializer']:6.2f} -> {python['projection']:6.2f} ms"
+                        f" (x{python['serializer'] / python['projection']:4.1f})",
+                    )
+                raise _Rollback
+        except _Rollback:
+            pass
@@ -0,0 +1,81 @@
+"""
+Benchmark envelope rendering for a large list page.
+
+Compares, for ``--items`` synthetic recipe-shaped rows:
+
+* ``drf``       stock ``JSONRenderer`` on the full envelope (the old path)
+* ``fast``      ``ApiJSONRenderer`` on the same dicts
+* ``fragments`` ``ApiJSONRenderer`` with every row a cached ``RawJSON``
+* ``compact``   as ``fragments``, with ``X-Envelope: compact``
+
+No database access::
+
+    python manage.py bench_rendering
+    python manage.py bench_rendering --items 500 --rounds 200
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+from rest_framework.renderers import JSONRenderer
+
+from utilities.response import ApiJSONRenderer, RawJSON, _build_payload, encode_json, ujson
+
+
+def _item(i: int) -> dict:
+    return {
+        "id": i, "title": f"Paneer Tikka Masala #{i}", "description": "Smoky, creamy and high in protein. " * 4,
+        "meal_type": "dinner", "diet_tag": "vegetarian", "cuisine": "Indian", "difficulty": "beginner",
+        "prep_time_minutes": 15, "cook_time_minutes": 25, "total_time_minutes": 40,
+        "total_time_display": "40 min", "servings": 2, "calories": 420, "calories_display": "420 kcal",
+        "protein_g": 28.5, "carbs_g": 30.0, "fat_g": 18.2, "icon_name": "Restaurant", "color_hex": "#E07A5F",
+        "thumbnail": f"https://ik.imagekit.io/ahara/content/recipes/thumbnails/{i}.jpg",
+        "thumbnail_file_id": f"file_{i:08d}",
+        "ingredients": [{"item": "Paneer", "quantity": "200", "unit": "g", "key": "paneer"}] * 6,
+        "steps": [{"order": n, "instruction": "Stir and simmer gently."} for n in range(1, 7)],
+        "nutrition_facts": {"protein": "28g", "carbs": "30g", "fat": "18g"},
+        "tags": ["high-protein", "quick", "north-indian"],
+        "is_published": True, "is_featured": False,
+        "created_at": "2026-01-01T10:00:00.123456Z", "updated_at": "2026-01-02T10:00:00.123456Z",
+    }
+
+
+class Command(BaseCommand):
+    help = "Time envelope rendering: stock DRF vs ujson renderer vs pre-encoded fragments."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--items", type=int, default=100, help="Rows per page (default 100).")
+        parser.add_argument("--rounds", type=int, default=300, help="Renders per variant (default 300).")
+
+    def handle(self, *args, **options):
+        n, rounds = options["items"], options["rounds"]
+        factory = RequestFactory()
+        request = factory.get("/api/content/recipes/", {"page": 1, "page_size": n})
+        compact = factory.get("/api/content/recipes/", HTTP_X_ENVELOPE="compact")
+        meta = {"page": 1, "page_size": n, "total": 10 * n, "has_next": True}
+        items = [_item(i) for i in range(n)]
+        fragments = [RawJSON(encode_json(item)) for item in items]
+        drf, fast = JSONRenderer(), ApiJSONRenderer()
+
+        def envelope(req, rows):
+            return _build_payload(req, data={"items": rows, "count": 10 * n}, meta=meta, message="ok")
+
+        variants = {
+            "drf": lambda: drf.render(envelope(request, items)),
+            "fast": lambda: fast.render(envelope(request, items)),
+            "fragments": lambda: fast.render(envelope(request, fragments)),
+            "compact": lambda: fast.render(envelope(compact, fragments)),
+        }
+        self.stdout.write(f"{n} items x {rounds} rounds (encoder: {'ujson' if ujson else 'stdlib json'})")
+        baseline = None
+        for name, render in variants.items():
+            size = len(render())
+            started = time.perf_counter()
+            for _ in range(rounds):
+                render()
+            per_call = (time.perf_counter() - started) * 1000 / rounds
+            baseline = baseline or per_call
+            self.stdout.write(
+                f"  {name:<10} {per_call:8.3f} ms/render  {size:>9,} bytes  x{baseline / per_call:5.1f}",
+            )
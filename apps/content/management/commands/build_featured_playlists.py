@@ -0,0 +1,22 @@
+"""
+Pre-render the featured-playlist payload into the cache.
+
+Run from cron more often than FEATURED_TTL so requests never see a miss::
+
+    python manage.py build_featured_playlists
+"""
+
+from django.core.management.base import BaseCommand
+
+from apps.content.logic.featured import FeaturedPlaylists
+
+
+class Command(BaseCommand):
+    help = "Rank, serialize and cache the featured playlists (bytes + ETag + Last-Modified)."
+
+    def handle(self, *args, **options):
+        entry = FeaturedPlaylists.rebuild()
+        self.stdout.write(
+            f"Cached {entry['count']} featured playlist(s), {len(entry['body'].encode())} bytes, "
+            f"ETag {entry['etag']}",
+        )
@@ -0,0 +1,21 @@
+"""
+Deactivate deals whose ``expires_at`` has passed.
+
+The deals endpoint already hides expired rows; this keeps them out of the
+``is_active`` partial indexes too.  Schedule it frequently (e.g. every
+15 minutes)::
+
+    python manage.py deactivate_expired_deals
+"""
+
+from django.core.management.base import BaseCommand
+
+from apps.content.logic.deals import sweep_expired
+
+
+class Command(BaseCommand):
+    help = "Set is_active=False on every deal past expires_at (one bulk UPDATE)."
+
+    def handle(self, *args, **options):
+        swept = sweep_expired()
+        self.stdout.write(self.style.SUCCESS(f"Deactivated {swept} expired deal(s)"))
@@ -0,0 +1,44 @@
+"""
+Rebuild the weighted ``search_vector`` columns used by /search.
+
+Saves keep the vectors current; run this after deploying the search
+migration, after changing ``SEARCH_CONFIG`` or the weighted fields, or
+after bulk imports that bypass ``save()``::
+
+    python manage.py rebuild_search_index
+    python manage.py rebuild_search_index --type recipe --type video
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from apps.content.logic.search import SEARCH_SPECS, ContentSearch
+
+
+class Command(BaseCommand):
+    help = "Recompute search_vector for recipes, sessions, videos and playlists."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--type", action="append", dest="types", choices=sorted(SEARCH_SPECS),
+            help="Content type to rebuild (repeatable; default: all).",
+        )
+        parser.add_argument(
+            "--chunk-size", type=int, default=None,
+            help="Rows per bulk UPDATE (default: SEARCH_REBUILD_CHUNK).",
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("Full-text search vectors require PostgreSQL.")
+
+        started = time.monotonic()
+        summary = ContentSearch.rebuild(types=options["types"], chunk_size=options["chunk_size"])
+        for name, rows in summary.items():
+            self.stdout.write(f"  {name}: {rows} row(s)")
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {sum(summary.values())} search vector(s) in "
+            f"{(time.monotonic() - started) * 1000:.1f} ms",
+        ))
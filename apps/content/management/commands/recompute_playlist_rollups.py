@@ -0,0 +1,39 @@
+"""
+Recompute counter-derived Playlist rates across the whole catalog.
+
+Nightly job — one set-based UPDATE per chunk of playlists::
+
+    python manage.py recompute_playlist_rollups
+    python manage.py recompute_playlist_rollups --chunk-size 10000
+"""
+
+from django.core.management.base import BaseCommand
+
+from apps.content.logic.rollups import recompute_playlist_rates
+
+
+class Command(BaseCommand):
+    help = "Recompute ctr, completion_rate and avg_watch_seconds for every playlist."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size", type=int, default=None,
+            help="Playlists per UPDATE (default: ROLLUP_RECOMPUTE_CHUNK).",
+        )
+        parser.add_argument(
+            "--quiet", action="store_true",
+            help="Only print the final summary.",
+        )
+
+    def handle(self, *args, **options):
+        def progress(chunk, rows, last_pk, ms):
+            self.stdout.write(f"  chunk {chunk}: {rows} playlist(s) up to id {last_pk} in {ms:.1f} ms")
+
+        summary = recompute_playlist_rates(
+            chunk_size=options["chunk_size"],
+            progress=None if options["quiet"] else progress,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Recomputed {summary['playlists']} playlist(s) in {summary['chunks']} chunk(s), "
+            f"{summary['ms']:.1f} ms",
+        ))
@@ -0,0 +1,21 @@
+"""
+Recompute ``Category.item_count`` from the published sessions.
+
+Session saves and deletes keep the counts current incrementally; bulk
+``update()`` calls and raw imports bypass those signals, so schedule this
+periodically (e.g. nightly) to repair any drift::
+
+    python manage.py reconcile_category_counts
+"""
+
+from django.core.management.base import BaseCommand
+
+from apps.content.logic.facets import CategoryCounts
+
+
+class Command(BaseCommand):
+    help = "Recompute Category.item_count with one GROUP BY and fix any drift."
+
+    def handle(self, *args, **options):
+        corrected = CategoryCounts.reconcile()
+        self.stdout.write(self.style.SUCCESS(f"Corrected {corrected} category count(s)"))
@@ -0,0 +1,25 @@
+"""
+Roll per-day HyperLogLog sketches up into Playlist.unique_viewers_7d/30d.
+
+Run from cron (hourly is plenty)::
+
+    python manage.py refresh_unique_viewers
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.content.logic.unique_viewers import PlaylistUniqueViewers
+
+
+class Command(BaseCommand):
+    help = "Refresh approximate 7/30-day unique viewer counts for recently active playlists."
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        updated = PlaylistUniqueViewers.refresh()
+        self.stdout.write(
+            f"Refreshed unique viewers for {updated} playlist(s) "
+            f"in {(time.monotonic() - started) * 1000:.1f} ms",
+        )
@@ -0,0 +1,66 @@
+"""
+Fold new PlaylistEvent rows into the cached Playlist rollups.
+
+Run from cron, or keep it running with ``--loop``::
+
+    python manage.py rollup_playlist_events
+    python manage.py rollup_playlist_events --loop --interval 60
+    python manage.py rollup_playlist_events --prune
+"""
+
+import logging
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from apps.content.logic.events import PlaylistEventLog
+from apps.content.logic.rollups import PlaylistRollupEngine
+
+logger = logging.getLogger("content.rollups")
+
+
+class Command(BaseCommand):
+    help = "Incrementally roll up playlist events into ctr/completion/bounce/progress/breakdown."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--loop", action="store_true",
+            help="Keep rolling up every --interval seconds until interrupted.",
+        )
+        parser.add_argument(
+            "--interval", type=float, default=60.0,
+            help="Seconds between runs in --loop mode (default: 60).",
+        )
+        parser.add_argument(
+            "--prune", action="store_true",
+            help="Afterwards drop rolled-up days older than EVENT_RETENTION_DAYS.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            started = time.monotonic()
+            try:
+                self._run_once(options)
+            except Exception:
+                if not options["loop"]:
+                    raise
+                # The cursor only moves on commit, so the next run picks up where this one failed.
+                logger.exception("content.rollups action=loop_run_failed")
+                if connection.connection is not None and not connection.is_usable():
+                    connection.close()  # reconnect on the next run
+            if not options["loop"]:
+                return
+            time.sleep(max(0.0, options["interval"] - (time.monotonic() - started)))
+
+    def _run_once(self, options):
+        summary = PlaylistRollupEngine.run()
+        if summary["events"] or not options["loop"]:
+            self.stdout.write(
+                f"Rolled up {summary['events']} event(s) into {summary['playlists']} "
+                f"playlist(s) in {summary['ms']:.1f} ms",
+            )
+        if options["prune"]:
+            deleted = PlaylistEventLog.prune()
+            if deleted:
+                self.stdout.write(f"Pruned {deleted} expired event(s)")
@@ -0,0 +1,70 @@
+# Generated by Django 5.1.11 on 2026-10-17 00:06
+
+import django.core.validators
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0005_deal_deal_expires_at_idx_playlist_playlist_type_idx_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlaylistRollup',
+            fields=[
+                ('playlist', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='rollup', serialize=False, to='content.playlist')),
+                ('starts', models.PositiveBigIntegerField(default=0)),
+                ('bounces', models.PositiveBigIntegerField(default=0, help_text='Exits below the bounce threshold.')),
+                ('progress_sum', models.PositiveBigIntegerField(default=0)),
+                ('progress_samples', models.PositiveBigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated At')),
+            ],
+            options={
+                'verbose_name': 'Playlist Rollup',
+                'verbose_name_plural': 'Playlist Rollups',
+            },
+        ),
+        migrations.CreateModel(
+            name='RollupCursor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=64, unique=True, verbose_name='Name')),
+                ('last_id', models.BigIntegerField(default=0, verbose_name='Last Event ID')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated At')),
+            ],
+            options={
+                'verbose_name': 'Rollup Cursor',
+                'verbose_name_plural': 'Rollup Cursors',
+            },
+        ),
+        migrations.AlterField(
+            model_name='playlist',
+            name='breakdown',
+            field=models.JSONField(blank=True, help_text='Event counts by device/language, e.g. {"device": {"ios": {"click": 3}}}. Maintained by the event rollup job.', null=True),
+        ),
+        migrations.CreateModel(
+            name='PlaylistEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(help_text='Partition/retention key (UTC date received).', verbose_name='Day')),
+                ('occurred_at', models.DateTimeField(verbose_name='Received At')),
+                ('event_type', models.CharField(choices=[('impression', 'Impression'), ('click', 'Click'), ('start', 'Start'), ('complete', 'Complete'), ('exit', 'Exit')], max_length=16, verbose_name='Event Type')),
+                ('watch_seconds', models.PositiveIntegerField(default=0, verbose_name='Watch Seconds')),
+                ('progress_pct', models.PositiveSmallIntegerField(blank=True, null=True, validators=[django.core.validators.MaxValueValidator(100)], verbose_name='Progress %')),
+                ('device', models.CharField(blank=True, default='', max_length=16, verbose_name='Device')),
+                ('language', models.CharField(blank=True, default='', max_length=16, verbose_name='Language')),
+                ('playlist', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='events', to='content.playlist')),
+                ('user', models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Playlist Event',
+                'verbose_name_plural': 'Playlist Events',
+                'indexes': [models.Index(fields=['day'], name='plevent_day_idx'), models.Index(fields=['playlist', 'day'], name='plevent_playlist_day_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.11 on 2026-10-17 00:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0006_playlistrollup_rollupcursor_alter_playlist_breakdown_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='playlist',
+            name='unique_viewers_30d',
+            field=models.PositiveIntegerField(default=0, help_text='Distinct viewers, last 30 days (≈0.8% error).'),
+        ),
+        migrations.AddField(
+            model_name='playlist',
+            name='unique_viewers_7d',
+            field=models.PositiveIntegerField(default=0, help_text='Distinct viewers, last 7 days (≈0.8% error).'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.11 on 2026-10-17 00:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0008_playlist_search_vector_recipe_search_vector_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='category',
+            name='item_count',
+            field=models.PositiveIntegerField(default=0, help_text='Published sessions whose category matches this name. Maintained on session save/delete; repaired by reconcile_category_counts.', verbose_name='Item Count'),
+        ),
+    ]
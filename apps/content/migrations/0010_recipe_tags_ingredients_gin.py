@@ -0,0 +1,70 @@
+# Generated by Django 5.1.11 on 2026-10-17 00:32
+
+import re
+
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+# Frozen copies of apps.content.logic.recipe_filters as of this migration, so
+# later changes to the live normalisers cannot change what this data step does.
+_TAG_SEPARATORS = re.compile(r"[\s_]+")
+
+
+def normalize_tags(tags):
+    if not isinstance(tags, list):
+        return tags
+    slugs = (_TAG_SEPARATORS.sub("-", t.strip().lower()).strip("-") for t in tags if isinstance(t, str))
+    return list(dict.fromkeys(t for t in slugs if t))
+
+
+def normalize_ingredients(ingredients):
+    if not isinstance(ingredients, list):
+        return ingredients
+    for entry in ingredients:
+        if isinstance(entry, dict) and isinstance(entry.get("item"), str):
+            entry["key"] = " ".join(entry["item"].lower().split())
+    return ingredients
+
+
+def normalize_existing(apps, schema_editor):
+    """Rewrite stored tags / ingredients in the spelling the filters query for."""
+    Recipe = apps.get_model("content", "Recipe")
+    batch = []
+    for recipe in Recipe.objects.only("pk", "tags", "ingredients").iterator(chunk_size=500):
+        recipe.tags = normalize_tags(recipe.tags)
+        recipe.ingredients = normalize_ingredients(recipe.ingredients)
+        batch.append(recipe)
+        if len(batch) >= 500:
+            Recipe.objects.bulk_update(batch, ["tags", "ingredients"])
+            batch = []
+    if batch:
+        Recipe.objects.bulk_update(batch, ["tags", "ingredients"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0009_alter_category_item_count'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='recipe',
+            name='ingredients',
+            field=models.JSONField(blank=True, default=list, help_text='[{"item":"Oats","quantity":"1","unit":"cup"}, ...] ("key" is added on save for filtering)', verbose_name='Ingredients'),
+        ),
+        migrations.AlterField(
+            model_name='recipe',
+            name='tags',
+            field=models.JSONField(blank=True, default=list, help_text='["high-fiber","quick","budget-friendly"] (lower-cased and hyphenated on save)', verbose_name='Tags'),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['tags'], name='recipe_tags_gin', opclasses=['jsonb_path_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['ingredients'], name='recipe_ingredients_gin', opclasses=['jsonb_path_ops']),
+        ),
+        migrations.RunPython(normalize_existing, migrations.RunPython.noop, elidable=True),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.1.11 on 2026-10-17 00:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0010_recipe_tags_ingredients_gin'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='carbs_g',
+            field=models.FloatField(blank=True, editable=False, null=True, verbose_name='Carbs (g)'),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='fat_g',
+            field=models.FloatField(blank=True, editable=False, null=True, verbose_name='Fat (g)'),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='protein_g',
+            field=models.FloatField(blank=True, editable=False, null=True, verbose_name='Protein (g)'),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['calories'], name='recipe_calories_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['protein_g'], name='recipe_protein_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['carbs_g'], name='recipe_carbs_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['fat_g'], name='recipe_fat_idx'),
+        ),
+    ]
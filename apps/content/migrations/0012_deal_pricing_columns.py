@@ -0,0 +1,83 @@
+# Generated by Django 5.1.11 on 2026-10-17 00:36
+
+import re
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+
+from django.db import migrations, models
+
+# Frozen copy of apps.content.logic.deals pricing as of this migration, so
+# later changes to the live parser cannot change what this data step does.
+_AMOUNT = re.compile(r"\d+(?:,\d{3})*(?:\.\d+)?|\.\d+")
+_UNIT = re.compile(r"(?:/|\bper\b)\s*([^\d\s/][^/]*)$", re.IGNORECASE)
+_CENT = Decimal("0.01")
+_AMOUNT_LIMIT = Decimal(10) ** 8  # DecimalField(max_digits=10, decimal_places=2)
+
+
+def parse_price(text):
+    text = (text or "").strip()
+    match = _AMOUNT.search(text)
+    if not match:
+        return None, ""
+    try:
+        amount = Decimal(match.group().replace(",", "")).quantize(_CENT, rounding=ROUND_HALF_UP)
+    except InvalidOperation:
+        return None, ""
+    if amount >= _AMOUNT_LIMIT:
+        return None, ""  # would not fit price_amount / original_amount
+    unit = _UNIT.search(text[match.end():])
+    return amount, (unit.group(1).strip().lower()[:32] if unit else "")
+
+
+def parse_existing(apps, schema_editor):
+    Deal = apps.get_model("content", "Deal")
+    deals = list(Deal.objects.only("pk", "price", "original_price"))
+    for deal in deals:
+        deal.price_amount, deal.price_unit = parse_price(deal.price)
+        deal.original_amount, _ = parse_price(deal.original_price)
+        price, original = deal.price_amount, deal.original_amount
+        deal.discount_percent = (
+            None if price is None or not original or price > original
+            else int((original - price) * 100 / original)
+        )
+    Deal.objects.bulk_update(
+        deals, ["price_amount", "original_amount", "price_unit", "discount_percent"], batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0011_recipe_nutrition_columns'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='deal',
+            name='discount_percent',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True, verbose_name='Discount %'),
+        ),
+        migrations.AddField(
+            model_name='deal',
+            name='original_amount',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, max_digits=10, null=True, verbose_name='Original Amount'),
+        ),
+        migrations.AddField(
+            model_name='deal',
+            name='price_amount',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, max_digits=10, null=True, verbose_name='Price Amount'),
+        ),
+        migrations.AddField(
+            model_name='deal',
+            name='price_unit',
+            field=models.CharField(blank=True, default='', editable=False, max_length=32, verbose_name='Price Unit'),
+        ),
+        migrations.AddIndex(
+            model_name='deal',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-created_at'], name='deal_active_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='deal',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-discount_percent', '-created_at'], name='deal_active_discount_idx'),
+        ),
+        migrations.RunPython(parse_existing, migrations.RunPython.noop, elidable=True),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.1.11 on 2026-10-17 01:34
+
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def move_keys_out_of_ingredients(apps, schema_editor):
+    """
+    Fill ingredient_keys and drop the "key" entries 0010 wrote into
+    ingredients; updated_at moves so cached list fragments are not reused.
+    """
+    Recipe = apps.get_model("content", "Recipe")
+    now = timezone.now()
+    batch = []
+    for recipe in Recipe.objects.only("pk", "ingredients", "updated_at").iterator(chunk_size=500):
+        ingredients = recipe.ingredients if isinstance(recipe.ingredients, list) else []
+        keys = []
+        for entry in ingredients:
+            if isinstance(entry, dict):
+                entry.pop("key", None)
+                if isinstance(entry.get("item"), str):
+                    keys.append(" ".join(entry["item"].lower().split()))
+        recipe.ingredient_keys = list(dict.fromkeys(k for k in keys if k))
+        recipe.updated_at = now
+        batch.append(recipe)
+        if len(batch) >= 500:
+            Recipe.objects.bulk_update(batch, ["ingredients", "ingredient_keys", "updated_at"])
+            batch = []
+    if batch:
+        Recipe.objects.bulk_update(batch, ["ingredients", "ingredient_keys", "updated_at"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0012_deal_pricing_columns'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='recipe',
+            name='recipe_ingredients_gin',
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='ingredient_keys',
+            field=models.JSONField(blank=True, default=list, editable=False, verbose_name='Ingredient Keys'),
+        ),
+        migrations.AlterField(
+            model_name='recipe',
+            name='ingredients',
+            field=models.JSONField(blank=True, default=list, help_text='[{"item":"Oats","quantity":"1","unit":"cup"}, ...]', verbose_name='Ingredients'),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['ingredient_keys'], name='recipe_ingredient_keys_gin', opclasses=['jsonb_path_ops']),
+        ),
+        migrations.RunPython(move_keys_out_of_ingredients, migrations.RunPython.noop, elidable=True),
+    ]
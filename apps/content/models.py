@@ -1,9 +1,12 @@
-from datetime import timezone
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.db.models import Case, ExpressionWrapper, F, FloatField, Value, When
 from django.db.models.functions import Cast
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
+from utilities.db import update_returning
 from utilities.enums import (ContentGenreEnum,LanguageEnum,CTypeEnum,DifficultyLevelEnum)
 from utilities.storages import ImageKitStorage
 
@@ -46,6 +49,9 @@ class Playlist(models.Model):
         editable=False
     )
 
+    # Weighted tsvector maintained by logic.search on save (PostgreSQL only).
+    search_vector = SearchVectorField(_("Search Vector"), null=True, blank=True, editable=False)
+
     created_at = models.DateTimeField(_("Created At"), auto_now_add=True)
     updated_at = models.DateTimeField(_("Updated At"), auto_now=True)
 
@@ -56,6 +62,10 @@ class Playlist(models.Model):
     starts = models.PositiveBigIntegerField(default=0, help_text=_("First play started (at least 1s)."))
     completes = models.PositiveBigIntegerField(default=0, help_text=_("Completed all items or 90% avg."))
 
+    # Approximate distinct viewers (HyperLogLog rollup, see logic.unique_viewers)
+    unique_viewers_7d = models.PositiveIntegerField(default=0, help_text=_("Distinct viewers, last 7 days (≈0.8% error)."))
+    unique_viewers_30d = models.PositiveIntegerField(default=0, help_text=_("Distinct viewers, last 30 days (≈0.8% error)."))
+
     # Interaction signals
     likes = models.PositiveBigIntegerField(default=0)
     bookmarks = models.PositiveBigIntegerField(default=0, help_text=_("Saves/‘watch later’."))
@@ -99,12 +109,11 @@ class Playlist(models.Model):
     last_completed_at = models.DateTimeField(null=True, blank=True)
     last_interaction_at = models.DateTimeField(null=True, blank=True)
 
-    # DEPRECATED — nothing currently writes to this field.
-    # Either implement a nightly analytics rollup task (see FURTHER_OPTIMIZATIONS §7.1)
-    # or remove this field and its migration in the next cleanup pass.
+    # Maintained by the PlaylistEvent rollup engine (apps.content.logic.rollups).
     breakdown = models.JSONField(
         null=True, blank=True,
-        help_text=_("Cached breakdown by device/geo. Currently unpopulated — reserved for future rollup task.")
+        help_text=_("Event counts by device/language, e.g. {\"device\": {\"ios\": {\"click\": 3}}}. "
+                    "Maintained by the event rollup job.")
     )
 
     class Meta:
@@ -120,6 +129,7 @@ class Playlist(models.Model):
             # alone can use an index without needing the composite prefix.
             models.Index(fields=("playlist_type",), name="playlist_type_idx"),
             models.Index(fields=("language",), name="playlist_language_idx"),
+            GinIndex(fields=("search_vector",), name="playlist_search_gin"),
         ]
 
     def __str__(self):
@@ -139,31 +149,77 @@ class Playlist(models.Model):
         return float(self.completes) / self.starts if self.starts else 0.0
 
     # ---------- Safe atomic updaters (use in services/tasks) ----------
+    @staticmethod
+    def _hit_updates(event_type: str, when) -> tuple[str, dict]:
+        """``(counter, update kwargs)`` for one funnel event."""
+        from apps.content.logic.counters import COUNTER_TIMESTAMPS, EVENT_COUNTERS
+
+        counter = EVENT_COUNTERS[event_type]
+        when = when or timezone.now()
+        return counter, {
+            counter: F(counter) + 1,
+            **{field: when for field in COUNTER_TIMESTAMPS[counter]},
+        }
+
+    def _bump(self, event_type: str, when=None):
+        """
+        Increment one funnel counter and feed trending.  The new value comes
+        back from the UPDATE itself (RETURNING) and is set on ``self``; in
+        write-behind mode the increment is buffered and ``None`` returned.
+        """
+        from apps.content.logic.counter_buffer import PlaylistCounterBuffer
+        from apps.content.logic.trending import PlaylistTrending
+
+        PlaylistTrending.record(self.pk, self.playlist_type, self.language, event_type)
+        counter, updates = self._hit_updates(event_type, when)
+        if PlaylistCounterBuffer.enabled():
+            PlaylistCounterBuffer.incr(self.pk, counter)
+            return None
+        rows = update_returning(self.__class__.objects.filter(pk=self.pk), list(updates), **updates)
+        if not rows:
+            return None
+        for field in updates:
+            setattr(self, field, getattr(rows[0], field))
+        return getattr(self, counter)
+
     def inc_impression(self, when=None):
-        self.__class__.objects.filter(pk=self.pk).update(
-            impressions=F("impressions") + 1,
-            last_impressed_at=when or timezone.now(),
-        )
+        return self._bump("impression", when)
 
     def inc_click(self, when=None):
-        self.__class__.objects.filter(pk=self.pk).update(
-            clicks=F("clicks") + 1,
-            last_clicked_at=when or timezone.now(),
-        )
+        return self._bump("click", when)
 
     def inc_start(self, when=None):
-        self.__class__.objects.filter(pk=self.pk).update(
-            starts=F("starts") + 1,
-            last_started_at=when or timezone.now(),
-            last_interaction_at=when or timezone.now(),
-        )
+        return self._bump("start", when)
 
     def inc_complete(self, when=None):
-        self.__class__.objects.filter(pk=self.pk).update(
-            completes=F("completes") + 1,
-            last_completed_at=when or timezone.now(),
-            last_interaction_at=when or timezone.now(),
-        )
+        return self._bump("complete", when)
+
+    @classmethod
+    def record_hit(cls, pk, event_type: str, when=None):
+        """
+        Record one funnel event for playlist ``pk`` and return the full,
+        post-increment row — a single ``UPDATE ... RETURNING`` instead of
+        SELECT + UPDATE + refresh.  Returns ``None`` if the playlist does
+        not exist.  In write-behind mode the row is read and the pending
+        deltas are overlaid so counters still look live.
+        """
+        from apps.content.logic.counter_buffer import PlaylistCounterBuffer
+        from apps.content.logic.trending import PlaylistTrending
+
+        if PlaylistCounterBuffer.enabled():
+            obj = cls.objects.filter(pk=pk).first()
+            if obj is not None:
+                obj._bump(event_type, when)
+                PlaylistCounterBuffer.overlay(obj)
+            return obj
+
+        _, updates = cls._hit_updates(event_type, when)
+        rows = update_returning(cls.objects.filter(pk=pk), **updates)
+        if not rows:
+            return None
+        obj = rows[0]
+        PlaylistTrending.record(obj.pk, obj.playlist_type, obj.language, event_type)
+        return obj
 
     def add_watch_time(self, seconds: int):
         """Increment total_watch_seconds and recompute avg_watch_seconds in one UPDATE.
@@ -189,22 +245,111 @@ class Playlist(models.Model):
         )
 
     def add_rating(self, stars: int):
+        """Add one 1–5 star rating; the new totals are returned by the UPDATE and set on ``self``."""
         stars = int(stars or 0)
         stars = min(max(stars, 1), 5)
-        self.__class__.objects.filter(pk=self.pk).update(
+        rows = update_returning(
+            self.__class__.objects.filter(pk=self.pk), ["rating_count", "rating_sum"],
             rating_count=F("rating_count") + 1,
-            rating_sum=F("rating_sum") + stars
+            rating_sum=F("rating_sum") + stars,
         )
+        if rows:
+            self.rating_count, self.rating_sum = rows[0].rating_count, rows[0].rating_sum
+        return self
 
     def recompute_rollups(self):
-        """Call from a nightly task to keep cached rates fresh without hot-path cost."""
-        ctr = (self.clicks / self.impressions) if self.impressions else 0.0
-        completion = (self.completes / self.starts) if self.starts else 0.0
-        # bounce_rate should be computed from event table; keep as is or update here.
-        self.__class__.objects.filter(pk=self.pk).update(
-            ctr=ctr, completion_rate=completion
-        )
-    
+        """Refresh the counter-derived rates for this playlist in one UPDATE.
+
+        Catalog-wide refreshes should use ``manage.py recompute_playlist_rollups``.
+        bounce_rate / avg_progress_pct / breakdown come from the event log —
+        see ``manage.py rollup_playlist_events``.
+        """
+        from apps.content.logic.rollups import recompute_playlist_rates
+
+        recompute_playlist_rates(self.__class__.objects.filter(pk=self.pk))
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# PlaylistEvent — Append-only raw analytics log (+ rollup state)
+# ═══════════════════════════════════════════════════════════════════════
+
+class PlaylistEvent(models.Model):
+    """
+    One raw analytics event.  Rows are only ever inserted (in batches) and
+    pruned a whole ``day`` at a time; the rollup job folds them into the
+    cached Playlist rates past a stored high-water mark.
+    """
+
+    class EventType(models.TextChoices):
+        IMPRESSION = "impression", _("Impression")
+        CLICK = "click", _("Click")
+        START = "start", _("Start")
+        COMPLETE = "complete", _("Complete")
+        EXIT = "exit", _("Exit")  # left before completing; carries watch_seconds/progress_pct
+
+    day = models.DateField(_("Day"), help_text=_("Partition/retention key (UTC date received)."))
+    occurred_at = models.DateTimeField(_("Received At"))
+
+    playlist = models.ForeignKey(Playlist, on_delete=models.CASCADE, related_name="events",
+                                 db_index=False)  # covered by (playlist, day)
+    user = models.ForeignKey("users.User", on_delete=models.SET_NULL, null=True, blank=True,
+                             related_name="+", db_index=False)
+    event_type = models.CharField(_("Event Type"), max_length=16, choices=EventType.choices)
+
+    watch_seconds = models.PositiveIntegerField(_("Watch Seconds"), default=0)
+    progress_pct = models.PositiveSmallIntegerField(
+        _("Progress %"), null=True, blank=True,
+        validators=[MaxValueValidator(100)],
+    )
+
+    # Breakdown dimensions
+    device = models.CharField(_("Device"), max_length=16, blank=True, default="")
+    language = models.CharField(_("Language"), max_length=16, blank=True, default="")
+
+    class Meta:
+        verbose_name = _("Playlist Event")
+        verbose_name_plural = _("Playlist Events")
+        indexes = [
+            models.Index(fields=["day"], name="plevent_day_idx"),
+            models.Index(fields=["playlist", "day"], name="plevent_playlist_day_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.event_type} — playlist {self.playlist_id} @ {self.occurred_at:%Y-%m-%d %H:%M}"
+
+
+class PlaylistRollup(models.Model):
+    """Running event-log accumulators behind ``Playlist.bounce_rate`` / ``avg_progress_pct``."""
+
+    playlist = models.OneToOneField(Playlist, on_delete=models.CASCADE, primary_key=True,
+                                    related_name="rollup")
+    starts = models.PositiveBigIntegerField(default=0)
+    bounces = models.PositiveBigIntegerField(default=0, help_text=_("Exits below the bounce threshold."))
+    progress_sum = models.PositiveBigIntegerField(default=0)
+    progress_samples = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(_("Updated At"), auto_now=True)
+
+    class Meta:
+        verbose_name = _("Playlist Rollup")
+        verbose_name_plural = _("Playlist Rollups")
+
+    def __str__(self):
+        return f"Rollup for playlist {self.playlist_id}"
+
+
+class RollupCursor(models.Model):
+    """High-water mark (last processed event id) for an incremental rollup job."""
+
+    name = models.CharField(_("Name"), max_length=64, unique=True)
+    last_id = models.BigIntegerField(_("Last Event ID"), default=0)
+    updated_at = models.DateTimeField(_("Updated At"), auto_now=True)
+
+    class Meta:
+        verbose_name = _("Rollup Cursor")
+        verbose_name_plural = _("Rollup Cursors")
+
+    def __str__(self):
+        return f"{self.name} @ {self.last_id}"
 
 
 class Video(models.Model):
@@ -311,6 +456,9 @@ class Video(models.Model):
     # AI metadata
     ai_pose_model_version = models.CharField(_("AI Pose Model Version"), max_length=100, null=True, blank=True)
 
+    # Weighted tsvector maintained by logic.search on save (PostgreSQL only).
+    search_vector = SearchVectorField(_("Search Vector"), null=True, blank=True, editable=False)
+
     created_at = models.DateTimeField(_("Created At"), auto_now_add=True)
     updated_at = models.DateTimeField(_("Updated At"), auto_now=True)
 
@@ -318,6 +466,9 @@ class Video(models.Model):
         verbose_name = _("Video")
         verbose_name_plural = _("Videos")
         ordering = ["-created_at"]
+        indexes = [
+            GinIndex(fields=["search_vector"], name="video_search_gin"),
+        ]
 
     def __str__(self):
         return self.title or f"Video {self.pk}"
@@ -380,6 +531,9 @@ class Session(models.Model):
     is_featured = models.BooleanField(_("Featured"), default=False, db_index=True)
     order = models.PositiveIntegerField(_("Display Order"), default=0, db_index=True)
 
+    # Weighted tsvector maintained by logic.search on save (PostgreSQL only).
+    search_vector = SearchVectorField(_("Search Vector"), null=True, blank=True, editable=False)
+
     created_at = models.DateTimeField(_("Created At"), auto_now_add=True)
     updated_at = models.DateTimeField(_("Updated At"), auto_now=True)
 
@@ -390,6 +544,7 @@ class Session(models.Model):
         indexes = [
             models.Index(fields=["category", "is_published"]),
             models.Index(fields=["difficulty"]),
+            GinIndex(fields=["search_vector"], name="session_search_gin"),
         ]
 
     def __str__(self):
@@ -437,6 +592,10 @@ class Recipe(models.Model):
                                   default=Session.DifficultyChoice.BEGINNER)
 
     calories = models.PositiveIntegerField(_("Calories (kcal)"), default=0)
+    # Extracted from nutrition_facts on save (logic.nutrition) for range filters and sorting.
+    protein_g = models.FloatField(_("Protein (g)"), null=True, blank=True, editable=False)
+    carbs_g = models.FloatField(_("Carbs (g)"), null=True, blank=True, editable=False)
+    fat_g = models.FloatField(_("Fat (g)"), null=True, blank=True, editable=False)
 
     icon_name = models.CharField(_("Icon Name"), max_length=100, blank=True, default="Restaurant")
     color_hex = models.CharField(_("Color Hex"), max_length=9, default="#E07A5F")
@@ -448,16 +607,22 @@ class Recipe(models.Model):
 
     ingredients = models.JSONField(_("Ingredients"), default=list, blank=True,
                                    help_text=_('[{"item":"Oats","quantity":"1","unit":"cup"}, ...]'))
+    # Normalised ``item`` names, rebuilt on save for the exclude_ingredient filter.
+    ingredient_keys = models.JSONField(_("Ingredient Keys"), default=list, blank=True, editable=False)
     steps = models.JSONField(_("Steps"), default=list, blank=True,
                              help_text=_('[{"order":1,"instruction":"Soak oats..."}, ...]'))
     nutrition_facts = models.JSONField(_("Nutrition Facts"), default=dict, blank=True,
                                        help_text=_('{"protein":"12g","carbs":"45g","fat":"8g",...}'))
     tags = models.JSONField(_("Tags"), default=list, blank=True,
-                            help_text=_('["high-fiber","quick","budget-friendly"]'))
+                            help_text=_('["high-fiber","quick","budget-friendly"] '
+                                        '(lower-cased and hyphenated on save)'))
 
     is_published = models.BooleanField(_("Published"), default=False, db_index=True)
     is_featured = models.BooleanField(_("Featured"), default=False, db_index=True)
 
+    # Weighted tsvector maintained by logic.search on save (PostgreSQL only).
+    search_vector = SearchVectorField(_("Search Vector"), null=True, blank=True, editable=False)
+
     created_at = models.DateTimeField(_("Created At"), auto_now_add=True)
     updated_at = models.DateTimeField(_("Updated At"), auto_now=True)
 
@@ -468,6 +633,14 @@ class Recipe(models.Model):
         indexes = [
             models.Index(fields=["meal_type", "is_published"]),
             models.Index(fields=["diet_tag"]),
+            GinIndex(fields=["search_vector"], name="recipe_search_gin"),
+            models.Index(fields=["calories"], name="recipe_calories_idx"),
+            models.Index(fields=["protein_g"], name="recipe_protein_idx"),
+            models.Index(fields=["carbs_g"], name="recipe_carbs_idx"),
+            models.Index(fields=["fat_g"], name="recipe_fat_idx"),
+            # Containment (@>) filters — see logic.recipe_filters.
+            GinIndex(fields=["tags"], name="recipe_tags_gin", opclasses=["jsonb_path_ops"]),
+            GinIndex(fields=["ingredient_keys"], name="recipe_ingredient_keys_gin", opclasses=["jsonb_path_ops"]),
         ]
 
     def __str__(self):
@@ -492,6 +665,13 @@ class Deal(models.Model):
 
     price = models.CharField(_("Price"), max_length=50, help_text=_("e.g. ₹20/bunch"))
     original_price = models.CharField(_("Original Price"), max_length=50, blank=True, default="")
+    # Parsed from price / original_price on save (logic.deals).
+    price_amount = models.DecimalField(_("Price Amount"), max_digits=10, decimal_places=2,
+                                       null=True, blank=True, editable=False)
+    original_amount = models.DecimalField(_("Original Amount"), max_digits=10, decimal_places=2,
+                                          null=True, blank=True, editable=False)
+    price_unit = models.CharField(_("Price Unit"), max_length=32, blank=True, default="", editable=False)
+    discount_percent = models.PositiveSmallIntegerField(_("Discount %"), null=True, blank=True, editable=False)
     location = models.CharField(_("Location"), max_length=255, blank=True, default="")
     available_at = models.CharField(_("Available At"), max_length=255, blank=True, default="",
                                     help_text=_("e.g. 'Mon–Sat, 7 AM – 1 PM'"))
@@ -514,6 +694,12 @@ class Deal(models.Model):
             models.Index(fields=["is_active", "-created_at"]),
             # Supports "active deals" filter (expires_at > NOW()) and cleanup tasks.
             models.Index(fields=["expires_at"], name="deal_expires_at_idx"),
+            # Partial indexes over the live set; deactivate_expired_deals keeps
+            # expired rows out of it (now() cannot appear in an index predicate).
+            models.Index(fields=["-created_at"], name="deal_active_recent_idx",
+                         condition=models.Q(is_active=True)),
+            models.Index(fields=["-discount_percent", "-created_at"], name="deal_active_discount_idx",
+                         condition=models.Q(is_active=True)),
         ]
 
     def __str__(self):
@@ -566,8 +752,11 @@ class Category(models.Model):
     color_hex = models.CharField(_("Color Hex"), max_length=9, default="#4A7C59")
     description = models.TextField(_("Description"), blank=True, default="")
 
-    item_count = models.PositiveIntegerField(_("Item Count"), default=0,
-                                             help_text=_("Cached count of items in this category."))
+    item_count = models.PositiveIntegerField(
+        _("Item Count"), default=0,
+        help_text=_("Published sessions whose category matches this name. Maintained on "
+                    "session save/delete; repaired by reconcile_category_counts."),
+    )
 
     is_active = models.BooleanField(_("Active"), default=True, db_index=True)
     order = models.PositiveIntegerField(_("Display Order"), default=0, db_index=True)
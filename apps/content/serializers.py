@@ -5,6 +5,8 @@ Each model has a Read serializer (GET) and optionally a Write serializer
 (POST/PATCH).  Read serializers expose computed fields and safe URL
 resolution.  Write serializers accept only the fields an admin or client
 should be able to set.
+
+Read serializers share ``SparseFieldsMixin`` for ``?fields=`` / ``?omit=``.
 """
 
 from django.utils import timezone
@@ -42,11 +44,54 @@ def _thumbnail_url(obj, context):
         return None
 
 
+def _split_fields(raw) -> list[str]:
+    return [name.strip() for name in (raw or "").split(",") if name.strip()]
+
+
+class SparseFieldsMixin:
+    """
+    Sparse fieldsets for Read serializers.
+
+    ``sparse_fields(query_params)`` turns ``?fields=title,thumbnail`` and/or
+    ``?omit=ingredients,steps`` into the tuple of fields to render, in
+    declaration order and always including ``id``; ``None`` means the full
+    shape.  Views pass the tuple as ``context["fields"]`` and the
+    serializer drops every other field.
+    """
+
+    @classmethod
+    def sparse_fields(cls, query_params) -> tuple[str, ...] | None:
+        requested = _split_fields(query_params.get("fields"))
+        omitted = _split_fields(query_params.get("omit"))
+        if not requested and not omitted:
+            return None
+        declared = cls.Meta.fields
+        errors = {}
+        for param, names in (("fields", requested), ("omit", omitted)):
+            unknown = sorted(set(names) - set(declared))
+            if unknown:
+                errors[param] = f"Unknown field(s): {', '.join(unknown)}"
+        if errors:
+            raise serializers.ValidationError(errors)
+        keep = tuple(
+            name for name in declared
+            if name == "id" or ((not requested or name in requested) and name not in omitted)
+        )
+        return keep if len(keep) < len(declared) else None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        keep = self.context.get("fields")
+        if keep is not None:
+            for name in set(self.fields) - set(keep):
+                self.fields.pop(name)
+
+
 # ═══════════════════════════════════════════════════════════════════════
 # Playlist
 # ═══════════════════════════════════════════════════════════════════════
 
-class PlaylistReadSerializer(serializers.ModelSerializer):
+class PlaylistReadSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     thumbnail = serializers.SerializerMethodField()
     thumbnail_file_id = serializers.CharField(read_only=True)
     ctr = serializers.SerializerMethodField()
@@ -62,6 +107,7 @@ class PlaylistReadSerializer(serializers.ModelSerializer):
             "created_at", "updated_at",
             "thumbnail", "thumbnail_file_id",
             "impressions", "clicks", "starts", "completes",
+            "unique_viewers_7d", "unique_viewers_30d",
             "likes", "bookmarks", "shares",
             "total_watch_seconds", "avg_watch_seconds", "avg_progress_pct",
             "rating_count", "rating_sum",
@@ -140,7 +186,7 @@ class PlaylistPatchSerializer(serializers.ModelSerializer):
 # Video
 # ═══════════════════════════════════════════════════════════════════════
 
-class VideoReadSerializer(serializers.ModelSerializer):
+class VideoReadSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     thumbnail = serializers.SerializerMethodField()
     playlists = serializers.PrimaryKeyRelatedField(
         source="playlist", many=True, read_only=True,
@@ -179,7 +225,7 @@ class VideoReadSerializer(serializers.ModelSerializer):
 # Session
 # ═══════════════════════════════════════════════════════════════════════
 
-class SessionReadSerializer(serializers.ModelSerializer):
+class SessionReadSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     thumbnail = serializers.SerializerMethodField()
     duration_display = serializers.SerializerMethodField()
     calories_display = serializers.SerializerMethodField()
@@ -228,7 +274,7 @@ class SessionWriteSerializer(serializers.ModelSerializer):
 # Recipe
 # ═══════════════════════════════════════════════════════════════════════
 
-class RecipeReadSerializer(serializers.ModelSerializer):
+class RecipeReadSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     thumbnail = serializers.SerializerMethodField()
     total_time_minutes = serializers.IntegerField(read_only=True)
     total_time_display = serializers.SerializerMethodField()
@@ -242,6 +288,7 @@ class RecipeReadSerializer(serializers.ModelSerializer):
             "prep_time_minutes", "cook_time_minutes",
             "total_time_minutes", "total_time_display",
             "servings", "calories", "calories_display",
+            "protein_g", "carbs_g", "fat_g",
             "icon_name", "color_hex",
             "thumbnail", "thumbnail_file_id",
             "ingredients", "steps", "nutrition_facts", "tags",
@@ -280,7 +327,7 @@ class RecipeWriteSerializer(serializers.ModelSerializer):
 # Deal
 # ═══════════════════════════════════════════════════════════════════════
 
-class DealReadSerializer(serializers.ModelSerializer):
+class DealReadSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     is_expired = serializers.SerializerMethodField()
     discount_text = serializers.SerializerMethodField()
 
@@ -289,6 +336,7 @@ class DealReadSerializer(serializers.ModelSerializer):
         fields = [
             "id", "item_name", "emoji", "category", "description",
             "price", "original_price", "discount_text",
+            "price_amount", "original_amount", "price_unit", "discount_percent",
             "location", "available_at", "color_hex",
             "benefits", "nutrition_facts",
             "is_active", "is_expired", "expires_at",
@@ -302,19 +350,7 @@ class DealReadSerializer(serializers.ModelSerializer):
         return False
 
     def get_discount_text(self, obj):
-        """Try to compute a discount percentage from price strings."""
-        if not obj.original_price or not obj.price:
-            return ""
-        try:
-            import re
-            orig = float(re.search(r"[\d.]+", obj.original_price).group())
-            curr = float(re.search(r"[\d.]+", obj.price).group())
-            if orig > 0:
-                pct = int(((orig - curr) / orig) * 100)
-                return f"{pct}% off"
-        except Exception:
-            pass
-        return ""
+        return f"{obj.discount_percent}% off" if obj.discount_percent is not None else ""
 
 
 class DealWriteSerializer(serializers.ModelSerializer):
@@ -332,7 +368,7 @@ class DealWriteSerializer(serializers.ModelSerializer):
 # DailyTip
 # ═══════════════════════════════════════════════════════════════════════
 
-class DailyTipReadSerializer(serializers.ModelSerializer):
+class DailyTipReadSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = DailyTip
         fields = [
@@ -352,7 +388,7 @@ class DailyTipWriteSerializer(serializers.ModelSerializer):
 # Category
 # ═══════════════════════════════════════════════════════════════════════
 
-class CategoryReadSerializer(serializers.ModelSerializer):
+class CategoryReadSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Category
         fields = [
@@ -402,7 +438,7 @@ class UserDailyStatSerializer(serializers.ModelSerializer):
 # UserPlanItem
 # ═══════════════════════════════════════════════════════════════════════
 
-class UserPlanItemReadSerializer(serializers.ModelSerializer):
+class UserPlanItemReadSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     time_display = serializers.SerializerMethodField()
 
     class Meta:
@@ -434,7 +470,7 @@ class UserPlanItemWriteSerializer(serializers.ModelSerializer):
 # BreathworkExercise
 # ═══════════════════════════════════════════════════════════════════════
 
-class BreathworkExerciseSerializer(serializers.ModelSerializer):
+class BreathworkExerciseSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         from .models import BreathworkExercise
         model = BreathworkExercise
@@ -449,7 +485,7 @@ class BreathworkExerciseSerializer(serializers.ModelSerializer):
 # AmbientSound
 # ═══════════════════════════════════════════════════════════════════════
 
-class AmbientSoundSerializer(serializers.ModelSerializer):
+class AmbientSoundSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         from .models import AmbientSound
         model = AmbientSound
@@ -1,10 +1,18 @@
 import posixpath
-from django.conf import settings
-from django.core.cache import cache
-from django.db.models.signals import pre_save, post_save, post_delete
+from django.db.models.signals import m2m_changed, pre_save, post_save, post_delete
 from django.dispatch import receiver
+from django.utils import timezone
+from utilities.cache_keys import bump_tags, content_tag, user_plan_tag
 from utilities.imagekit_client import imagekit
-from .models import Category, Video
+from .logic.deals import apply_pricing
+from .logic.facets import CategoryCounts
+from .logic.nutrition import extract as extract_nutrition
+from .logic.recipe_filters import ingredient_keys, normalize_tags
+from .logic.search import SPECS_BY_MODEL, ContentSearch
+from .models import (
+    AmbientSound, BreathworkExercise, Category, DailyTip, Deal, Playlist, Recipe, SearchConfig, Session,
+    UserPlanItem, Video,
+)
 
 
 def _get_file_id(folder, filename):
@@ -27,12 +35,104 @@ def _delete_from_imagekit(file_id, field_storage, field_name):
         pass
 
 
-# ── Category cache invalidation ──────────────────────────────────────────────
+# ── Tagged cache invalidation ────────────────────────────────────────────────
 
-@receiver(post_save, sender=Category)
-@receiver(post_delete, sender=Category)
-def _invalidate_category_cache(sender, **kwargs):
-    cache.delete(settings.CATEGORY_CACHE_KEY)
+_CONTENT_TAGS = {
+    AmbientSound: content_tag("ambient_sound"),
+    BreathworkExercise: content_tag("breathwork"),
+    Category: content_tag("category"),
+    DailyTip: content_tag("tip"),
+    Deal: content_tag("deal"),
+    Playlist: content_tag("playlist"),
+    Recipe: content_tag("recipe"),
+    SearchConfig: content_tag("search_config"),
+    Session: content_tag("session"),
+    Video: content_tag("video"),
+}
+
+
+def _bump_content_tag(sender, **kwargs):
+    bump_tags(_CONTENT_TAGS[sender])
+
+
+for _model in _CONTENT_TAGS:
+    post_save.connect(_bump_content_tag, sender=_model, dispatch_uid=f"content_tag:{_model.__name__}")
+    post_delete.connect(_bump_content_tag, sender=_model, dispatch_uid=f"content_tag:{_model.__name__}")
+
+
+# ── Deal pricing ─────────────────────────────────────────────────────────────
+
+@receiver(pre_save, sender=Deal)
+def _parse_deal_pricing(sender, instance, **kwargs):
+    apply_pricing(instance)
+
+
+# ── Recipe filter terms ──────────────────────────────────────────────────────
+
+@receiver(pre_save, sender=Recipe)
+def _normalize_recipe_terms(sender, instance, **kwargs):
+    # Stored spelling must match the query spelling for GIN containment lookups.
+    instance.tags = normalize_tags(instance.tags)
+    instance.ingredient_keys = ingredient_keys(instance.ingredients)
+
+
+@receiver(pre_save, sender=Recipe)
+def _extract_recipe_nutrition(sender, instance, **kwargs):
+    extract_nutrition(instance)
+
+
+# ── Category.item_count ──────────────────────────────────────────────────────
+
+@receiver(pre_save, sender=Session)
+def _remember_session_state(sender, instance, **kwargs):
+    old = sender.objects.filter(pk=instance.pk).values("category", "is_published").first() if instance.pk else None
+    instance._category_state = old
+
+
+@receiver(post_save, sender=Session)
+def _update_category_count(sender, instance, **kwargs):
+    CategoryCounts.apply(getattr(instance, "_category_state", None), CategoryCounts.snapshot(instance))
+    instance._category_state = CategoryCounts.snapshot(instance)
+
+
+@receiver(post_delete, sender=Session)
+def _decrement_category_count(sender, instance, **kwargs):
+    CategoryCounts.apply(CategoryCounts.snapshot(instance), None)
+
+
+# ── Full-text search vectors ─────────────────────────────────────────────────
+
+def _refresh_search_vector(sender, instance, **kwargs):
+    ContentSearch.refresh(instance)
+
+
+for _model in SPECS_BY_MODEL:
+    post_save.connect(_refresh_search_vector, sender=_model, dispatch_uid=f"search_vector:{_model.__name__}")
+
+
+@receiver(m2m_changed, sender=Video.playlist.through)
+def _touch_videos_on_playlist_change(sender, instance, action, reverse, pk_set, **kwargs):
+    # Membership is part of the serialized video but does not move
+    # updated_at on its own, which would leave list fragments stale.
+    if reverse and action == "pre_clear":
+        instance._cleared_video_ids = list(instance.videos.values_list("pk", flat=True))
+        return
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        video_ids = [instance.pk]
+    elif action == "post_clear":
+        video_ids = getattr(instance, "_cleared_video_ids", [])
+    else:
+        video_ids = pk_set or ()
+    Video.objects.filter(pk__in=video_ids).update(updated_at=timezone.now())
+    bump_tags(content_tag("video"))
+
+
+@receiver(post_save, sender=UserPlanItem)
+@receiver(post_delete, sender=UserPlanItem)
+def _bump_user_plan_tag(sender, instance, **kwargs):
+    bump_tags(user_plan_tag(instance.user_id))
 
 
 # ── Video ImageKit file lifecycle ─────────────────────────────────────────────
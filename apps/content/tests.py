@@ -1,3 +1,1255 @@
-from django.test import TestCase
+import io
+import json
+import threading
+import time
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import close_old_connections, connection, transaction
+from django.conf import settings
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django_redis.serializers.json import JSONSerializer
+from rest_framework import status
+from rest_framework.test import APIClient, APIRequestFactory
+
+from apps.content.logic.autocomplete import Autocomplete, SuggestIndex
+from apps.content.logic.counter_buffer import PlaylistCounterBuffer
+from apps.content.logic.counters import apply_counter_deltas
+from apps.content.logic.deals import parse_price
+from apps.content.logic.facets import CategoryCounts
+from apps.content.logic.featured import FeaturedPlaylists
+from apps.content.logic.events import PlaylistEventLog
+from apps.content.logic.ingest import iter_json_array
+from apps.content.logic.nutrition import parse_amount
+from apps.content.logic.projection import PROJECTIONS
+from apps.content.logic.recipe_filters import normalize_tags
+from apps.content.logic.search import ContentSearch
+from apps.content.logic.rollups import PlaylistRollupEngine, recompute_playlist_rates
+from apps.content.logic.trending import PlaylistTrending
+from apps.content.logic import unique_viewers
+from apps.content.logic.unique_viewers import PlaylistUniqueViewers
+from ahara.users.api_utils.throtles import SLIDING_WINDOW, ScriptedThrottleMixin
+from apps.content.models import (
+    AmbientSound, BreathworkExercise, Category, Deal, Playlist, PlaylistEvent, PlaylistRollup, Recipe, RollupCursor,
+    SearchConfig, Session, Video,
+)
+from rest_framework.renderers import JSONRenderer
+
+from utilities.cache_backend import CircuitBreaker, FallbackCache, NearCache, cache_pipeline
+from utilities.cache_compute import get_first, get_or_compute
+from utilities.cache_keys import bump_tags, compute_lock, tagged_get, tagged_set
+from utilities.response import ApiJSONRenderer, RawJSON, encode_json
+
+BUFFERED = {"COUNTER_BUFFER_ENABLED": True, "COUNTER_FLUSH_INTERVAL": 3600}
+# FallbackCache with Redis unreachable: exercises the LocMem fallback, never a real server.
+FALLBACK_CACHES = {
+    "default": {
+        "BACKEND": "utilities.cache_backend.FallbackCache",
+        "LOCATION": "redis://127.0.0.1:1/0",
+        "KEY_PREFIX": "ahara-test",
+    },
+}
+
+
+class ContentAPITestCase(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="tester@example.com", username="tester", password="pass12345",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+
+class CounterDeltaTests(TestCase):
+    def test_apply_counter_deltas_single_statement(self):
+        a = Playlist.objects.create(title="A")
+        b = Playlist.objects.create(title="B", impressions=10)
+        when = timezone.now()
+
+        with CaptureQueriesContext(connection) as ctx:
+            updated = apply_counter_deltas(
+                {a.pk: {"impressions": 2, "clicks": 1}, b.pk: {"starts": 3}, 999999: {"clicks": 1}},
+                when,
+            )
+
+        self.assertEqual(updated, 2)
+        self.assertEqual(len([q for q in ctx.captured_queries if q["sql"].startswith("UPDATE")]), 1)
+        a.refresh_from_db()
+        b.refresh_from_db()
+        self.assertEqual((a.impressions, a.clicks, a.starts), (2, 1, 0))
+        self.assertEqual((b.impressions, b.starts), (10, 3))
+        self.assertIsNotNone(a.last_clicked_at)
+        self.assertIsNone(a.last_started_at)
+        self.assertIsNotNone(b.last_interaction_at)
+
+
+@override_settings(CONTENT_CONFIG=BUFFERED)
+class CounterBufferTests(ContentAPITestCase):
+    def setUp(self):
+        super().setUp()
+        PlaylistCounterBuffer.flush()
+        self.playlist = Playlist.objects.create(title="Viral")
+
+    def test_increments_are_buffered_until_flush(self):
+        for _ in range(3):
+            self.playlist.inc_impression()
+        self.playlist.inc_click()
+
+        self.playlist.refresh_from_db()
+        self.assertEqual(self.playlist.impressions, 0)
+        self.assertEqual(PlaylistCounterBuffer.pending(self.playlist.pk)["impressions"], 3)
+
+        self.assertEqual(PlaylistCounterBuffer.flush(), 1)
+        self.playlist.refresh_from_db()
+        self.assertEqual((self.playlist.impressions, self.playlist.clicks), (3, 1))
+        self.assertEqual(PlaylistCounterBuffer.pending(self.playlist.pk)["impressions"], 0)
+
+    def test_leftover_snapshot_is_redrained_and_dropped_after_commit(self):
+        import redis
+
+        stale = "ahara:pl:ctr:flushing:100-crashed"  # a flusher died before its UPDATE committed
+        client = mock.Mock()
+        client.smembers.return_value = {stale.encode()}
+        pipe = client.pipeline.return_value
+        pipe.execute.side_effect = [
+            [True, 1, 1],                                          # claim the stale snapshot
+            [redis.ResponseError("no such key"), 0, 1],            # nothing pending
+            [{f"{self.playlist.pk}:clicks".encode(): b"3"}],       # HGETALL
+            [1, 1],                                                # drop after commit
+        ]
+        backend = mock.Mock(run_redis=lambda fn, fallback: fn(client))
+
+        with mock.patch("django.core.cache.cache", backend):
+            with self.captureOnCommitCallbacks() as callbacks:
+                self.assertEqual(PlaylistCounterBuffer.flush(), 1)
+            claimed = pipe.rename.call_args_list[0].args[1]
+            pipe.delete.assert_not_called()  # snapshot survives until the UPDATE commits
+            callbacks[0]()
+
+        pipe.delete.assert_called_once_with(claimed)
+        self.playlist.refresh_from_db()
+        self.assertEqual(self.playlist.clicks, 3)
+
+    def test_flush_loop_survives_a_failed_flush(self):
+        out = io.StringIO()
+        flush = mock.patch.object(PlaylistCounterBuffer, "flush", side_effect=[RuntimeError("db down"), 3, SystemExit])
+        with flush as flushed, mock.patch("time.sleep"), self.assertRaises(SystemExit):
+            call_command("flush_playlist_counters", "--loop", "--interval", "0", stdout=out)
+
+        self.assertEqual(flushed.call_count, 3)
+        self.assertIn("Flushed counters for 3 playlist(s)", out.getvalue())
+
+    def test_pending_includes_snapshot_being_flushed(self):
+        client = mock.Mock()
+        client.pipeline.return_value.execute.side_effect = [
+            [[b"2", None, None, None], {b"ahara:pl:ctr:flushing:1-abc"}],
+            [[b"3", b"1", None, None]],
+        ]
+        backend = mock.Mock(run_redis=lambda fn, fallback: fn(client))
+
+        with mock.patch("django.core.cache.cache", backend):
+            pending = PlaylistCounterBuffer.pending(self.playlist.pk)
+
+        self.assertEqual((pending["impressions"], pending["clicks"]), (5, 1))
+
+    def test_retrieve_overlays_pending_deltas(self):
+        url = reverse("content:content-playlist_retrieve", kwargs={"pk": self.playlist.pk})
+        self.client.get(url)
+        resp = self.client.get(url)
+
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.data["data"]["impressions"], 2)
+        self.playlist.refresh_from_db()
+        self.assertEqual(self.playlist.impressions, 0)
+
+
+class EventIngestTests(ContentAPITestCase):
+    url = reverse("content:content-playlist_events_ingest")
+
+    def setUp(self):
+        super().setUp()
+        self.a = Playlist.objects.create(title="A")
+        self.b = Playlist.objects.create(title="B")
+
+    def test_ndjson_upload_folds_into_one_update(self):
+        lines = [{"id": self.a.pk, "type": "impression"}] * 300 + [
+            {"id": self.a.pk, "type": "click"},
+            {"id": self.b.pk, "type": "start"},
+            {"id": 999999, "type": "click"},
+            {"id": self.b.pk, "type": "bogus"},
+        ]
+        body = "\n".join(json.dumps(e) for e in lines) + "\nnot-json\n"
+
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.generic("POST", self.url, body, content_type="application/x-ndjson")
+
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        data = resp.data["data"]
+        self.assertEqual(
+            data["accepted"], {"impression": 300, "click": 1, "start": 1, "complete": 0, "exit": 0},
+        )
+        self.assertEqual(data["rejected"]["click"], 1)
+        self.assertEqual(data["rejected"]["unknown_type"], 1)
+        self.assertEqual(data["rejected"]["invalid"], 1)
+        self.assertEqual(len([q for q in ctx.captured_queries if q["sql"].startswith("UPDATE")]), 1)
+        self.a.refresh_from_db()
+        self.assertEqual((self.a.impressions, self.a.clicks), (300, 1))
+        self.assertEqual(PlaylistEvent.objects.count(), 302)
+
+    def test_out_of_range_numbers_are_rejected_or_clamped(self):
+        body = "\n".join([
+            '{"id": %d, "type": "exit", "watch_seconds": Infinity}' % self.a.pk,
+            '{"id": %d, "type": "exit", "progress": 1e400}' % self.a.pk,
+            json.dumps({"id": 10**30, "type": "click"}),
+            json.dumps({"id": self.a.pk, "type": "exit", "watch_seconds": 10**12}),
+        ])
+        resp = self.client.generic("POST", self.url, body, content_type="application/x-ndjson")
+
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.data["data"]["rejected"]["invalid"], 3)
+        self.assertEqual(PlaylistEvent.objects.get().watch_seconds, 2**31 - 1)
+
+    def test_failed_event_log_rolls_back_counters(self):
+        body = json.dumps([[self.a.pk, "click"]])
+        with mock.patch("apps.content.logic.ingest.PlaylistEventLog.append", side_effect=RuntimeError), \
+                mock.patch("apps.content.logic.ingest.PlaylistTrending.record_many") as trending, \
+                self.captureOnCommitCallbacks(execute=True):
+            resp = self.client.generic("POST", self.url, body, content_type="application/json")
+
+        self.assertEqual(resp.status_code, status.HTTP_500_INTERNAL_SERVER_ERROR)
+        self.a.refresh_from_db()
+        self.assertEqual(self.a.clicks, 0)  # a retry will not count the batch twice
+        trending.assert_not_called()
+
+    def test_compact_array_body(self):
+        body = json.dumps([[self.a.pk, "complete"], [self.b.pk, "complete"]])
+        resp = self.client.generic("POST", self.url, body, content_type="application/json")
+
+        self.assertEqual(resp.data["data"]["accepted"]["complete"], 2)
+        self.b.refresh_from_db()
+        self.assertEqual(self.b.completes, 1)
+
+    def test_json_array_reader_spans_chunks(self):
+        events = [[i, "click"] for i in range(20_000)]
+        stream = io.BytesIO(json.dumps({"events": events}).encode())
+        self.assertEqual(list(iter_json_array(stream, 10 * 1024 * 1024)), events)
+
+    def test_json_object_body_finds_events_key(self):
+        events = [[self.a.pk, "click"]]
+        for prefix in ({"meta": {"tags": ["x"]}}, {"source": "[web]"}, {"n": 12, "ok": True}):
+            body = json.dumps({**prefix, "events": events, "trailer": [1, 2]}).encode()
+            self.assertEqual(list(iter_json_array(io.BytesIO(body), 1024)), events)
+
+    def test_json_object_body_without_events_is_rejected(self):
+        body = json.dumps({"meta": {"tags": [[self.a.pk, "click"]]}})
+        resp = self.client.generic("POST", self.url, body, content_type="application/json")
+
+        self.assertEqual(resp.status_code, 400)
+        self.a.refresh_from_db()
+        self.assertEqual(self.a.clicks, 0)
+
+
+@override_settings(CONTENT_CONFIG={"ROLLUP_SETTLE_SECONDS": 0})
+class RollupEngineTests(TestCase):
+    def setUp(self):
+        self.playlist = Playlist.objects.create(title="P", impressions=10, clicks=4, starts=4, completes=1)
+
+    def _log(self, *rows):
+        PlaylistEventLog.append([(self.playlist.pk, *row) for row in rows])
+
+    def test_rollup_is_incremental(self):
+        self._log(
+            ("start", 0, None, "ios", "en"),
+            ("start", 0, None, "android", "en"),
+            ("exit", 4, 5, "ios", "en"),      # bounce
+            ("complete", 300, None, "android", "en"),
+        )
+        self.assertEqual(PlaylistRollupEngine.run()["events"], 4)
+
+        self.playlist.refresh_from_db()
+        self.assertEqual(float(self.playlist.ctr), 0.4)
+        self.assertEqual(float(self.playlist.completion_rate), 0.25)
+        self.assertEqual(float(self.playlist.bounce_rate), 0.5)
+        self.assertAlmostEqual(self.playlist.avg_progress_pct, 52.5)
+        self.assertEqual(self.playlist.breakdown["device"]["ios"], {"start": 1, "exit": 1})
+        self.assertEqual(self.playlist.breakdown["language"]["en"]["start"], 2)
+
+        # Second run sees only the new event.
+        self._log(("exit", 60, 40, "ios", ""))
+        self.assertEqual(PlaylistRollupEngine.run()["events"], 1)
+        self.playlist.refresh_from_db()
+        self.assertEqual(float(self.playlist.bounce_rate), 0.5)
+        self.assertAlmostEqual(self.playlist.avg_progress_pct, 145 / 3)
+        self.assertEqual(self.playlist.breakdown["device"]["ios"]["exit"], 2)
+        self.assertEqual(RollupCursor.objects.get().last_id, PlaylistEvent.objects.latest("id").pk)
+        self.assertEqual(PlaylistRollupEngine.run()["events"], 0)
+
+    @override_settings(CONTENT_CONFIG={"ROLLUP_SETTLE_SECONDS": 3600})
+    def test_unsettled_events_wait(self):
+        self._log(("start", 0, None, "", ""))
+        with mock.patch.object(PlaylistEventLog, "committed_high_water", return_value=None):  # no write fence
+            self.assertEqual(PlaylistRollupEngine.run()["events"], 0)
+
+
+@skipUnless(connection.vendor == "postgresql", "advisory-lock write fence is PostgreSQL-only")
+@override_settings(CONTENT_CONFIG={"ROLLUP_SETTLE_SECONDS": 0})
+class RollupWriteFenceTests(TransactionTestCase):
+    def test_lower_id_committed_after_higher_one_is_not_skipped(self):
+        playlist = Playlist.objects.create(title="P")
+        inserted, release = threading.Event(), threading.Event()
+
+        def slow_ingest():
+            try:
+                with transaction.atomic():
+                    PlaylistEventLog.append([(playlist.pk, "start", 0, None, "", "")])
+                    inserted.set()
+                    release.wait(10)
+            finally:
+                close_old_connections()
+
+        def rollup():
+            try:
+                PlaylistRollupEngine.run()
+            finally:
+                close_old_connections()
+
+        writer = threading.Thread(target=slow_ingest)
+        writer.start()
+        inserted.wait(10)
+        PlaylistEventLog.append([(playlist.pk, "start", 0, None, "", "")])  # higher id, committed first
+        roller = threading.Thread(target=rollup)
+        roller.start()
+        roller.join(0.5)
+        self.assertTrue(roller.is_alive())  # waits for the in-flight insert instead of passing it
+        release.set()
+        writer.join(10)
+        roller.join(10)
+
+        self.assertEqual(PlaylistRollup.objects.get(playlist=playlist).starts, 2)
+        self.assertEqual(RollupCursor.objects.get().last_id, PlaylistEvent.objects.latest("id").pk)
+
+
+class RecomputeRatesTests(TestCase):
+    def test_one_update_per_chunk(self):
+        rows = [
+            Playlist.objects.create(title=f"P{i}", impressions=10, clicks=i, starts=4,
+                                    completes=1, total_watch_seconds=100)
+            for i in range(5)
+        ]
+        empty = Playlist.objects.create(title="Empty")
+
+        with CaptureQueriesContext(connection) as ctx:
+            summary = recompute_playlist_rates(chunk_size=2)
+
+        self.assertEqual((summary["playlists"], summary["chunks"]), (6, 3))
+        self.assertEqual(len([q for q in ctx.captured_queries if q["sql"].startswith("UPDATE")]), 3)
+        rows[3].refresh_from_db()
+        self.assertEqual(float(rows[3].ctr), 0.3)
+        self.assertEqual(float(rows[3].completion_rate), 0.25)
+        self.assertEqual(rows[3].avg_watch_seconds, 25.0)
+        empty.refresh_from_db()
+        self.assertEqual(float(empty.ctr), 0.0)
+
+
+class TrendingTests(ContentAPITestCase):
+    def test_forward_decay_weights(self):
+        gen = PlaylistTrending.generation(1_000_000_000)
+        start = gen * PlaylistTrending._generation_seconds()
+        day = 24 * 3600
+
+        self.assertAlmostEqual(PlaylistTrending.weight(gen, start + day), 2.0)
+        # Both generations rank events identically (constant ratio).
+        self.assertAlmostEqual(
+            PlaylistTrending.weight(gen + 1, start + day) / PlaylistTrending.weight(gen, start + day),
+            PlaylistTrending.weight(gen + 1, start + 3 * day) / PlaylistTrending.weight(gen, start + 3 * day),
+        )
+
+    def test_endpoint_falls_back_to_all_time_order(self):
+        Playlist.objects.create(title="Cold", impressions=1)
+        Playlist.objects.create(title="Hot", impressions=50)
+
+        with self.settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}):
+            resp = self.client.get(reverse("content:content-trending_playlists"))
+
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual([p["title"] for p in resp.data["data"]["items"]], ["Hot", "Cold"])
+
+
+class CounterReturningTests(ContentAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.playlist = Playlist.objects.create(title="P", impressions=4, clicks=2, ctr="0.5000")
+
+    def test_inc_returns_post_increment_value(self):
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self.playlist.inc_click(), 3)
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertIsNotNone(self.playlist.last_clicked_at.tzinfo)
+
+    def test_hot_endpoints_use_one_query(self):
+        pk = self.playlist.pk
+        cases = [
+            ("get", reverse("content:content-playlist_retrieve", kwargs={"pk": pk}), {}, "impressions", 5),
+            ("post", reverse("content:content-playlist_click", kwargs={"pk": pk}), {}, "clicks", 3),
+            ("post", reverse("content:content-playlist_rate", kwargs={"pk": pk}), {"stars": 4}, "rating_sum", 4),
+            ("get", reverse("content:content-playlist_impressions_reset", kwargs={"pk": pk}), {}, "impressions", 0),
+        ]
+        for method, url, body, field, expected in cases:
+            with self.subTest(url=url), CaptureQueriesContext(connection) as ctx:
+                resp = getattr(self.client, method)(url, body, format="json")
+                self.assertEqual(resp.status_code, status.HTTP_200_OK)
+                self.assertEqual(resp.data["data"][field], expected)
+                self.assertEqual(len(ctx.captured_queries), 1)
+
+    def test_missing_playlist_is_404(self):
+        resp = self.client.post(reverse("content:content-playlist_click", kwargs={"pk": 999999}))
+        self.assertEqual(resp.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class UniqueViewerTests(ContentAPITestCase):
+    def setUp(self):
+        super().setUp()
+        unique_viewers._take_local()  # other tests' views are buffered in this process
+
+    def test_outage_viewers_replayed_into_redis(self):
+        redis_up = [False]
+        pipe = mock.Mock()
+        pipe.execute.return_value = [1, True, 1, True, 0, 3, 4]
+
+        def run_redis(fn, fallback):
+            return fn(mock.Mock(**{"pipeline.return_value": pipe})) if redis_up[0] else fallback()
+
+        backend = mock.Mock(run_redis=run_redis)
+        day = timezone.now()
+        with mock.patch("django.core.cache.cache", backend):
+            PlaylistUniqueViewers.add_many([1, 2], 7, when=day)
+            PlaylistUniqueViewers.add_many([1], 8, when=day)
+            self.assertEqual(PlaylistUniqueViewers.counts([1])[1], {7: 2, 30: 2})
+
+            redis_up[0] = True
+            self.assertEqual(PlaylistUniqueViewers.counts([1]), {1: {7: 3, 30: 4}})
+
+        replayed = {call.args[0]: set(call.args[1:]) for call in pipe.pfadd.call_args_list}
+        self.assertEqual(replayed, {
+            f"ahara:pl:uv:1:{day:%Y%m%d}": {7, 8}, f"ahara:pl:uv:2:{day:%Y%m%d}": {7},
+        })
+        self.assertEqual(PlaylistUniqueViewers.counts([1], day.date())[1], {7: 0, 30: 0})  # buffer drained
+
+    def test_repeat_views_count_once(self):
+        playlist = Playlist.objects.create(title="P")
+        url = reverse("content:content-playlist_retrieve", kwargs={"pk": playlist.pk})
+        for _ in range(5):
+            self.client.get(url)
+        other = get_user_model().objects.create_user(email="o@example.com", username="o", password="pass12345")
+        PlaylistUniqueViewers.add(playlist.pk, other.pk, when=timezone.now() - timedelta(days=10))
+
+        PlaylistUniqueViewers.refresh()
+
+        playlist.refresh_from_db()
+        self.assertEqual(playlist.impressions, 5)
+        self.assertEqual((playlist.unique_viewers_7d, playlist.unique_viewers_30d), (1, 2))
+
+
+class FeaturedPlaylistTests(ContentAPITestCase):
+    url = reverse("content:content-featured_playlists")
+
+    def setUp(self):
+        super().setUp()
+        cache.delete(settings.FEATURED_KEY)
+        Playlist.objects.create(title="Quiet", impressions=1)
+        Playlist.objects.create(title="Loud", impressions=90)
+
+    def test_miss_builds_then_serves_cached_bytes(self):
+        resp = self.client.get(self.url)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        body = json.loads(resp.content)
+        self.assertEqual([p["title"] for p in body["data"]["items"]], ["Loud", "Quiet"])
+        self.assertEqual(body["status"]["code"], 200)
+
+        with CaptureQueriesContext(connection) as ctx:
+            again = self.client.get(self.url)
+        self.assertEqual(len(ctx.captured_queries), 0)
+        self.assertEqual(again["ETag"], resp["ETag"])
+        self.assertEqual(json.loads(again.content)["data"], body["data"])
+
+    def test_entry_survives_redis_json_serializer(self):
+        # Production Redis uses django-redis's JSONSerializer: no bytes in cache values.
+        serializer = JSONSerializer({})
+        entry = FeaturedPlaylists.build()
+        self.assertEqual(serializer.loads(serializer.dumps(entry)), entry)
+
+    def test_if_none_match_returns_304(self):
+        etag = self.client.get(self.url)["ETag"]
+        resp = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag.removeprefix("W/"))
+        self.assertEqual(resp.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(resp["ETag"], etag)
+
+
+class TaggedCacheTests(ContentAPITestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def test_bump_invalidates_every_entry_with_the_tag(self):
+        _, gens = tagged_get("k1", ["t:a", "t:b"])
+        tagged_set("k1", {"v": 1}, gens)
+        _, gens = tagged_get("k2", ["t:b"])
+        tagged_set("k2", [2], gens)
+        self.assertEqual(tagged_get("k1", ["t:a", "t:b"])[0], {"v": 1})
+
+        bump_tags("t:a")
+        self.assertIsNone(tagged_get("k1", ["t:a", "t:b"])[0])
+        self.assertEqual(tagged_get("k2", ["t:b"])[0], [2])
+
+    def test_evicted_tag_counter_invalidates(self):
+        _, gens = tagged_get("k", ["t:x"])
+        tagged_set("k", "v", gens)
+        cache.delete("ahara:tag:t:x")
+        self.assertIsNone(tagged_get("k", ["t:x"])[0])
+
+    def test_get_or_compute_coalesces_concurrent_misses(self):
+        calls = []
+
+        def build():
+            calls.append(1)
+            time.sleep(0.1)
+            return {"n": len(calls)}
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(get_or_compute("k", build, 60)))
+                   for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual((len(calls), results), (1, [{"n": 1}] * 5))
+
+    def test_get_or_compute_serves_stale_while_one_caller_refreshes(self):
+        builds = iter(["v1", "v2"])
+        get_or_compute("k", lambda: next(builds), 60, stale_ttl=60, tags=["t:x"])
+        expired = time.time() + 61
+        with mock.patch("utilities.cache_compute.time.time", return_value=expired):
+            cache.add(compute_lock("k"), "1")
+            self.assertEqual(get_or_compute("k", lambda: next(builds), 60, stale_ttl=60, tags=["t:x"]), "v1")
+            cache.delete(compute_lock("k"))
+            self.assertEqual(get_or_compute("k", lambda: next(builds), 60, stale_ttl=60, tags=["t:x"]), "v2")
+
+        # An edit is never answered with the stale value.
+        bump_tags("t:x")
+        self.assertEqual(get_or_compute("k", lambda: "v3", 60, stale_ttl=60, tags=["t:x"]), "v3")
+
+    def test_get_or_compute_xfetch_refreshes_slow_builds_early(self):
+        get_or_compute("k", lambda: "old", 60)
+        entry = cache.get("k")
+        entry["delta"] = 30.0  # a 30 s build, 60 s before expiry
+        cache.set("k", entry)
+        with mock.patch("utilities.cache_compute.random.random", return_value=0.99):
+            self.assertEqual(get_or_compute("k", lambda: "new", 60), "new")
+        with mock.patch("utilities.cache_compute.random.random", return_value=0.0):
+            self.assertEqual(get_or_compute("k", lambda: "newer", 60), "new")
+
+    def test_recipe_edit_invalidates_cached_list(self):
+        url = reverse("content:content-recipes")
+        recipe = Recipe.objects.create(title="Dal", meal_type="lunch", is_published=True)
+        self.assertEqual(self.client.get(url).json()["data"]["items"][0]["title"], "Dal")
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(url)
+        self.assertEqual(len(ctx.captured_queries), 0)
+
+        recipe.title = "Dal Tadka"
+        recipe.save()
+        self.assertEqual(self.client.get(url).json()["data"]["items"][0]["title"], "Dal Tadka")
+
+
+class CachedListingTests(ContentAPITestCase):
+    url = reverse("content:content-deals")
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        for i in range(5):
+            Deal.objects.create(item_name=f"Deal {i}", price="₹10", category="greens")
+
+    def test_pages_slice_one_id_list_and_reuse_fragments(self):
+        first = self.client.get(self.url, {"page_size": 2}).json()
+        self.assertEqual(first["meta"]["total"], 5)
+        self.assertTrue(first["meta"]["has_next"])
+
+        # Another page size is a slice of the cached list; only unseen rows hit the DB.
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(self.url, {"page_size": 3}).json()
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertEqual(resp["data"]["items"][:2], first["data"]["items"])
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(self.url, {"page": 2, "page_size": 2})
+        self.assertEqual(len(ctx.captured_queries), 1)
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(self.url, {"page": 1, "page_size": 4})
+        self.assertEqual(len(ctx.captured_queries), 0)
+
+    def test_fragments_survive_redis_json_serializer(self):
+        serializer = JSONSerializer({})
+        with mock.patch.object(cache, "set_many", wraps=cache.set_many) as set_many:
+            items = self.client.get(self.url).json()["data"]["items"]
+        stored = {k: v for call in set_many.call_args_list for k, v in call.args[0].items()}
+        self.assertEqual(len(stored), len(items))
+        for value in stored.values():
+            self.assertEqual(serializer.loads(serializer.dumps(value)), value)
+
+    def test_edit_refreshes_only_that_fragment(self):
+        self.client.get(self.url)
+        deal = Deal.objects.order_by("-created_at").first()
+        deal.item_name = "Renamed"
+        deal.save()
+        items = self.client.get(self.url).json()["data"]["items"]
+        self.assertEqual(items[0]["item_name"], "Renamed")
+
+    def test_playlist_membership_change_refreshes_video(self):
+        video = Video.objects.create(title="Flow", is_published=True)
+        playlist = Playlist.objects.create(title="Morning")
+        url = reverse("content:content-videos")
+        self.assertEqual(self.client.get(url).json()["data"]["items"][0]["playlists"], [])
+
+        playlist.videos.add(video)
+        self.assertEqual(self.client.get(url).json()["data"]["items"][0]["playlists"], [playlist.pk])
+
+
+class ContentSearchTests(ContentAPITestCase):
+    url = reverse("content:content-search")
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.recipe = Recipe.objects.create(
+            title="Paneer Tikka", meal_type="dinner", is_published=True, tags=["protein"],
+        )
+        Recipe.objects.create(
+            title="Palak Dal", meal_type="lunch", is_published=True,
+            description="Spinach lentils, great with paneer on the side.",
+        )
+        Recipe.objects.create(title="Paneer Draft", meal_type="lunch", is_published=False)
+        self.session = Session.objects.create(
+            title="Evening Stretch", category="yoga", is_published=True,
+            description="Unwind after a paneer-heavy dinner.",
+        )
+        Playlist.objects.create(title="Paneer Classics")
+
+    def test_ranked_typed_hits_across_models(self):
+        resp = self.client.get(self.url, {"q": "paneer"})
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        items = resp.json()["data"]["items"]
+        found = {(i["type"], i["item"]["title"]) for i in items}
+        self.assertEqual(found, {
+            ("recipe", "Paneer Tikka"), ("recipe", "Palak Dal"),
+            ("session", "Evening Stretch"), ("playlist", "Paneer Classics"),
+        })
+        # Title matches outrank description-only matches.
+        ranks = {i["item"]["title"]: i["rank"] for i in items}
+        self.assertGreater(ranks["Paneer Tikka"], ranks["Palak Dal"])
+        self.assertEqual([i["rank"] for i in items], sorted((i["rank"] for i in items), reverse=True))
+
+    def test_types_filter_and_validation(self):
+        items = self.client.get(self.url, {"q": "paneer", "types": "session"}).json()["data"]["items"]
+        self.assertEqual([(i["type"], i["id"]) for i in items], [("session", self.session.pk)])
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            self.client.get(self.url, {"q": "x", "types": "deal"}).status_code,
+            status.HTTP_400_BAD_REQUEST,
+        )
+
+    def test_save_keeps_index_current(self):
+        self.recipe.title = "Tofu Tikka"
+        self.recipe.save()
+        hits = ContentSearch.search("tofu", ["recipe"])
+        self.assertEqual([h.pk for h in hits], [self.recipe.pk])
+
+        summary = ContentSearch.rebuild()
+        if connection.vendor == "postgresql":
+            self.assertEqual(summary["recipe"], 3)
+            self.assertEqual([h.pk for h in ContentSearch.search("tofu", ["recipe"])], [self.recipe.pk])
+
+
+class AutocompleteTests(ContentAPITestCase):
+    url = reverse("content:content-search_suggest")
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        Autocomplete.reset()
+        self.addCleanup(Autocomplete.reset)
+        Recipe.objects.create(title="Paneer Tikka", meal_type="dinner", is_published=True, tags=["High Protein"])
+        Video.objects.create(title="Sunrise Flow", instructor="Asha Rao", is_published=True)
+        SearchConfig.objects.create(popular_searches=["Pranayama techniques"])
+
+    def test_index_prefix_word_start_and_typo(self):
+        index = SuggestIndex([
+            ("Paneer Tikka", "recipe", 1, 3), ("Palak Paneer", "recipe", 2, 3),
+            ("paneer", "query", None, 4), ("Pasta", "recipe", 3, 3),
+        ])
+        self.assertEqual([s["text"] for s in index.suggest("pan")], ["paneer", "Palak Paneer", "Paneer Tikka"])
+        self.assertEqual([s["text"] for s in index.suggest("tik")], ["Paneer Tikka"])
+        self.assertIn("paneer", [s["text"] for s in index.suggest("panner")])
+        self.assertEqual(index.suggest("  "), [])
+
+    def test_endpoint_serves_from_memory_and_sees_edits(self):
+        resp = self.client.get(self.url, {"prefix": "pr"}).json()["data"]["items"]
+        self.assertEqual([(s["text"], s["type"]) for s in resp],
+                         [("Pranayama techniques", "query"), ("high-protein", "tag")])
+        self.assertEqual(self.client.get(self.url, {"prefix": "asha"}).json()["data"]["items"][0]["type"],
+                         "instructor")
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(self.url, {"prefix": "high"})
+        self.assertEqual(len(ctx.captured_queries), 0)
+
+        Recipe.objects.create(title="Protein Oats", meal_type="breakfast", is_published=True)
+        with override_settings(CONTENT_CONFIG={"AUTOCOMPLETE_CHECK_SECONDS": 0}):
+            texts = [s["text"] for s in self.client.get(self.url, {"prefix": "pro"}).json()["data"]["items"]]
+        self.assertIn("Protein Oats", texts)
+
+
+class KeysetPaginationTests(ContentAPITestCase):
+    url = reverse("content:content-playlist")
+
+    def setUp(self):
+        super().setUp()
+        base = timezone.now()
+        for i in range(7):
+            Playlist.objects.create(title=f"P{i}")
+        # Ties on updated_at exercise the primary-key tiebreak.
+        for i, pk in enumerate(Playlist.objects.order_by("pk").values_list("pk", flat=True)):
+            Playlist.objects.filter(pk=pk).update(updated_at=base - timedelta(minutes=i // 2))
+
+    def _titles(self, resp):
+        return [p["title"] for p in resp["data"]["items"]]
+
+    def test_cursor_walks_forward_and_back(self):
+        expected = list(Playlist.objects.order_by("-updated_at", "-pk").values_list("title", flat=True))
+        seen, pages, params = [], [], {"cursor": "", "page_size": 3}
+        while True:
+            with CaptureQueriesContext(connection) as ctx:
+                resp = self.client.get(self.url, params).json()
+            self.assertEqual(len(ctx.captured_queries), 1)  # no COUNT by default
+            self.assertIsNone(resp["meta"]["total"])
+            seen += self._titles(resp)
+            pages.append(resp)
+            if not resp["meta"]["next"]:
+                break
+            params = {"cursor": resp["meta"]["next"], "page_size": 3}
+        self.assertEqual(seen, expected)
+
+        back = self.client.get(self.url, {"cursor": pages[-1]["meta"]["prev"], "page_size": 3}).json()
+        self.assertEqual(self._titles(back), self._titles(pages[-2]))
+        self.assertTrue(back["meta"]["has_next"])
+
+    def test_count_modes_and_bad_cursor(self):
+        resp = self.client.get(self.url, {"cursor": "", "count": "exact"}).json()
+        self.assertEqual(resp["meta"]["total"], 7)
+        self.assertGreaterEqual(self.client.get(self.url, {"count": "estimated"}).json()["meta"]["total"], 0)
+
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(self.url, {"page": 3, "page_size": 3, "count": "none"}).json()
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertEqual((len(resp["data"]["items"]), resp["meta"]["has_next"]), (1, False))
+
+        self.assertEqual(self.client.get(self.url, {"cursor": "garbage"}).status_code,
+                         status.HTTP_400_BAD_REQUEST)
+
+
+class FacetTests(ContentAPITestCase):
+    url = reverse("content:content-facets")
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        Recipe.objects.create(title="A", meal_type="dinner", diet_tag="vegan", is_published=True)
+        Recipe.objects.create(title="B", meal_type="dinner", diet_tag="veg", is_published=True)
+        Recipe.objects.create(title="C", meal_type="lunch", diet_tag="vegan", is_published=False)
+        Session.objects.create(title="S", category="yoga", difficulty="beginner", is_published=True)
+
+    def test_counts_cached_until_edit(self):
+        with CaptureQueriesContext(connection) as ctx:
+            data = self.client.get(self.url).json()["data"]
+        self.assertEqual(len(ctx.captured_queries), 3)  # one GROUP BY per type
+        self.assertEqual(data["recipe"]["meal_type"], {"dinner": 2})
+        self.assertEqual(data["recipe"]["diet_tag"], {"veg": 1, "vegan": 1})
+        self.assertEqual(data["session"]["category"], {"yoga": 1})
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(self.url)
+        self.assertEqual(len(ctx.captured_queries), 0)
+
+        Recipe.objects.create(title="D", meal_type="lunch", diet_tag="veg", is_published=True)
+        data = self.client.get(self.url, {"types": "recipe"}).json()["data"]
+        self.assertEqual(list(data), ["recipe"])
+        self.assertEqual(data["recipe"]["meal_type"], {"dinner": 2, "lunch": 1})
+        self.assertEqual(self.client.get(self.url, {"types": "deal"}).status_code,
+                         status.HTTP_400_BAD_REQUEST)
+
+    def test_category_item_count_tracks_sessions(self):
+        yoga = Category.objects.create(name="Yoga")
+        cardio = Category.objects.create(name="Cardio")
+        session = Session.objects.create(title="Flow", category="yoga", is_published=True)
+        yoga.refresh_from_db()
+        self.assertEqual(yoga.item_count, 1)
+
+        session.category = "cardio"
+        session.save()
+        session.is_published = False
+        session.save()
+        yoga.refresh_from_db()
+        cardio.refresh_from_db()
+        self.assertEqual((yoga.item_count, cardio.item_count), (0, 0))
+
+        # Bulk updates bypass signals; reconcile repairs the drift.
+        Session.objects.update(is_published=True)
+        self.assertEqual(CategoryCounts.reconcile(), 2)
+        yoga.refresh_from_db()
+        cardio.refresh_from_db()
+        self.assertEqual((yoga.item_count, cardio.item_count), (1, 1))
+        self.assertEqual(CategoryCounts.reconcile(), 0)
+
+
+class RecipeFilterTests(ContentAPITestCase):
+    url = reverse("content:content-recipes")
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        Recipe.objects.create(
+            title="Peanut Chaat", meal_type="snack", is_published=True, tags=["High Protein", "quick"],
+            ingredients=[{"item": "Roasted  Peanuts", "quantity": "1", "unit": "cup"}],
+        )
+        Recipe.objects.create(
+            title="Moong Salad", meal_type="lunch", is_published=True, tags=["high_protein"],
+            ingredients=[{"item": "Moong sprouts"}],
+        )
+        Recipe.objects.create(title="Poha", meal_type="breakfast", is_published=True, tags=["quick"])
+
+    def _titles(self, **params):
+        resp = self.client.get(self.url, params)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        return sorted(r["title"] for r in resp.json()["data"]["items"])
+
+    def test_terms_normalized_on_save(self):
+        recipe = Recipe.objects.get(title="Peanut Chaat")
+        self.assertEqual(recipe.tags, ["high-protein", "quick"])
+        self.assertEqual(recipe.ingredient_keys, ["roasted peanuts"])
+        self.assertNotIn("key", recipe.ingredients[0])  # match keys never reach the API payload
+        self.assertEqual(recipe.ingredients[0]["item"], "Roasted  Peanuts")
+        self.assertEqual(normalize_tags([" Low Carb ", "low-carb", "", 3]), ["low-carb"])
+
+    def test_containment_filters(self):
+        self.assertEqual(self._titles(tags_all="High Protein"), ["Moong Salad", "Peanut Chaat"])
+        self.assertEqual(self._titles(tags_all="high-protein,quick"), ["Peanut Chaat"])
+        self.assertEqual(self._titles(tags_any="quick"), ["Peanut Chaat", "Poha"])
+        self.assertEqual(
+            self._titles(tags_all="high-protein", exclude_ingredient="roasted peanuts"), ["Moong Salad"],
+        )
+        # Each filter combination gets its own cached ID list.
+        self.assertEqual(self._titles(tags_any="quick,high-protein"),
+                         ["Moong Salad", "Peanut Chaat", "Poha"])
+
+
+class RecipeNutritionTests(ContentAPITestCase):
+    url = reverse("content:content-recipes")
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        Recipe.objects.create(title="Tofu Bowl", meal_type="lunch", is_published=True, calories=380,
+                              nutrition_facts={"Protein": "28 g", "carbs": "30g", "fat": "12g"})
+        Recipe.objects.create(title="Paneer Wrap", meal_type="lunch", is_published=True,
+                              nutrition_facts={"protein": 25, "carbohydrates": "52.5g", "calories": "520 kcal"})
+        Recipe.objects.create(title="Fruit Cup", meal_type="snack", is_published=True, calories=150)
+
+    def _titles(self, **params):
+        resp = self.client.get(self.url, params)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        return [r["title"] for r in resp.json()["data"]["items"]]
+
+    def test_extracted_on_save(self):
+        self.assertEqual((parse_amount("300mg"), parse_amount("n/a"), parse_amount(True)), (0.3, None, None))
+        wrap = Recipe.objects.get(title="Paneer Wrap")
+        self.assertEqual((wrap.protein_g, wrap.carbs_g, wrap.fat_g, wrap.calories), (25.0, 52.5, None, 520))
+
+    def test_range_filters_and_sort(self):
+        self.assertEqual(self._titles(max_calories=400, min_protein=25), ["Tofu Bowl"])
+        self.assertEqual(self._titles(sort="-protein"), ["Tofu Bowl", "Paneer Wrap", "Fruit Cup"])
+        self.assertEqual(self._titles(sort="calories"), ["Fruit Cup", "Tofu Bowl", "Paneer Wrap"])
+        self.assertEqual(self.client.get(self.url, {"min_fat": "lots"}).status_code,
+                         status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(self.url, {"sort": "title"}).status_code,
+                         status.HTTP_400_BAD_REQUEST)
+
+    def test_backfill_command(self):
+        Recipe.objects.update(protein_g=None, nutrition_facts={"protein": "40g"})
+        out = io.StringIO()
+        call_command("backfill_recipe_nutrition", "--chunk-size", "2", stdout=out)
+        self.assertIn("Updated 3 recipe(s)", out.getvalue())
+        self.assertEqual(self._titles(min_protein=40), ["Fruit Cup", "Paneer Wrap", "Tofu Bowl"])
+
+
+class DealPricingTests(ContentAPITestCase):
+    url = reverse("content:content-deals")
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        Deal.objects.create(item_name="Spinach", price="₹20/bunch", original_price="₹25")
+        Deal.objects.create(item_name="Almonds", price="Rs 1,200 per kg", original_price="Rs 2,000")
+        Deal.objects.create(item_name="Honey", price="₹150")
+        Deal.objects.create(item_name="Old Mangoes", price="₹10", original_price="₹100",
+                            expires_at=timezone.now() - timedelta(hours=1))
+
+    def _names(self, **params):
+        resp = self.client.get(self.url, params)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        return [d["item_name"] for d in resp.json()["data"]["items"]]
+
+    def test_parsed_on_save(self):
+        self.assertEqual(parse_price("Rs 1,200 per kg"), (Decimal("1200"), "kg"))
+        self.assertEqual(parse_price("free"), (None, ""))
+        self.assertEqual(parse_price("₹1.999"), (Decimal("2.00"), ""))
+        self.assertEqual(parse_price("₹12345678901"), (None, ""))
+        self.assertEqual(parse_price("1" * 40), (None, ""))
+        huge = Deal.objects.create(item_name="Saffron", price="₹12345678901", original_price="₹1.999")
+        huge.refresh_from_db()
+        self.assertEqual((huge.price_amount, huge.original_amount), (None, Decimal("2.00")))
+        spinach = Deal.objects.get(item_name="Spinach")
+        self.assertEqual((spinach.price_amount, spinach.price_unit, spinach.discount_percent),
+                         (Decimal("20"), "bunch", 20))
+        item = next(d for d in self.client.get(self.url).json()["data"]["items"] if d["item_name"] == "Spinach")
+        self.assertEqual(item["discount_text"], "20% off")
+
+    def test_expired_hidden_sorted_and_swept(self):
+        self.assertEqual(self._names(), ["Honey", "Almonds", "Spinach"])
+        self.assertEqual(self._names(sort="discount"), ["Almonds", "Spinach", "Honey"])
+        self.assertEqual(self.client.get(self.url, {"sort": "cheapest"}).status_code,
+                         status.HTTP_400_BAD_REQUEST)
+
+        out = io.StringIO()
+        call_command("deactivate_expired_deals", stdout=out)
+        self.assertIn("Deactivated 1 expired deal(s)", out.getvalue())
+        self.assertFalse(Deal.objects.get(item_name="Old Mangoes").is_active)
+
+
+class RenderingTests(ContentAPITestCase):
+    def test_fast_renderer_matches_drf_and_splices_fragments(self):
+        payload = {
+            "text": "Dal \u2028 तड़का </script>", "when": timezone.now(), "n": Decimal("1.50"),
+            "nested": [{"a": 1.25, "b": None, "c": True}], "big": 2 ** 70,
+        }
+        self.assertEqual(ApiJSONRenderer().render(payload), JSONRenderer().render(payload))
+
+        fragment = RawJSON(encode_json({"id": 7, "title": "Poha"}))
+        body = ApiJSONRenderer().render({"data": {"items": [fragment, {"id": 8}], "one": fragment}})
+        self.assertEqual(json.loads(body), {
+            "data": {"items": [{"id": 7, "title": "Poha"}, {"id": 8}], "one": {"id": 7, "title": "Poha"}},
+        })
+        with self.assertRaises(ValueError):
+            encode_json({"x": float("nan")})
+
+    def test_compact_envelope_header(self):
+        url = reverse("content:content-recipes")
+        full = self.client.get(url)
+        self.assertIn("endpoint", full.json())
+        self.assertIn("X-Envelope", full["Vary"])
+        compact = self.client.get(url, HTTP_X_ENVELOPE="compact").json()
+        self.assertNotIn("endpoint", compact)
+        self.assertEqual(compact["status"]["code"], 200)
+
+
+class ProjectionTests(ContentAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.request = APIRequestFactory().get("/api/content/")
+        video = Video.objects.create(title="Flow", duration_seconds=3725, is_published=True,
+                                     thumbnail="content/videos/t.jpg", video="content/videos/v.mp4")
+        Video.objects.create(title="Short", duration_seconds=42)
+        first, second = Playlist.objects.create(title="A"), Playlist.objects.create(title="B")
+        video.playlist.add(first, second)
+        Session.objects.create(title="Calm", category="meditation", video=video, benefits=["focus"])
+        Session.objects.create(title="Solo", category="yoga", thumbnail="content/sessions/s.png")
+        Recipe.objects.create(title="Dal", meal_type="lunch", prep_time_minutes=50, cook_time_minutes=25,
+                              nutrition_facts={"protein": "12.5g"}, tags=["Quick"])
+        Recipe.objects.create(title="Salad", meal_type="lunch", diet_tag=None, prep_time_minutes=5)
+        Deal.objects.create(item_name="Figs", price="₹99/box", original_price="₹120",
+                            expires_at=timezone.now() - timedelta(days=1))
+        Deal.objects.create(item_name="Dates", price="market rate")
+        BreathworkExercise.objects.create(title="Box", pattern="4-4-4-4", duration="4 min")
+        AmbientSound.objects.create(name="Rain", emoji="🌧")
+
+    def test_output_identical_to_read_serializers(self):
+        context = {"request": self.request}
+        for model, projection in PROJECTIONS.items():
+            with self.subTest(model=model.__name__):
+                qs = model.objects.order_by("pk")
+                expected = projection.serializer_class(qs, many=True, context=context).data
+                actual = projection.data(qs, context)
+                # JSON columns come through as RawJSON, so compare what the client receives.
+                self.assertEqual(json.loads(encode_json(actual)), json.loads(encode_json(expected)))
+                self.assertEqual([list(row) for row in actual], [list(row) for row in expected])
+
+    def test_cold_list_page_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            items = self.client.get(reverse("content:content-videos")).json()["data"]["items"]
+        # ID list, values() page, playlist ids
+        self.assertEqual(len(ctx.captured_queries), 3)
+        self.assertEqual(sorted(items[0]["playlists"]), sorted(Playlist.objects.values_list("pk", flat=True)))
+
+
+class SparseFieldsetTests(ContentAPITestCase):
+    url = reverse("content:content-recipes")
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.recipe = Recipe.objects.create(title="Dal", meal_type="lunch", is_published=True,
+                                            prep_time_minutes=10, cook_time_minutes=20,
+                                            ingredients=[{"item": "Lentils"}], steps=[{"order": 1}])
+
+    def test_list_trims_output_and_columns(self):
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(self.url, {"fields": "title,total_time_display,thumbnail"})
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        [item] = resp.json()["data"]["items"]
+        self.assertEqual(item, {"id": self.recipe.pk, "title": "Dal", "total_time_display": "30 min",
+                                "thumbnail": None})
+        page_sql = ctx.captured_queries[-1]["sql"]
+        self.assertIn("prep_time_minutes", page_sql)
+        self.assertNotIn("ingredients", page_sql)
+
+        # Same ID list, separate fragments: the full shape is not served the trimmed rows.
+        [full] = self.client.get(self.url).json()["data"]["items"]
+        self.assertEqual(full["ingredients"][0]["item"], "Lentils")
+        [omitted] = self.client.get(self.url, {"omit": "ingredients,steps"}).json()["data"]["items"]
+        self.assertEqual(set(full) - set(omitted), {"ingredients", "steps"})
+
+    def test_retrieve_defers_pruned_columns(self):
+        url = reverse("content:content-recipe_retrieve", kwargs={"pk": self.recipe.pk})
+        with CaptureQueriesContext(connection) as ctx:
+            data = self.client.get(url, {"omit": "ingredients,steps,nutrition_facts,tags"}).json()["data"]
+        self.assertNotIn("steps", data)
+        self.assertEqual(data["total_time_minutes"], 30)
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertNotIn("ingredients", ctx.captured_queries[0]["sql"])
+
+    def test_unknown_field_rejected(self):
+        resp = self.client.get(self.url, {"fields": "title,secret"})
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("secret", json.dumps(resp.json()))
+
+    def test_rejected_fieldset_does_not_count_an_impression(self):
+        playlist = Playlist.objects.create(title="P")
+        url = reverse("content:content-playlist_retrieve", kwargs={"pk": playlist.pk})
+
+        with mock.patch("apps.content.views.PlaylistUniqueViewers.add") as add_viewer:
+            resp = self.client.get(url, {"fields": "bogus"})
+
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+        playlist.refresh_from_db()
+        self.assertEqual(playlist.impressions, 0)
+        add_viewer.assert_not_called()
+
+
+class CircuitBreakerTests(TestCase):
+    def setUp(self):
+        self.now = 0.0
+        self.breaker = CircuitBreaker(failure_threshold=3, slow_ms=100, cooldown=10, clock=lambda: self.now)
+
+    def test_trips_on_failures_and_slow_calls(self):
+        self.breaker.record(0.01, ok=False)
+        self.breaker.record(0.5)  # slow counts as a failure
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+        self.assertEqual(self.breaker.record(0.01, ok=False), CircuitBreaker.OPEN)
+        self.assertFalse(self.breaker.allow())
+        self.assertEqual(self.breaker.stats["short_circuited"], 1)
+
+    def test_success_resets_consecutive_count(self):
+        self.breaker.record(0.01, ok=False)
+        self.breaker.record(0.01, ok=False)
+        self.breaker.record(0.01)
+        self.breaker.record(0.01, ok=False)
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_half_open_admits_single_probe(self):
+        for _ in range(3):
+            self.breaker.record(0.01, ok=False)
+        self.now = 11
+        self.assertTrue(self.breaker.allow())
+        self.assertFalse(self.breaker.allow())  # everyone else stays on the fallback
+        self.assertEqual(self.breaker.record(0.5), CircuitBreaker.OPEN)  # slow probe re-opens
+        self.assertFalse(self.breaker.allow())
+        self.now = 22
+        self.assertTrue(self.breaker.allow())
+        self.assertEqual(self.breaker.record(0.01), CircuitBreaker.CLOSED)
+        self.assertTrue(self.breaker.allow())
+        self.assertEqual(self.breaker.stats["opened_count"], 2)
+
+    def test_fallback_cache_stops_calling_dead_redis(self):
+        backend = FallbackCache("redis://127.0.0.1:1/0", {"FALLBACK_FAILURE_THRESHOLD": 2, "FALLBACK_COOLDOWN": 60})
+        self.assertEqual(backend._params["OPTIONS"]["SOCKET_TIMEOUT"], 0.25)
+        backend._redis = mock.Mock()
+        backend._redis.get.side_effect = ConnectionError("refused")
+        backend._redis.set.side_effect = ConnectionError("refused")
+
+        backend.set("k", "v")
+        self.assertEqual(backend.get("k"), "v")
+        self.assertEqual(backend.get("k"), "v")
+        self.assertEqual(backend._redis.get.call_count + backend._redis.set.call_count, 2)
+        self.assertTrue(backend.stats["using_fallback"])
+        self.assertEqual(backend.stats["breaker"]["state"], "open")
+
+    def test_outage_journal_replayed_before_recovery(self):
+        backend = FallbackCache("redis://127.0.0.1:1/0", {"KEY_PREFIX": "ahara", "FALLBACK_JOURNAL_SIZE": 2})
+        backend._breaker = CircuitBreaker(failure_threshold=1, cooldown=0)
+        backend._redis = mock.Mock(wraps=backend._redis)
+        backend._redis.delete.side_effect = ConnectionError("refused")
+        backend._redis.incr.side_effect = ConnectionError("refused")
+        backend._redis.get.side_effect = ConnectionError("refused")
+
+        backend.delete("a")
+        backend.set("tag", 5)
+        backend.incr("tag")
+        backend.incr("tag", 2)
+        backend.delete("b")  # evicts "a": the journal holds two keys
+        self.assertEqual(backend.stats["journal"], {"pending": 2, "dropped": 1})
+
+        pipe = mock.Mock()
+        backend._redis.client = mock.Mock()
+        backend._redis.client.get_client.return_value.pipeline.return_value = pipe
+        backend._redis.get.side_effect = None
+        backend._redis.get.return_value = "fresh"
+        self.assertEqual(backend.get("b"), "fresh")
+
+        pipe.incrby.assert_called_once_with("ahara:1:tag", 3)
+        pipe.delete.assert_called_once_with("ahara:1:b")
+        pipe.execute.assert_called_once()
+        self.assertEqual(backend.stats["journal"]["pending"], 0)
+        self.assertEqual(backend.stats["breaker"]["state"], "closed")
+
+
+@override_settings(CACHES=FALLBACK_CACHES)
+class CacheBatchTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_pipeline_runs_as_one_call(self):
+        with cache.count_round_trips() as trips:
+            results = (
+                cache_pipeline().set("a", [1, 2], 60).get("a").add("a", 3).delete("a").get("a", "gone").execute()
+            )
+        self.assertEqual(trips.count, 1)
+        self.assertEqual(results[1], [1, 2])
+        self.assertFalse(results[2])
+        self.assertEqual(results[4], "gone")
+
+    def test_scripted_throttle_one_call_per_check(self):
+        from rest_framework.throttling import SimpleRateThrottle
+
+        class Throttle(ScriptedThrottleMixin, SimpleRateThrottle):
+            rate = "2/min"
+
+            def get_cache_key(self, request, view):
+                return "throttle_test"
+
+        request = APIRequestFactory().get("/")
+        with cache.count_round_trips() as trips:
+            allowed = [Throttle().allow_request(request, None) for _ in range(3)]
+        self.assertEqual(allowed, [True, True, False])
+        self.assertEqual(trips.count, 3)
+
+        throttle = Throttle()
+        throttle.allow_request(request, None)
+        self.assertGreater(throttle.wait(), 50)
+
+    def test_sliding_window_fallback_expires_old_requests(self):
+        args = lambda now: [now, 60, 1, str(now)]  # noqa: E731
+        self.assertEqual(SLIDING_WINDOW(["w"], args(100.0))[0], 1)
+        self.assertEqual(SLIDING_WINDOW(["w"], args(120.0))[0], 0)
+        self.assertEqual(SLIDING_WINDOW(["w"], args(161.0))[:2], [1, 1])
+
+    def test_get_first_reads_every_candidate_at_once(self):
+        builds = []
+
+        def builder(value):
+            return lambda: builds.append(value) or value
+
+        candidates = [("first", builder(None)), ("second", builder("tip"))]
+        self.assertEqual(get_first(candidates, 60, tags=["content:tip"]), "tip")
+        with cache.count_round_trips() as trips:
+            self.assertEqual(get_first(candidates, 60, tags=["content:tip"]), "tip")
+        self.assertEqual(trips.count, 1)
+        self.assertEqual(builds, [None, "tip"])
+
+
+class NearCacheTests(ContentAPITestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def test_lru_ttl_and_epoch_bounds(self):
+        now = [0.0]
+        near = NearCache(prefixes=["ahara:cat"], max_entries=2, ttl=30, clock=lambda: now[0])
+        near.reset(subscribed=True)
+        for key in ("a", "b"):
+            near.put(key, key.upper(), near.epoch)
+        near.get("a")
+        near.put("c", "C", near.epoch)  # evicts "b", the least recently used
+        self.assertEqual([near.get(key) for key in ("a", "c")], ["A", "C"])
+        self.assertFalse(near.get("b"))
+
+        epoch = near.epoch
+        near.invalidate(["a"])
+        near.put("a", "stale", epoch)  # read raced the invalidation: not stored
+        self.assertFalse(near.get("a"))
+        now[0] = 31
+        self.assertFalse(near.get("c"))
+
+    def test_reads_served_locally_and_writes_broadcast(self):
+        backend = FallbackCache("redis://127.0.0.1:1/0", {"FALLBACK_NEAR_PREFIXES": ["ahara:cat"]})
+        backend._near_listener = threading.current_thread()  # no listener thread in tests
+        backend._near.reset(subscribed=True)
+        backend._redis = mock.Mock()
+        backend._redis.make_key.side_effect = lambda key, version=None: f":1:{key}"
+        backend._redis.get.return_value = ["Yoga"]
+        publish = backend._redis.client.get_client.return_value.publish
+
+        self.assertEqual([backend.get("ahara:cat:list") for _ in range(3)], [["Yoga"]] * 3)
+        backend.get("ahara:other")
+        self.assertEqual(backend._redis.get.call_count, 2)
+        tiers = backend.stats["tiers"]
+        self.assertEqual((tiers["near"]["hits"], tiers["near"]["misses"], tiers["redis"]["hits"]), (2, 1, 2))
+
+        backend.set("ahara:cat:list", ["Yoga", "Diet"])
+        publish.assert_called_once_with(backend._near_channel, ":1:ahara:cat:list")
+        backend._redis.get.return_value = ["Yoga", "Diet"]
+        self.assertEqual(backend.get("ahara:cat:list"), ["Yoga", "Diet"])
+
+        backend._near.reset(subscribed=False)  # listener lost its connection
+        backend.get("ahara:cat:list")
+        self.assertEqual(backend._redis.get.call_count, 4)
+
+    def test_static_lists_cached_until_edited(self):
+        exercise = BreathworkExercise.objects.create(title="Box", pattern="4-4-4-4", duration="4 min")
+        url = reverse("content:content-breathwork")
+        self.assertEqual(self.client.get(url).json()["data"]["items"][0]["title"], "Box")
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(url)
+        self.assertFalse([q for q in ctx.captured_queries if "breathwork" in q["sql"].lower()])
+
+        exercise.title = "Square"
+        exercise.save()
+        self.assertEqual(self.client.get(url).json()["data"]["items"][0]["title"], "Square")
+        sparse = self.client.get(url, {"fields": "title"}).json()["data"]["items"]
+        self.assertEqual(sparse, [{"id": exercise.pk, "title": "Square"}])
@@ -16,19 +16,40 @@ from datetime import time as dt_time
 from datetime import timezone as dt_tz
 
 from django.conf import settings
-from django.core.cache import cache
 from django.db import transaction
-from django.db.models import Q
+from django.db.models import F
+from django.http import HttpResponseNotModified
 from django.utils import timezone
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework_simplejwt.authentication import JWTAuthentication
 
-from utilities.cache_keys import tip_scheduled, tip_random, tip_pool as _tip_pool_key, featured_lock
-from utilities.pagination import paginate_queryset
-from utilities.response import api_response
-
+from utilities.db import update_returning
+from utilities.cache_compute import get_first, get_or_compute
+from utilities.cache_keys import (
+    content_tag, search_result, static_content, tip_pool as _tip_pool_key, tip_random, tip_scheduled,
+    user_plan_day, user_plan_tag,
+)
+from utilities.pagination import page_params, paginate_queryset
+from utilities.response import RawJSON, api_response, encode_json, encoded_api_response
+
+from .logic.autocomplete import Autocomplete
+from .logic.config import content_cfg
+from .logic.deals import active_q
+from .logic.facets import FACETS, Facets
+from .logic.featured import FeaturedPlaylists
+from .logic.ingest import EventBatch, IngestError, iter_json_array, iter_ndjson
+from .logic.listing import CachedListing
+from .logic.nutrition import apply_filters as apply_nutrition, filter_params as nutrition_params
+from .logic.projection import (
+    AMBIENT_SOUND_PROJECTION, BREATHWORK_PROJECTION, DEAL_PROJECTION, RECIPE_PROJECTION,
+    SESSION_PROJECTION, VIDEO_PROJECTION,
+)
+from .logic.recipe_filters import filter_recipes, ingredient_key, normalize_tag, split_param
+from .logic.search import SEARCH_SPECS, ContentSearch
+from .logic.trending import PlaylistTrending
+from .logic.unique_viewers import PlaylistUniqueViewers
 from .models import (
     Category,
     DailyTip,
@@ -69,6 +90,8 @@ from .serializers import (
 
 ETAG_SPLIT_RE = re.compile(r"\s*,\s*")
 
+NDJSON_CONTENT_TYPES = {"application/x-ndjson", "application/ndjson", "application/jsonl"}
+
 
 def _tip_cache_ttl() -> int:
     """Seconds remaining until UTC midnight — expires daily-tip cache entries at day rollover."""
@@ -79,13 +102,14 @@ def _tip_cache_ttl() -> int:
 
 def _search_cache_key(resource: str, **params) -> str:
     """
-    Build a deterministic Redis key for a filtered/paginated list request.
+    Build a deterministic Redis key for a filtered list request.
 
     Only non-empty params are included so that missing and empty-string filters
     produce the same key. Values are lowercased so 'Yoga' and 'yoga' hit the
-    same cache entry.
+    same cache entry.  Pagination is deliberately not part of the key: the
+    entry holds the full ordered ID list and every page is a slice of it.
 
-    Example: _search_cache_key("recipe", q="paneer", page=1, page_size=20)
+    Example: _search_cache_key("recipe", q="paneer")
              -> "ahara:search:recipe:a3f1c2d4e5b6a7f8"
     """
     normalized = json.dumps(
@@ -93,7 +117,21 @@ def _search_cache_key(resource: str, **params) -> str:
         separators=(",", ":"),
     )
     digest = hashlib.sha256(normalized.encode()).hexdigest()[:16]
-    return f"ahara:search:{resource}:{digest}"
+    return search_result(resource, digest)
+
+
+SESSION_LISTING = CachedListing("session", SESSION_PROJECTION)
+RECIPE_LISTING = CachedListing("recipe", RECIPE_PROJECTION)
+VIDEO_LISTING = CachedListing("video", VIDEO_PROJECTION)
+DEAL_LISTING = CachedListing("deal", DEAL_PROJECTION, expires_field="expires_at")
+
+# ?sort= for /deals ("" keeps the queryset's newest-first order).
+DEAL_SORTS = {
+    "": None,
+    "newest": ("-created_at",),
+    "discount": (F("discount_percent").desc(nulls_last=True), "-created_at"),
+    "price": (F("price_amount").asc(nulls_last=True), "-created_at"),
+}
 
 
 class ContentViewSet(viewsets.GenericViewSet):
@@ -121,6 +159,7 @@ class ContentViewSet(viewsets.GenericViewSet):
         "playlist_ratings_reset": PlaylistReadSerializer,
         "playlist_impressions_reset": PlaylistReadSerializer,
         "featured_playlists": PlaylistReadSerializer,
+        "trending_playlists": PlaylistReadSerializer,
         # Videos
         "videos": VideoReadSerializer,
         "video_retrieve": VideoReadSerializer,
@@ -142,6 +181,7 @@ class ContentViewSet(viewsets.GenericViewSet):
         # Categories
         "categories": CategoryReadSerializer,
         "category_create": CategoryWriteSerializer,
+        "facets": CategoryReadSerializer,
         # User stats
         "stats_today": UserDailyStatSerializer,
         "stats_update": UserDailyStatSerializer,
@@ -154,7 +194,10 @@ class ContentViewSet(viewsets.GenericViewSet):
         "breathwork": BreathworkExerciseSerializer,
         "ambient_sounds": AmbientSoundSerializer,
         "search_config": SearchConfigSerializer,
+        "search": PlaylistReadSerializer,
+        "search_suggest": SearchConfigSerializer,
         "batch_event": PlaylistReadSerializer,
+        "playlist_events_ingest": PlaylistReadSerializer,
     }
 
     # ---- Per-action permission map ----
@@ -169,6 +212,7 @@ class ContentViewSet(viewsets.GenericViewSet):
         "playlist_ratings_reset": [IsAuthenticated],
         "playlist_impressions_reset": [IsAuthenticated],
         "featured_playlists": [IsAuthenticated],
+        "trending_playlists": [IsAuthenticated],
         "videos": [IsAuthenticated],
         "video_retrieve": [IsAuthenticated],
         "sessions": [IsAuthenticated],
@@ -184,6 +228,7 @@ class ContentViewSet(viewsets.GenericViewSet):
         "daily_tip_create": [IsAuthenticated],
         "categories": [IsAuthenticated],
         "category_create": [IsAuthenticated],
+        "facets": [IsAuthenticated],
         "stats_today": [IsAuthenticated],
         "stats_update": [IsAuthenticated],
         "plan_today": [IsAuthenticated],
@@ -193,7 +238,10 @@ class ContentViewSet(viewsets.GenericViewSet):
         "breathwork": [IsAuthenticated],
         "ambient_sounds": [IsAuthenticated],
         "search_config": [IsAuthenticated],
+        "search": [IsAuthenticated],
+        "search_suggest": [IsAuthenticated],
         "batch_event": [IsAuthenticated],
+        "playlist_events_ingest": [IsAuthenticated],
     }
 
     # ---- Per-action authentication map ----
@@ -212,15 +260,18 @@ class ContentViewSet(viewsets.GenericViewSet):
         "playlist_rate": lambda self, r: Playlist.objects.all(),
         "playlist_ratings_reset": lambda self, r: Playlist.objects.all(),
         "playlist_impressions_reset": lambda self, r: Playlist.objects.all(),
+        # Only used when the Redis leaderboard is unavailable.
+        "trending_playlists": lambda self, r: Playlist.objects.all().order_by("-impressions", "-ctr"),
         "videos": lambda self, r: Video.objects.filter(is_published=True).prefetch_related("playlist").order_by("-created_at"),
         "video_retrieve": lambda self, r: Video.objects.filter(is_published=True).prefetch_related("playlist"),
-        "sessions": lambda self, r: Session.objects.select_related("video").filter(is_published=True).order_by("order", "-created_at"),
+        "sessions": lambda self, r: Session.objects.filter(is_published=True).order_by("order", "-created_at"),
         "session_retrieve": lambda self, r: Session.objects.filter(is_published=True),
         "recipes": lambda self, r: Recipe.objects.filter(is_published=True).order_by("-created_at"),
         "recipe_retrieve": lambda self, r: Recipe.objects.filter(is_published=True),
-        "deals": lambda self, r: Deal.objects.filter(is_active=True).order_by("-created_at"),
-        "deal_retrieve": lambda self, r: Deal.objects.filter(is_active=True),
+        "deals": lambda self, r: Deal.objects.filter(active_q()).order_by("-created_at"),
+        "deal_retrieve": lambda self, r: Deal.objects.filter(active_q()),
         "categories": lambda self, r: Category.objects.filter(is_active=True).order_by("order", "name"),
+        "facets": lambda self, r: Category.objects.none(),
         "plan_today": lambda self, r: UserPlanItem.objects.filter(
             user=r.user, date=date.today()
         ).order_by("order", "time"),
@@ -230,6 +281,22 @@ class ContentViewSet(viewsets.GenericViewSet):
         "breathwork": lambda self, r: BreathworkExercise.objects.filter(is_active=True).order_by("order"),
         "ambient_sounds": lambda self, r: AmbientSound.objects.filter(is_active=True).order_by("order"),
         "search_config": lambda self, r: SearchConfig.objects.filter(is_active=True),
+        "search": lambda self, r: Playlist.objects.all(),
+        "search_suggest": lambda self, r: SearchConfig.objects.none(),
+    }
+
+    # ---- Per-action projection map (column pruning for ?fields= / ?omit=) ----
+    projection_action_classes = {
+        "videos": VIDEO_PROJECTION,
+        "video_retrieve": VIDEO_PROJECTION,
+        "sessions": SESSION_PROJECTION,
+        "session_retrieve": SESSION_PROJECTION,
+        "recipes": RECIPE_PROJECTION,
+        "recipe_retrieve": RECIPE_PROJECTION,
+        "deals": DEAL_PROJECTION,
+        "deal_retrieve": DEAL_PROJECTION,
+        "breathwork": BREATHWORK_PROJECTION,
+        "ambient_sounds": AMBIENT_SOUND_PROJECTION,
     }
 
     # ── Map helpers ─────────────────────────────────────────────────
@@ -264,9 +331,25 @@ class ContentViewSet(viewsets.GenericViewSet):
         action = getattr(self, "action", None)
         builder = self.queryset_action_classes.get(action)
         if builder:
-            return builder(self, self.request)
+            qs = builder(self, self.request)
+            projection = self.projection_action_classes.get(action)
+            fields = self.sparse_fields()
+            if projection is not None and fields is not None:
+                # Pruned columns (large JSON ones included) are never fetched.
+                qs = projection.subset(fields).prune(qs)
+            return qs
         return Playlist.objects.none()
 
+    def sparse_fields(self):
+        """
+        ``?fields=`` / ``?omit=`` resolved against this action's Read
+        serializer (see ``SparseFieldsMixin``); ``None`` for the full shape.
+        """
+        serializer_class = self.get_serializer_class()
+        if not hasattr(serializer_class, "sparse_fields"):
+            return None
+        return serializer_class.sparse_fields(self.request.query_params)
+
     # ════════════════════════════════════════════════════════════════
     # PLAYLIST ENDPOINTS (existing, preserved as-is)
     # ════════════════════════════════════════════════════════════════
@@ -275,7 +358,7 @@ class ContentViewSet(viewsets.GenericViewSet):
     def playlist(self, request, *args, **kwargs):
         qs = self.get_queryset()
         page_qs, meta = paginate_queryset(qs, request)
-        ser = self.get_serializer(page_qs, many=True, context={"request": request})
+        ser = self.get_serializer(page_qs, many=True, context={"request": request, "fields": self.sparse_fields()})
         return api_response(
             request,
             data={"items": ser.data, "count": meta["total"]},
@@ -296,13 +379,14 @@ class ContentViewSet(viewsets.GenericViewSet):
 
     @action(detail=False, methods=["get"], url_path=r"playlist/(?P<pk>\d+)", url_name="playlist_retrieve")
     def playlist_retrieve(self, request, pk=None, *args, **kwargs):
-        obj = self.get_queryset().filter(pk=pk).first()
+        fields = self.sparse_fields()  # a bad ?fields= is a 400 before any hit is counted
+        # One UPDATE ... RETURNING bumps the impression and reads the row.
+        obj = Playlist.record_hit(pk, "impression", when=timezone.now())
         if not obj:
             return api_response(request, status_code=status.HTTP_404_NOT_FOUND,
                                 errors={"detail": "Playlist not found"})
-        obj.inc_impression(when=timezone.now())
-        obj.refresh_from_db(fields=["impressions", "last_impressed_at"])
-        ser = self.get_serializer(obj, context={"request": request})
+        PlaylistUniqueViewers.add(obj.pk, request.user.pk)
+        ser = self.get_serializer(obj, context={"request": request, "fields": fields})
         return api_response(request, data=ser.data, status_code=status.HTTP_200_OK,
                             message="Playlist fetched successfully")
 
@@ -318,12 +402,11 @@ class ContentViewSet(viewsets.GenericViewSet):
 
     @action(detail=False, methods=["post"], url_path=r"playlist/(?P<pk>\d+)/click", url_name="playlist_click")
     def playlist_click(self, request, pk=None, *args, **kwargs):
-        obj = self.get_queryset().filter(pk=pk).first()
+        obj = Playlist.record_hit(pk, "click", when=timezone.now())
         if not obj:
             return api_response(request, status_code=status.HTTP_404_NOT_FOUND,
                                 errors={"detail": "Playlist not found"})
-        obj.inc_click(when=timezone.now())
-        obj.refresh_from_db(fields=["clicks", "last_clicked_at"])
+        PlaylistUniqueViewers.add(obj.pk, request.user.pk)
         return api_response(request, data={"id": obj.pk, "clicks": obj.clicks,
                             "last_clicked_at": obj.last_clicked_at},
                             status_code=status.HTTP_200_OK, message="Click recorded successfully")
@@ -346,8 +429,9 @@ class ContentViewSet(viewsets.GenericViewSet):
             ]
         }
 
-        Supported types: click, impression, start, complete
-        Unknown IDs and unknown types are silently skipped.
+        Supported types: click, impression, start, complete, exit
+        Unknown IDs and unknown types are silently skipped.  Large uploads
+        should use ``playlist/events/ingest`` instead.
         """
         events = request.data.get("events")
         if not isinstance(events, list) or not events:
@@ -357,51 +441,56 @@ class ContentViewSet(viewsets.GenericViewSet):
                 errors={"detail": "events must be a non-empty list"},
             )
 
-        now = timezone.now()
-        # Aggregate counts per (playlist_id, event_type) to minimise DB round-trips.
-        from collections import defaultdict
-        counts: dict[tuple, int] = defaultdict(int)
-        valid_types = {"click", "impression", "start", "complete"}
-
-        for event in events[:200]:  # cap to prevent abuse
-            try:
-                pid = int(event.get("id"))
-                etype = str(event.get("type", "")).lower()
-            except (TypeError, ValueError):
-                continue
-            if etype in valid_types:
-                counts[(pid, etype)] += 1
-
-        from django.db.models import F
-        processed = 0
-        for (pid, etype), count in counts.items():
-            update_kwargs: dict = {}
-            if etype == "click":
-                update_kwargs = {"clicks": F("clicks") + count, "last_clicked_at": now}
-            elif etype == "impression":
-                update_kwargs = {"impressions": F("impressions") + count, "last_impressed_at": now}
-            elif etype == "start":
-                update_kwargs = {"starts": F("starts") + count, "last_started_at": now,
-                                 "last_interaction_at": now}
-            elif etype == "complete":
-                update_kwargs = {"completes": F("completes") + count, "last_completed_at": now,
-                                 "last_interaction_at": now}
-            rows = Playlist.objects.filter(pk=pid).update(**update_kwargs)
-            processed += rows
+        # Fold every event type for a playlist into one delta row and apply
+        # the whole batch as a single set-based UPDATE.
+        batch = EventBatch(user_id=request.user.pk).extend(events)
+        batch.commit()
 
         return api_response(
             request,
-            data={"processed": processed},
+            data={"processed": batch.applied_pairs},
             status_code=status.HTTP_200_OK,
             message="Batch events recorded",
         )
 
+    @action(detail=False, methods=["post"], url_path="playlist/events/ingest",
+            url_name="playlist_events_ingest")
+    def playlist_events_ingest(self, request, *args, **kwargs):
+        """
+        POST /api/content/playlist/events/ingest/
+
+        Bulk analytics upload — one call per app session.  The body is
+        streamed and parsed incrementally, never buffered whole:
+
+        * ``Content-Type: application/x-ndjson`` — one event per line.
+        * anything else — a JSON array (``[...]`` or ``{"events": [...]}``).
+
+        Each event is ``{"id": 1, "type": "click"}`` or the compact
+        ``[1, "click"]``; dict events may also carry ``watch_seconds``,
+        ``progress``, ``device`` and ``language`` for the analytics
+        rollups.  Returns per-type accepted/rejected counts;
+        rejections for unknown playlists are reported under the event type,
+        malformed events under ``invalid`` / ``unknown_type`` / ``over_limit``.
+        """
+        stream = request.stream
+        if stream is None:
+            return api_response(request, status_code=status.HTTP_400_BAD_REQUEST,
+                                errors={"detail": "Request body is empty"})
+
+        max_bytes = content_cfg("INGEST_MAX_BYTES")
+        media_type = request.content_type.split(";")[0].strip().lower()
+        reader = iter_ndjson if media_type in NDJSON_CONTENT_TYPES else iter_json_array
+        try:
+            summary = EventBatch(user_id=request.user.pk).extend(reader(stream, max_bytes)).commit()
+        except IngestError as exc:
+            return api_response(request, status_code=status.HTTP_400_BAD_REQUEST,
+                                errors={"detail": str(exc)})
+
+        return api_response(request, data=summary, status_code=status.HTTP_200_OK,
+                            message="Events ingested")
+
     @action(detail=False, methods=["post"], url_path=r"playlist/(?P<pk>\d+)/rate", url_name="playlist_rate")
     def playlist_rate(self, request, pk=None, *args, **kwargs):
-        obj = self.get_queryset().filter(pk=pk).first()
-        if not obj:
-            return api_response(request, status_code=status.HTTP_404_NOT_FOUND,
-                                errors={"detail": "Playlist not found"})
         try:
             stars = int(request.data.get("stars"))
         except (TypeError, ValueError):
@@ -410,8 +499,14 @@ class ContentViewSet(viewsets.GenericViewSet):
         if stars < 1 or stars > 5:
             return api_response(request, status_code=status.HTTP_400_BAD_REQUEST,
                                 errors={"stars": "Stars must be between 1 and 5 inclusive"})
-        obj.add_rating(stars)
-        obj.refresh_from_db(fields=["rating_count", "rating_sum"])
+        rows = update_returning(
+            self.get_queryset().filter(pk=pk), ["rating_count", "rating_sum"],
+            rating_count=F("rating_count") + 1, rating_sum=F("rating_sum") + stars,
+        )
+        if not rows:
+            return api_response(request, status_code=status.HTTP_404_NOT_FOUND,
+                                errors={"detail": "Playlist not found"})
+        obj = rows[0]
         return api_response(request, status_code=status.HTTP_200_OK, message="Rating recorded",
                             data={"id": obj.pk, "stars": stars, "rating_count": obj.rating_count,
                                   "rating_sum": obj.rating_sum, "average_rating": obj.average_rating})
@@ -419,12 +514,12 @@ class ContentViewSet(viewsets.GenericViewSet):
     @action(detail=False, methods=["get"], url_path=r"playlist/(?P<pk>\d+)/ratings/reset",
             url_name="playlist_ratings_reset")
     def playlist_ratings_reset(self, request, pk=None, *args, **kwargs):
-        qs = self.get_queryset()
-        if not qs.filter(pk=pk).exists():
+        rows = update_returning(self.get_queryset().filter(pk=pk), ["rating_count", "rating_sum"],
+                                rating_count=0, rating_sum=0)
+        if not rows:
             return api_response(request, status_code=status.HTTP_404_NOT_FOUND,
                                 errors={"detail": "Playlist not found"})
-        qs.filter(pk=pk).update(rating_count=0, rating_sum=0)
-        obj = qs.only("id", "rating_count", "rating_sum").get(pk=pk)
+        obj = rows[0]
         return api_response(request, status_code=status.HTTP_200_OK, message="Ratings reset",
                             data={"id": obj.pk, "rating_count": obj.rating_count,
                                   "rating_sum": obj.rating_sum, "average_rating": 0.0})
@@ -432,13 +527,13 @@ class ContentViewSet(viewsets.GenericViewSet):
     @action(detail=False, methods=["get"], url_path=r"playlist/(?P<pk>\d+)/impressions/reset",
             url_name="playlist_impressions_reset")
     def playlist_impressions_reset(self, request, pk=None, *args, **kwargs):
-        qs = self.get_queryset()
-        obj = qs.filter(pk=pk).first()
-        if not obj:
+        rows = update_returning(self.get_queryset().filter(pk=pk),
+                                ["impressions", "last_impressed_at", "ctr"],
+                                impressions=0, last_impressed_at=None, ctr=0)
+        if not rows:
             return api_response(request, status_code=status.HTTP_404_NOT_FOUND,
                                 errors={"detail": "Playlist not found"})
-        qs.filter(pk=pk).update(impressions=0, last_impressed_at=None, ctr=0)
-        obj.refresh_from_db(fields=["impressions", "last_impressed_at", "ctr"])
+        obj = rows[0]
         return api_response(request, status_code=status.HTTP_200_OK,
                             message="Impressions reset successfully",
                             data={"id": obj.pk, "impressions": obj.impressions,
@@ -446,45 +541,84 @@ class ContentViewSet(viewsets.GenericViewSet):
 
     @action(detail=False, methods=["get"], url_path=r"playlist/featured", url_name="featured_playlists")
     def featured_playlists(self, request, *args, **kwargs):
-        blob = cache.get(settings.FEATURED_KEY)
-        if not blob:
-            # Acquire a short-lived lock so only one worker rebuilds the cache
-            # when the key expires under concurrent load (stampede prevention).
-            lock_acquired = cache.add(featured_lock(), "1", timeout=10)
-            if lock_acquired:
-                # We hold the lock — re-read (another worker may have populated
-                # it between our first get and the add).
-                blob = cache.get(settings.FEATURED_KEY)
-
-            if not blob:
-                resp = api_response(request, data={"items": []},
-                                    status_code=status.HTTP_404_NOT_FOUND,
-                                    message="Featured playlists not present in cache")
-                resp["Cache-Control"] = "public, max-age=60, stale-while-revalidate=60"
-                return resp
-
-        payload = {"data": blob}
-        raw = json.dumps(payload, sort_keys=True, separators=(",", ":")).encode("utf-8")
-        etag_value = hashlib.md5(raw).hexdigest()
-        etag_quoted = f'W/"{etag_value}"'
+        """
+        GET /api/content/playlist/featured/
 
-        inm = request.headers.get("If-None-Match", "")
-        candidates = [t.strip() for t in ETAG_SPLIT_RE.split(inm) if t.strip()]
-        candidates_normalized = {t.strip('W/w"') for t in candidates}
+        Served from a pre-rendered cache entry (see ``logic.featured``):
+        one cache read, an ETag string compare and the stored body.  A
+        miss is rebuilt by one worker (``get_or_compute``).
+        """
+        entry = FeaturedPlaylists.get()
+        headers = {
+            "ETag": entry["etag"],
+            "Last-Modified": entry["last_modified"],
+            "Cache-Control": "public, max-age=300, stale-while-revalidate=120",
+        }
 
-        if etag_value in candidates_normalized or etag_quoted in candidates:
-            resp = api_response(request, data=None,
-                                status_code=status.HTTP_304_NOT_MODIFIED, message="Not Modified")
-            resp["ETag"] = etag_quoted
-            resp["Cache-Control"] = "public, max-age=300, stale-while-revalidate=120"
+        inm = request.headers.get("If-None-Match")
+        if inm:
+            etag = entry["etag"]
+            not_modified = inm.strip() == "*" or any(
+                tag == etag or tag.removeprefix("W/") == etag.removeprefix("W/")
+                for tag in ETAG_SPLIT_RE.split(inm.strip())
+            )
+        else:
+            not_modified = request.headers.get("If-Modified-Since") == entry["last_modified"]
+
+        if not_modified:
+            resp = HttpResponseNotModified()
+            for name, value in headers.items():
+                resp[name] = value
             return resp
 
-        resp = api_response(request, data=payload["data"],
-                            status_code=status.HTTP_200_OK,
-                            message="Featured playlists fetched successfully")
-        resp["ETag"] = etag_quoted
-        resp["Cache-Control"] = "public, max-age=300, stale-while-revalidate=120"
-        return resp
+        return encoded_api_response(
+            request, data_bytes=entry["body"], status_code=status.HTTP_200_OK,
+            message="Featured playlists fetched successfully", headers=headers,
+        )
+
+    @action(detail=False, methods=["get"], url_path="playlist/trending", url_name="trending_playlists")
+    def trending_playlists(self, request, *args, **kwargs):
+        """
+        GET /api/content/playlist/trending/?playlist_type=&language=&page=&page_size=
+
+        Playlists ranked by time-decayed engagement.  The page of IDs comes
+        from one ZREVRANGE on the Redis leaderboard; rows are fetched by
+        primary key with no SQL sort.  Falls back to all-time
+        ``(impressions, ctr)`` order when Redis is unavailable.
+        """
+        playlist_type = request.query_params.get("playlist_type")
+        language = request.query_params.get("language")
+        page, page_size = page_params(request)
+
+        ranked = PlaylistTrending.page(
+            playlist_type, language, offset=(page - 1) * page_size, limit=page_size,
+        )
+        if ranked is None:
+            qs = self.get_queryset()
+            if playlist_type:
+                qs = qs.filter(playlist_type__iexact=playlist_type)
+            if language:
+                qs = qs.filter(language__iexact=language)
+            page_qs, meta = paginate_queryset(qs, request)
+        else:
+            ids, total = ranked
+            rows = Playlist.objects.in_bulk(ids)
+            page_qs = [rows[pk] for pk in ids if pk in rows]
+            meta = {
+                "page": page,
+                "page_size": page_size,
+                "total": total,
+                "has_next": page * page_size < total,
+            }
+
+        ser = self.get_serializer(page_qs, many=True, context={"request": request})
+        return api_response(
+            request,
+            data={"items": ser.data, "count": meta["total"]},
+            meta=meta,
+            status_code=status.HTTP_200_OK,
+            message="Trending playlists fetched successfully",
+        )
 
     # ════════════════════════════════════════════════════════════════
     # VIDEO ENDPOINTS
@@ -499,11 +633,12 @@ class ContentViewSet(viewsets.GenericViewSet):
             qs = qs.filter(content_genre__iexact=genre)
         if lang:
             qs = qs.filter(language__iexact=lang)
-        page_qs, meta = paginate_queryset(qs, request)
-        ser = self.get_serializer(page_qs, many=True, context={"request": request})
+        items, meta = VIDEO_LISTING.page(
+            request, qs, _search_cache_key("video", genre=genre, language=lang), self.sparse_fields(),
+        )
         return api_response(
             request,
-            data={"items": ser.data, "count": meta["total"]},
+            data={"items": items, "count": meta["total"]},
             meta=meta,
             status_code=status.HTTP_200_OK,
             message="Videos fetched successfully",
@@ -515,7 +650,7 @@ class ContentViewSet(viewsets.GenericViewSet):
         if not obj:
             return api_response(request, status_code=status.HTTP_404_NOT_FOUND,
                                 errors={"detail": "Video not found"})
-        ser = self.get_serializer(obj, context={"request": request})
+        ser = self.get_serializer(obj, context={"request": request, "fields": self.sparse_fields()})
         return api_response(request, data=ser.data, status_code=status.HTTP_200_OK,
                             message="Video fetched successfully")
 
@@ -527,34 +662,17 @@ class ContentViewSet(viewsets.GenericViewSet):
     def sessions(self, request, *args, **kwargs):
         cat = request.query_params.get("category")
         diff = request.query_params.get("difficulty")
-        page = request.query_params.get("page", 1)
-        page_size = request.query_params.get("page_size", 20)
-
-        cache_key = _search_cache_key(
-            "session", category=cat, difficulty=diff, page=page, page_size=page_size,
-        )
-        cached = cache.get(cache_key)
-        if cached is not None:
-            return api_response(
-                request,
-                data={"items": cached["items"], "count": cached["total"]},
-                meta=cached["meta"],
-                status_code=status.HTTP_200_OK,
-                message="Sessions fetched successfully",
-            )
-
         qs = self.get_queryset()
         if cat:
             qs = qs.filter(category__iexact=cat)
         if diff:
             qs = qs.filter(difficulty__iexact=diff)
-        page_qs, meta = paginate_queryset(qs, request)
-        ser = self.get_serializer(page_qs, many=True, context={"request": request})
-        payload = {"items": list(ser.data), "meta": meta, "total": meta["total"]}
-        cache.set(cache_key, payload, timeout=settings.SEARCH_CACHE_TTL)
+        items, meta = SESSION_LISTING.page(
+            request, qs, _search_cache_key("session", category=cat, difficulty=diff), self.sparse_fields(),
+        )
         return api_response(
             request,
-            data={"items": ser.data, "count": meta["total"]},
+            data={"items": items, "count": meta["total"]},
             meta=meta,
             status_code=status.HTTP_200_OK,
             message="Sessions fetched successfully",
@@ -566,7 +684,7 @@ class ContentViewSet(viewsets.GenericViewSet):
         if not obj:
             return api_response(request, status_code=status.HTTP_404_NOT_FOUND,
                                 errors={"detail": "Session not found"})
-        ser = self.get_serializer(obj, context={"request": request})
+        ser = self.get_serializer(obj, context={"request": request, "fields": self.sparse_fields()})
         return api_response(request, data=ser.data, status_code=status.HTTP_200_OK,
                             message="Session fetched successfully")
 
@@ -579,36 +697,30 @@ class ContentViewSet(viewsets.GenericViewSet):
         meal = request.query_params.get("meal_type")
         diet = request.query_params.get("diet_tag")
         q = request.query_params.get("q")
-        page = request.query_params.get("page", 1)
-        page_size = request.query_params.get("page_size", 20)
-
-        cache_key = _search_cache_key(
-            "recipe", q=q, meal_type=meal, diet_tag=diet, page=page, page_size=page_size,
-        )
-        cached = cache.get(cache_key)
-        if cached is not None:
-            return api_response(
-                request,
-                data={"items": cached["items"], "count": cached["total"]},
-                meta=cached["meta"],
-                status_code=status.HTTP_200_OK,
-                message="Recipes fetched successfully",
-            )
-
+        tags_all = split_param(request.query_params.get("tags_all"), normalize_tag)
+        tags_any = split_param(request.query_params.get("tags_any"), normalize_tag)
+        without = split_param(request.query_params.get("exclude_ingredient"), ingredient_key)
         qs = self.get_queryset()
         if meal:
             qs = qs.filter(meal_type__iexact=meal)
         if diet:
             qs = qs.filter(diet_tag__iexact=diet)
+        nutrition = nutrition_params(request.query_params)
+        qs = filter_recipes(qs, tags_all, tags_any, without)
+        qs = apply_nutrition(qs, nutrition)
         if q:
-            qs = qs.filter(Q(title__icontains=q) | Q(description__icontains=q))
-        page_qs, meta = paginate_queryset(qs, request)
-        ser = self.get_serializer(page_qs, many=True, context={"request": request})
-        payload = {"items": list(ser.data), "meta": meta, "total": meta["total"]}
-        cache.set(cache_key, payload, timeout=settings.SEARCH_CACHE_TTL)
+            qs = ContentSearch.matching(qs, q)
+        items, meta = RECIPE_LISTING.page(
+            request, qs, _search_cache_key(
+                "recipe", q=q, meal_type=meal, diet_tag=diet,
+                tags_all=",".join(tags_all), tags_any=",".join(tags_any),
+                exclude_ingredient=",".join(without), **nutrition,
+            ),
+            self.sparse_fields(),
+        )
         return api_response(
             request,
-            data={"items": ser.data, "count": meta["total"]},
+            data={"items": items, "count": meta["total"]},
             meta=meta,
             status_code=status.HTTP_200_OK,
             message="Recipes fetched successfully",
@@ -620,7 +732,7 @@ class ContentViewSet(viewsets.GenericViewSet):
         if not obj:
             return api_response(request, status_code=status.HTTP_404_NOT_FOUND,
                                 errors={"detail": "Recipe not found"})
-        ser = self.get_serializer(obj, context={"request": request})
+        ser = self.get_serializer(obj, context={"request": request, "fields": self.sparse_fields()})
         return api_response(request, data=ser.data, status_code=status.HTTP_200_OK,
                             message="Recipe fetched successfully")
 
@@ -632,13 +744,20 @@ class ContentViewSet(viewsets.GenericViewSet):
     def deals(self, request, *args, **kwargs):
         qs = self.get_queryset()
         cat = request.query_params.get("category")
+        sort = request.query_params.get("sort") or ""
+        if sort not in DEAL_SORTS:
+            return api_response(request, status_code=status.HTTP_400_BAD_REQUEST,
+                                errors={"sort": f"Must be one of: {', '.join(s for s in DEAL_SORTS if s)}"})
         if cat:
             qs = qs.filter(category__icontains=cat)
-        page_qs, meta = paginate_queryset(qs, request)
-        ser = self.get_serializer(page_qs, many=True, context={"request": request})
+        if DEAL_SORTS[sort]:
+            qs = qs.order_by(*DEAL_SORTS[sort])
+        items, meta = DEAL_LISTING.page(
+            request, qs, _search_cache_key("deal", category=cat, sort=sort), self.sparse_fields(),
+        )
         return api_response(
             request,
-            data={"items": ser.data, "count": meta["total"]},
+            data={"items": items, "count": meta["total"]},
             meta=meta,
             status_code=status.HTTP_200_OK,
             message="Deals fetched successfully",
@@ -650,7 +769,7 @@ class ContentViewSet(viewsets.GenericViewSet):
         if not obj:
             return api_response(request, status_code=status.HTTP_404_NOT_FOUND,
                                 errors={"detail": "Deal not found"})
-        ser = self.get_serializer(obj, context={"request": request})
+        ser = self.get_serializer(obj, context={"request": request, "fields": self.sparse_fields()})
         return api_response(request, data=ser.data, status_code=status.HTTP_200_OK,
                             message="Deal fetched successfully")
 
@@ -664,64 +783,53 @@ class ContentViewSet(viewsets.GenericViewSet):
         Return today's tip: the scheduled tip for today if one exists,
         otherwise a random pick from the active unscheduled pool.
 
-        Both results are cached in Redis for the remainder of the calendar
-        day (UTC) so that:
+        All three lookups (scheduled tip, unscheduled pool, random pick) go
+        through ``get_or_compute`` for the remainder of the calendar day
+        (UTC) so that:
           - ORDER BY RANDOM() is never executed.
           - All users see the same tip throughout the day.
-          - The DB is hit at most twice per day (once for each cache miss).
+          - The DB is hit at most once per lookup per day, by one worker,
+            even when the day rolls over under load.  "No scheduled tip"
+            is cached too.
+        Entries are tagged ``content:tip``, so an admin edit takes effect
+        immediately instead of at midnight.
         """
-        today_str = date.today().isoformat()
+        today = date.today()
+        today_str = today.isoformat()
         ttl = _tip_cache_ttl()
+        tags = [content_tag("tip")]
 
-        # ── 1. Scheduled tip ─────────────────────────────────────────
-        sched_key = tip_scheduled(today_str)
-        tip_data = cache.get(sched_key)
+        def scheduled():
+            tip = DailyTip.objects.filter(scheduled_date=today, is_active=True).first()
+            return self.get_serializer(tip, context={"request": request}).data if tip else None
 
-        if tip_data is None:
-            tip = DailyTip.objects.filter(
-                scheduled_date=date.today(), is_active=True
-            ).first()
-            if tip:
-                tip_data = self.get_serializer(tip, context={"request": request}).data
-                cache.set(sched_key, tip_data, timeout=ttl)
-
-        if tip_data:
-            return api_response(
-                request,
-                data=tip_data,
-                status_code=status.HTTP_200_OK,
-                message="Daily tip fetched successfully",
+        def pool():
+            return list(
+                DailyTip.objects
+                .filter(is_active=True, scheduled_date__isnull=True)
+                .values_list("id", flat=True)
             )
 
-        # ── 2. Random tip from active unscheduled pool ───────────────
-        rand_key = tip_random(today_str)
-        tip_data = cache.get(rand_key)
-
-        if tip_data is None:
-            pool_key = _tip_pool_key(today_str)
-            tip_ids = cache.get(pool_key)
-            if tip_ids is None:
-                tip_ids = list(
-                    DailyTip.objects
-                    .filter(is_active=True, scheduled_date__isnull=True)
-                    .values_list("id", flat=True)
-                )
-                # Use midnight TTL — same as tip_random — so the pool expires when
-                # the day rolls over, not on an arbitrary fixed interval.
-                cache.set(pool_key, tip_ids, timeout=ttl)
-
+        def random_pick():
+            # The pool uses the same midnight TTL, so it rolls over with the day.
+            tip_ids = get_or_compute(_tip_pool_key(today_str), pool, ttl, tags=tags)
             if not tip_ids:
-                return api_response(
-                    request,
-                    data=None,
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    message="No tips available today",
-                )
-
+                return None
             tip = DailyTip.objects.get(pk=random.choice(tip_ids))
-            tip_data = self.get_serializer(tip, context={"request": request}).data
-            cache.set(rand_key, tip_data, timeout=ttl)
+            return self.get_serializer(tip, context={"request": request}).data
 
+        # Both cached answers (and the tag) are read in one round trip.
+        tip_data = get_first(
+            [(tip_scheduled(today_str), scheduled), (tip_random(today_str), random_pick)],
+            ttl, tags=tags,
+        )
+        if not tip_data:
+            return api_response(
+                request,
+                data=None,
+                status_code=status.HTTP_404_NOT_FOUND,
+                message="No tips available today",
+            )
         return api_response(
             request,
             data=tip_data,
@@ -738,17 +846,20 @@ class ContentViewSet(viewsets.GenericViewSet):
         """
         Return all active categories with ETag / 304 support.
 
-        The full list is cached in Redis (TTL = CATEGORY_CACHE_TTL, default 1 hour).
-        Cache is invalidated immediately on any Category save or delete via signal.
+        The full list is cached in Redis via ``get_or_compute``
+        (TTL = CATEGORY_CACHE_TTL, default 6 hours).  The entry is tagged
+        ``content:category``, which any Category save or delete bumps, so
+        edits are visible on the next request.
         Clients that send If-None-Match receive a 304 when the list hasn't changed,
         saving serialization and bandwidth on every repeated load.
         """
-        items = cache.get(settings.CATEGORY_CACHE_KEY)
-
-        if items is None:
-            qs = self.get_queryset()
-            items = list(self.get_serializer(qs, many=True, context={"request": request}).data)
-            cache.set(settings.CATEGORY_CACHE_KEY, items, timeout=settings.CATEGORY_CACHE_TTL)
+        items = get_or_compute(
+            settings.CATEGORY_CACHE_KEY,
+            lambda: list(self.get_serializer(self.get_queryset(), many=True, context={"request": request}).data),
+            settings.CATEGORY_CACHE_TTL,
+            stale_ttl=content_cfg("CACHE_STALE_TTL"),
+            tags=[content_tag("category")],
+        )
 
         # ETag derived from content hash — changes only when the category list changes.
         raw = json.dumps(items, sort_keys=True, separators=(",", ":")).encode("utf-8")
@@ -775,6 +886,26 @@ class ContentViewSet(viewsets.GenericViewSet):
         resp["Cache-Control"] = "private, max-age=3600, stale-while-revalidate=300"
         return resp
 
+    @action(detail=False, methods=["get"], url_path="facets", url_name="facets")
+    def facets(self, request, *args, **kwargs):
+        """
+        Counts of published items per filter value, for the filter chips:
+        recipe meal_type/diet_tag, session category/difficulty and video
+        content_genre/language.  ``?types=recipe,video`` narrows the result.
+
+        One GROUP BY per content type, cached under its ``content:<type>``
+        tag, so counts refresh as soon as that type is edited.
+        """
+        raw = request.query_params.get("types", "")
+        names = [t.strip() for t in raw.split(",") if t.strip()]
+        unknown = [t for t in names if t not in FACETS]
+        if unknown:
+            return api_response(request, status_code=status.HTTP_400_BAD_REQUEST,
+                                errors={"types": f"Unknown type(s): {', '.join(unknown)}"})
+        return api_response(request, data=Facets.get(names or None),
+                            status_code=status.HTTP_200_OK,
+                            message="Facets fetched successfully")
+
     # ════════════════════════════════════════════════════════════════
     # USER DAILY STATS ENDPOINTS
     # ════════════════════════════════════════════════════════════════
@@ -809,10 +940,19 @@ class ContentViewSet(viewsets.GenericViewSet):
 
     @action(detail=False, methods=["get"], url_path="plan/today", url_name="plan_today")
     def plan_today(self, request, *args, **kwargs):
-        """Get today's plan items for the authenticated user."""
-        qs = self.get_queryset()
-        ser = UserPlanItemReadSerializer(qs, many=True, context={"request": request})
-        return api_response(request, data={"items": ser.data, "count": len(ser.data)},
+        """
+        Get today's plan items for the authenticated user.
+
+        Cached until midnight under the ``user:{id}:plan`` tag, which any
+        save or delete of that user's plan items bumps.
+        """
+        items = get_or_compute(
+            user_plan_day(request.user.pk, date.today().isoformat()),
+            lambda: list(UserPlanItemReadSerializer(self.get_queryset(), many=True, context={"request": request}).data),
+            _tip_cache_ttl(),
+            tags=[user_plan_tag(request.user.pk)],
+        )
+        return api_response(request, data={"items": items, "count": len(items)},
                             status_code=status.HTTP_200_OK,
                             message="Today's plan fetched successfully")
 
@@ -856,39 +996,127 @@ class ContentViewSet(viewsets.GenericViewSet):
     @action(detail=False, methods=["get"], url_path="breathwork", url_name="breathwork")
     def breathwork(self, request, *args, **kwargs):
         """Get list of breathwork exercises."""
-        qs = self.get_queryset()
-        ser = self.get_serializer(qs, many=True, context={"request": request})
-        return api_response(request, data={"items": ser.data, "count": len(ser.data)},
-                            status_code=status.HTTP_200_OK,
-                            message="Breathwork exercises fetched successfully")
+        return self._static_list(request, "breathwork", BREATHWORK_PROJECTION,
+                                 "Breathwork exercises fetched successfully")
 
     @action(detail=False, methods=["get"], url_path="ambient-sounds", url_name="ambient_sounds")
     def ambient_sounds(self, request, *args, **kwargs):
         """Get list of ambient sounds."""
-        qs = self.get_queryset()
-        ser = self.get_serializer(qs, many=True, context={"request": request})
-        return api_response(request, data={"items": ser.data, "count": len(ser.data)},
-                            status_code=status.HTTP_200_OK,
-                            message="Ambient sounds fetched successfully")
+        return self._static_list(request, "ambient_sound", AMBIENT_SOUND_PROJECTION,
+                                 "Ambient sounds fetched successfully")
+
+    def _static_list(self, request, resource, projection, message):
+        """
+        Whole small list cached as encoded JSON text (tagged
+        ``content:<resource>``) and spliced into the envelope as-is.
+        """
+        projection = projection.subset(self.sparse_fields())
+
+        def build():
+            items = projection.data(self.get_queryset(), {"request": request})
+            return {"items": encode_json(items).decode(), "count": len(items)}
+
+        cached = get_or_compute(
+            static_content(resource, projection.fieldset_key),
+            build,
+            content_cfg("STATIC_CONTENT_TTL"),
+            stale_ttl=content_cfg("CACHE_STALE_TTL"),
+            tags=[content_tag(resource)],
+        )
+        return api_response(request, data={"items": RawJSON(cached["items"]), "count": cached["count"]},
+                            status_code=status.HTTP_200_OK, message=message)
 
     @action(detail=False, methods=["get"], url_path="search-config", url_name="search_config")
     def search_config(self, request, *args, **kwargs):
-        """Get global search configuration."""
-        qs = self.get_queryset()
-        config = qs.first()
-        if not config:
-            # Return some defaults if not found in the database
-            data = {
-                "popular_searches": [
-                    "Pranayama techniques", "High protein Indian meals",
-                    "Morning yoga routine", "Calorie deficit recipes"
-                ],
-                "filter_chips": ["All", "Yoga", "Nutrition", "Meditation", "Recipes", "Fitness", "Sleep"]
-            }
-        else:
-            ser = self.get_serializer(config, context={"request": request})
-            data = ser.data
-            
+        """Get global search configuration (cached, tagged ``content:search_config``)."""
+        def build():
+            config = self.get_queryset().first()
+            if not config:
+                # Return some defaults if not found in the database
+                return {
+                    "popular_searches": [
+                        "Pranayama techniques", "High protein Indian meals",
+                        "Morning yoga routine", "Calorie deficit recipes"
+                    ],
+                    "filter_chips": ["All", "Yoga", "Nutrition", "Meditation", "Recipes", "Fitness", "Sleep"]
+                }
+            return dict(self.get_serializer(config, context={"request": request}).data)
+
+        data = get_or_compute(
+            static_content("search_config"),
+            build,
+            content_cfg("STATIC_CONTENT_TTL"),
+            stale_ttl=content_cfg("CACHE_STALE_TTL"),
+            tags=[content_tag("search_config")],
+        )
         return api_response(request, data=data,
                             status_code=status.HTTP_200_OK,
-                            message="Search configuration fetched successfully")
\ No newline at end of file
+                            message="Search configuration fetched successfully")
+
+    @action(detail=False, methods=["get"], url_path="search", url_name="search")
+    def search(self, request, *args, **kwargs):
+        """
+        Ranked full-text search across recipes, sessions, videos and playlists.
+
+        ``?q=`` is required; ``?types=recipe,video`` narrows the content types
+        and ``?limit=`` caps the hits (max ``SEARCH_LIMIT``).  Each item is
+        ``{type, id, rank, item}`` with ``item`` in the type's list shape.
+        """
+        q = (request.query_params.get("q") or "").strip()
+        if not q:
+            return api_response(request, status_code=status.HTTP_400_BAD_REQUEST,
+                                errors={"q": "This query parameter is required."})
+        types = [t.strip() for t in request.query_params.get("types", "").split(",") if t.strip()]
+        unknown = sorted(set(types) - SEARCH_SPECS.keys())
+        if unknown:
+            return api_response(request, status_code=status.HTTP_400_BAD_REQUEST,
+                                errors={"types": f"Unknown type(s): {', '.join(unknown)}"})
+        max_limit = content_cfg("SEARCH_LIMIT")
+        try:
+            limit = min(max(1, int(request.query_params.get("limit", max_limit))), max_limit)
+        except (TypeError, ValueError):
+            limit = max_limit
+
+        hits = ContentSearch.search(q, types or None, limit)
+        context = {"request": request}
+        hydrated = {}
+        for name, listing, builder in (
+            ("recipe", RECIPE_LISTING, "recipes"),
+            ("session", SESSION_LISTING, "sessions"),
+            ("video", VIDEO_LISTING, "videos"),
+        ):
+            ids = [(h.pk, h.version) for h in hits if h.type == name]
+            if ids:
+                qs = self.queryset_action_classes[builder](self, request)
+                hydrated[name] = listing.fragments(qs, ids, context)
+        # Playlist counters move without touching updated_at, so no fragments here.
+        playlist_ids = [h.pk for h in hits if h.type == "playlist"]
+        if playlist_ids:
+            rows = Playlist.objects.filter(pk__in=playlist_ids)
+            hydrated["playlist"] = {
+                item["id"]: item for item in PlaylistReadSerializer(rows, many=True, context=context).data
+            }
+
+        items = [
+            {"type": h.type, "id": h.pk, "rank": round(h.rank, 6), "item": hydrated[h.type][h.pk]}
+            for h in hits if h.pk in hydrated.get(h.type, {})
+        ]
+        return api_response(request, data={"items": items, "count": len(items)},
+                            status_code=status.HTTP_200_OK,
+                            message="Search results fetched successfully")
+
+    @action(detail=False, methods=["get"], url_path="search/suggest", url_name="search_suggest")
+    def search_suggest(self, request, *args, **kwargs):
+        """
+        Type-ahead suggestions for ``?prefix=``, served from this worker's
+        in-memory index (see ``logic.autocomplete``) — no database query.
+        """
+        prefix = request.query_params.get("prefix", "")
+        try:
+            limit = int(request.query_params.get("limit", 0)) or None
+        except (TypeError, ValueError):
+            limit = None
+        items = Autocomplete.suggest(prefix, limit) if prefix.strip() else []
+        return api_response(request, data={"items": items, "count": len(items)},
+                            status_code=status.HTTP_200_OK,
+                            message="Suggestions fetched successfully")
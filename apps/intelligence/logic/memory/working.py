@@ -19,6 +19,8 @@ from typing import Any
 
 from django.core.cache import cache
 
+from utilities.cache_backend import cache_pipeline
+
 from .config import mem_cfg
 
 logger = logging.getLogger("memory.working")
@@ -48,6 +50,23 @@ def _activity_key(user_id: int) -> str:
 _ACTIVE_USERS_KEY = "wm:active_users"
 
 
+def _decode_buffer(raw) -> list[dict[str, str]]:
+    if raw is None:
+        return []
+    if isinstance(raw, str):
+        try:
+            return json.loads(raw)
+        except (json.JSONDecodeError, TypeError):
+            return []
+    return raw  # already a list (JSON serializer)
+
+
+def _decode_active(raw) -> set[int]:
+    if isinstance(raw, list):
+        return {int(uid) for uid in raw}
+    return set()
+
+
 # ── Public API ───────────────────────────────────────────────────────
 
 class WorkingMemoryBuffer:
@@ -61,15 +80,7 @@ class WorkingMemoryBuffer:
     @staticmethod
     def load(user_id: int) -> list[dict[str, str]]:
         """Return the current buffer (list of turn dicts), or ``[]``."""
-        raw = cache.get(_buffer_key(user_id))
-        if raw is None:
-            return []
-        if isinstance(raw, str):
-            try:
-                return json.loads(raw)
-            except (json.JSONDecodeError, TypeError):
-                return []
-        return raw  # already a list (JSON serializer)
+        return _decode_buffer(cache.get(_buffer_key(user_id)))
 
     # -------------------------------------------------------------- session
     @staticmethod
@@ -89,23 +100,33 @@ class WorkingMemoryBuffer:
         Append a user/model turn and return the new buffer length.
 
         Also refreshes the TTL so the buffer stays alive while the user
-        is active.
+        is active.  Two pipelined round trips: read buffer, session and
+        active-users set, then write them back with the activity timestamp.
         """
         ttl = mem_cfg("WORKING_MEMORY_TTL")
-        buf = WorkingMemoryBuffer.load(user_id)
+        raw_buf, session_id, raw_active = (
+            cache_pipeline()
+            .get(_buffer_key(user_id))
+            .get(_session_key(user_id))
+            .get(_ACTIVE_USERS_KEY)
+            .execute()
+        )
+        buf = _decode_buffer(raw_buf)
         buf.append({"user": user_msg, "model": model_msg})
-        cache.set(_buffer_key(user_id), buf, timeout=ttl)
 
-        # Keep session alive too
-        cache.set(
-            _session_key(user_id),
-            WorkingMemoryBuffer.get_session_id(user_id),
-            timeout=ttl,
+        writes = (
+            cache_pipeline()
+            .set(_buffer_key(user_id), buf, timeout=ttl)
+            # Keep session alive too
+            .set(_session_key(user_id), session_id or uuid.uuid4().hex[:12], timeout=ttl)
+            .set(_activity_key(user_id), time.time(), timeout=ttl)
         )
-
-        # Track this user as having an active buffer + update activity ts
-        WorkingMemoryBuffer._register_active(user_id)
-        WorkingMemoryBuffer._touch_activity(user_id, ttl)
+        # Track this user as having an active buffer (no TTL — cleaned on flush)
+        active = _decode_active(raw_active)
+        if user_id not in active:
+            active.add(user_id)
+            writes.set(_ACTIVE_USERS_KEY, list(active), timeout=None)
+        writes.execute()
 
         if mem_cfg("ENABLE_MEMORY_LOGGING"):
             max_pairs = mem_cfg("WORKING_BUFFER_MAX_PAIRS")
@@ -259,22 +280,10 @@ class WorkingMemoryBuffer:
     @staticmethod
     def get_active_user_ids() -> set[int]:
         """Return the set of user IDs that have active working memory buffers."""
-        raw = cache.get(_ACTIVE_USERS_KEY)
-        if raw is None:
-            return set()
-        if isinstance(raw, list):
-            return {int(uid) for uid in raw}
-        return set()
+        return _decode_active(cache.get(_ACTIVE_USERS_KEY))
 
     # ─────────────────────────────────────────── internal housekeeping
 
-    @staticmethod
-    def _register_active(user_id: int) -> None:
-        """Add user to the active-users set (no TTL — cleaned on flush)."""
-        active = WorkingMemoryBuffer.get_active_user_ids()
-        active.add(user_id)
-        cache.set(_ACTIVE_USERS_KEY, list(active), timeout=None)
-
     @staticmethod
     def _unregister_active(user_id: int) -> None:
         """Remove user from the active-users set."""
@@ -284,10 +293,3 @@ class WorkingMemoryBuffer:
             cache.set(_ACTIVE_USERS_KEY, list(active), timeout=None)
         else:
             cache.delete(_ACTIVE_USERS_KEY)
-
-    @staticmethod
-    def _touch_activity(user_id: int, ttl: int | None = None) -> None:
-        """Record the current time as the user's last activity."""
-        if ttl is None:
-            ttl = mem_cfg("WORKING_MEMORY_TTL")
-        cache.set(_activity_key(user_id), time.time(), timeout=ttl)
@@ -2,7 +2,7 @@ from unittest.mock import patch, MagicMock
 from django.urls import reverse
 from rest_framework.test import APIClient
 from rest_framework import status
-from django.test import TestCase
+from django.test import TestCase, override_settings
 
 class IntelligenceViewTests(TestCase):
     def setUp(self):
@@ -42,4 +42,31 @@ class IntelligenceViewTests(TestCase):
             
             # Consuming the stream to verify content
             content = b"".join(response.streaming_content).decode('utf-8')
-            self.assertEqual(content, "Hello World")
\ No newline at end of file
+            self.assertEqual(content, "Hello World")
+
+@override_settings(CACHES={
+    "default": {
+        "BACKEND": "utilities.cache_backend.FallbackCache",
+        "LOCATION": "redis://127.0.0.1:1/0",  # unreachable: LocMem fallback, never a real server
+        "KEY_PREFIX": "ahara-test",
+    },
+})
+class WorkingMemoryBufferTests(TestCase):
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+
+    def test_append_batches_round_trips(self):
+        from django.core.cache import cache
+        from apps.intelligence.logic.memory.working import WorkingMemoryBuffer
+
+        with cache.count_round_trips() as trips:
+            self.assertEqual(WorkingMemoryBuffer.append(7, "hi", "hello"), 1)
+        self.assertEqual(trips.count, 2)
+
+        session_id = WorkingMemoryBuffer.get_session_id(7)
+        self.assertEqual(WorkingMemoryBuffer.append(7, "and?", "more"), 2)
+        self.assertEqual(WorkingMemoryBuffer.get_session_id(7), session_id)
+        self.assertEqual(WorkingMemoryBuffer.load(7)[1], {"user": "and?", "model": "more"})
+        self.assertEqual(WorkingMemoryBuffer.get_active_user_ids(), {7})
+        self.assertFalse(WorkingMemoryBuffer.is_stale_session(7))
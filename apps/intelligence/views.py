@@ -13,6 +13,7 @@ from rest_framework_simplejwt.authentication import JWTAuthentication
 from google import genai
 
 from ahara.users.api_utils.throtles import AiAskThrottle, AiEndSessionThrottle
+from utilities.pagination import paginate_queryset
 from utilities.response import api_response
 from .models import ChatMessage, ChatSession
 from .serializers import (
@@ -314,7 +315,9 @@ class IntelligenceViewSet(viewsets.GenericViewSet):
         chat sessions, ordered by most recently updated.
 
         Query params:
-            ?page=1  (default, 20 per page)
+            ?page=1&page_size=20  offset pagination (default)
+            ?cursor=              keyset pagination on -updated_at; follow meta.next
+            ?count=exact|estimated|none
         """
         sessions = (
             ChatSession.objects
@@ -330,27 +333,14 @@ class IntelligenceViewSet(viewsets.GenericViewSet):
             .order_by("-updated_at")
         )
 
-        # Simple offset pagination
-        page = int(request.query_params.get("page", 1))
-        page_size = 20
-        start = (page - 1) * page_size
-        end = start + page_size
-
-        page_sessions = sessions[start:end]
-        total = sessions.count()
-
+        page_sessions, meta = paginate_queryset(sessions, request)
         serializer = ChatSessionListSerializer(page_sessions, many=True)
 
         return api_response(
             request,
             status_code=status.HTTP_200_OK,
             data=serializer.data,
-            meta={
-                "page": page,
-                "page_size": page_size,
-                "total": total,
-                "has_next": end < total,
-            },
+            meta=meta,
         )
 
     @action(
@@ -296,7 +296,18 @@ CACHES = {
             "ssl_cert_reqs": "required",  # Good practice for security
         },
         "KEY_PREFIX": "ahara",
-        "FALLBACK_COOLDOWN": 60,  # seconds before retrying Redis after failure
+        "FALLBACK_COOLDOWN": 60,  # seconds the circuit breaker stays open after tripping
+        "FALLBACK_FAILURE_THRESHOLD": 3,  # consecutive failed/slow calls that trip it
+        "FALLBACK_SLOW_MS": 250,  # a call slower than this counts as a failure
+        "FALLBACK_SOCKET_TIMEOUT": 0.25,  # per-operation socket timeout (seconds)
+        "FALLBACK_CONNECT_TIMEOUT": 0.5,  # connect timeout (seconds)
+        "FALLBACK_JOURNAL_SIZE": 10000,  # invalidations kept for replay after an outage
+        # Read-mostly keys also kept in a per-process LRU, invalidated over pub/sub
+        "FALLBACK_NEAR_PREFIXES": [
+            "ahara:categories", "ahara:pl:featured:", "ahara:tip:", "ahara:static:", "ahara:tag:content:",
+        ],
+        "FALLBACK_NEAR_SIZE": 2000,  # near-cache entries per process
+        "FALLBACK_NEAR_TTL": 30,  # seconds a near-cache entry lives at most
     }
 }
 
@@ -318,8 +329,8 @@ SOCIALACCOUNT_FORMS = {"signup": "ahara.users.forms.UserSocialSignupForm"}
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": ("rest_framework_simplejwt.authentication.JWTAuthentication",),
     "DEFAULT_THROTTLE_CLASSES": (
-        "rest_framework.throttling.AnonRateThrottle",
-        "rest_framework.throttling.UserRateThrottle",
+        "ahara.users.api_utils.throtles.AnonThrottle",
+        "ahara.users.api_utils.throtles.UserThrottle",
     ),
     "DEFAULT_THROTTLE_RATES": {
         "anon": "100/min",
@@ -333,6 +344,11 @@ REST_FRAMEWORK = {
         "ai_ask": "30/min",
         "ai_end_session": "60/min",
     },
+    "DEFAULT_RENDERER_CLASSES": (
+        # ujson-backed, splices pre-encoded fragments (see utilities.response)
+        "utilities.response.ApiJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
     "EXCEPTION_HANDLER": "utilities.response.unified_exception_handler",
     "DEFAULT_SCHEMA_CLASS": "utilities.schema.AppGroupAutoSchema",
 }
@@ -456,12 +472,14 @@ IMAGEKIT_URL_ENDPOINT = env("IMAGEKIT_URL_ENDPOINT")
 FEATURED_KEY = env("FEATURED_KEY", default="ahara:pl:featured:v1:default")
 FEATURED_TTL = env.int("FEATURED_TTL", default=60 * 60 * 6)
 
-CATEGORY_CACHE_KEY = env("CATEGORY_CACHE_KEY", default="ahara:categories:v1")
-CATEGORY_CACHE_TTL = env.int("CATEGORY_CACHE_TTL", default=60 * 60)  # 1 hour
+# Bumped to v2 when entries started embedding their tag generations.
+CATEGORY_CACHE_KEY = env("CATEGORY_CACHE_KEY", default="ahara:categories:v2")
+CATEGORY_CACHE_TTL = env.int("CATEGORY_CACHE_TTL", default=60 * 60 * 6)  # 6 hours
 
-# Short-lived cache for search/filter list results. Prevents repeated LIKE
-# scans for the same query within the TTL window without risking stale content.
-SEARCH_CACHE_TTL = env.int("SEARCH_CACHE_TTL", default=60)  # 60 seconds
+# Cache for search/filter list results. Entries are tagged per content type
+# (utilities.cache_keys.tagged_set) and invalidated by model signals, so the
+# TTL only bounds memory, not staleness.
+SEARCH_CACHE_TTL = env.int("SEARCH_CACHE_TTL", default=60 * 60 * 6)  # 6 hours
 
 GEMINI_API_KEY = env("GEMINI_API_KEY", default="YOUR API KEY HERE....")
 
@@ -477,6 +495,8 @@ DAILY_TIP_POOL_TTL = env.int("DAILY_TIP_POOL_TTL", default=60 * 60)  # 1 hour
 PAGINATION = {
     "PAGE_SIZE_DEFAULT": env.int("PAGINATION_PAGE_SIZE_DEFAULT", default=20),
     "PAGE_SIZE_MAX": env.int("PAGINATION_PAGE_SIZE_MAX", default=100),
+    # Seconds a ?count=estimated fallback COUNT(*) is cached.
+    "COUNT_CACHE_TTL": env.int("PAGINATION_COUNT_CACHE_TTL", default=300),
 }
 
 # -------------------- Memory System --------------------
@@ -491,4 +511,13 @@ MEMORY_CONFIG = {
     # "WORKING_BUFFER_MAX_PAIRS": 12,
     # "DISTILLATION_MODEL": "models/gemini-2.0-flash",
     # "CONSOLIDATION_THRESHOLD": 3,
-}
\ No newline at end of file
+}
+# -------------------- Content Service Layer --------------------
+# Override any key to tune content analytics / caching.
+# See apps/content/logic/config.py for defaults.
+CONTENT_CONFIG = {
+    # Buffer Playlist counters in Redis and apply them with
+    # `manage.py flush_playlist_counters --loop` instead of UPDATE per hit.
+    "COUNTER_BUFFER_ENABLED": env.bool("COUNTER_BUFFER_ENABLED", default=False),
+    # "COUNTER_FLUSH_INTERVAL": 5,
+}
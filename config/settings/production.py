@@ -20,13 +20,23 @@ CACHES = {
         "LOCATION": REDIS_URL,
         "OPTIONS": {
             "CLIENT_CLASS": "django_redis.client.DefaultClient",
-            # Mimicking memcache behavior.
-            # https://github.com/jazzband/django-redis#memcached-exceptions-behavior
-            "IGNORE_EXCEPTIONS": True,
+            # No IGNORE_EXCEPTIONS: FallbackCache needs to see connection errors
+            # to trip its circuit breaker and serve from the in-memory fallback.
             "ssl": True,
             "ssl_cert_reqs": "required",
         },
-        "FALLBACK_COOLDOWN": 60,  # seconds before retrying Redis after failure
+        "FALLBACK_COOLDOWN": 60,  # seconds the circuit breaker stays open after tripping
+        "FALLBACK_FAILURE_THRESHOLD": 3,  # consecutive failed/slow calls that trip it
+        "FALLBACK_SLOW_MS": 250,  # a call slower than this counts as a failure
+        "FALLBACK_SOCKET_TIMEOUT": 0.25,  # per-operation socket timeout (seconds)
+        "FALLBACK_CONNECT_TIMEOUT": 0.5,  # connect timeout (seconds)
+        "FALLBACK_JOURNAL_SIZE": 10000,  # invalidations kept for replay after an outage
+        # Read-mostly keys also kept in a per-process LRU, invalidated over pub/sub
+        "FALLBACK_NEAR_PREFIXES": [
+            "ahara:categories", "ahara:pl:featured:", "ahara:tip:", "ahara:static:", "ahara:tag:content:",
+        ],
+        "FALLBACK_NEAR_SIZE": 2000,  # near-cache entries per process
+        "FALLBACK_NEAR_TTL": 30,  # seconds a near-cache entry lives at most
     },
 }
 
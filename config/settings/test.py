@@ -17,6 +17,19 @@ SECRET_KEY = env(
 # https://docs.djangoproject.com/en/dev/ref/settings/#test-runner
 TEST_RUNNER = "django.test.runner.DiscoverRunner"
 
+# CACHES
+# ------------------------------------------------------------------------------
+# Never the FallbackCache from base.py: its default REDIS_URL is the shared
+# Redis, and tests call cache.clear().  Tests that exercise FallbackCache
+# build their own instance against an unreachable local URL.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "ahara-tests",
+        "KEY_PREFIX": "ahara",
+    },
+}
+
 # PASSWORDS
 # ------------------------------------------------------------------------------
 # https://docs.djangoproject.com/en/dev/ref/settings/#password-hashers
@@ -52,6 +65,7 @@ REST_FRAMEWORK = {
         "verify_otp": None,
         "verify_otp_user": None,
     },
+    "DEFAULT_RENDERER_CLASSES": REST_FRAMEWORK["DEFAULT_RENDERER_CLASSES"],  # noqa: F405
     "EXCEPTION_HANDLER": "utilities.response.unified_exception_handler",
 }
 # DATABASE
@@ -2,9 +2,28 @@
 Resilient Redis cache backend with automatic fallback.
 
 Tries the configured Redis backend for every operation.
-If Redis is unreachable (ConnectionError, TimeoutError, etc.),
-it transparently falls back to Django's built-in LocMemCache
-and periodically retries Redis using a configurable cooldown.
+If Redis is unreachable (ConnectionError, TimeoutError, etc.) or too
+slow, it transparently falls back to Django's built-in LocMemCache.  A
+circuit breaker stops calling Redis after a few consecutive failures and
+lets a single probe per process retry it once the cooldown has passed.
+
+Invalidations that cannot reach Redis (``delete``, ``delete_many`` and
+``incr`` — the tag bumps in ``utilities.cache_keys``) are recorded in a
+bounded outage journal.  Before the first call that reaches Redis again,
+the journal is replayed in one pipeline, so entries invalidated during the
+outage are not served once Redis is back.
+
+Compound hot paths batch their calls: ``cache_pipeline()`` queues
+get/set/add/delete and runs them in one Redis round trip, and
+``CacheScript`` runs a Lua script server-side.  On LocMem (or any
+non-Redis cache) the pipeline runs call by call and the script runs its
+Python equivalent.
+``cache.count_round_trips()`` measures how many calls a block made.
+
+Keys under ``FALLBACK_NEAR_PREFIXES`` (read-mostly content: category
+list, featured blob, tips, tag counters) are also kept in a per-process
+LRU ``NearCache`` in front of Redis.  Every write to such a key is
+broadcast on a Redis pub/sub channel so all workers drop their copy.
 
 Usage in settings.py:
     CACHES = {
@@ -13,7 +32,15 @@ Usage in settings.py:
             "LOCATION": "<redis-url>",
             "OPTIONS": { ... },       # passed to the Redis backend
             "KEY_PREFIX": "ahara",
-            "FALLBACK_COOLDOWN": 60,   # seconds before retrying Redis (default 60)
+            "FALLBACK_COOLDOWN": 60,          # seconds the breaker stays open (default 60)
+            "FALLBACK_FAILURE_THRESHOLD": 3,  # consecutive failures that open it (default 3)
+            "FALLBACK_SLOW_MS": 250,          # slower calls count as failures (default 250)
+            "FALLBACK_SOCKET_TIMEOUT": 0.25,  # per-operation socket timeout unless OPTIONS sets one
+            "FALLBACK_CONNECT_TIMEOUT": 0.5,  # connect timeout unless OPTIONS sets one
+            "FALLBACK_JOURNAL_SIZE": 10000,   # invalidations kept for replay (default 10000)
+            "FALLBACK_NEAR_PREFIXES": [...],  # logical key prefixes kept in the near cache (default none)
+            "FALLBACK_NEAR_SIZE": 2000,       # near-cache entries per process (default 2000)
+            "FALLBACK_NEAR_TTL": 30,          # seconds a near-cache entry lives at most (default 30)
         }
     }
 """
@@ -21,7 +48,10 @@ Usage in settings.py:
 import logging
 import threading
 import time
+from collections import OrderedDict
+from contextlib import contextmanager
 
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
 from django.core.cache.backends.locmem import LocMemCache
 
 logger = logging.getLogger("utilities.cache_backend")
@@ -59,12 +89,168 @@ def _get_redis_exceptions() -> tuple:
     return _REDIS_EXC
 
 
+class CircuitBreaker:
+    """
+    Per-process closed → open → half-open breaker in front of Redis.
+
+    * **closed** — calls go to Redis.  ``failure_threshold`` consecutive
+      failures (connection errors, or calls slower than ``slow_ms``) open it.
+    * **open** — calls skip Redis entirely for ``cooldown`` seconds, so a
+      brownout costs a flag check instead of a socket timeout.
+    * **half-open** — once the cooldown has passed, exactly one caller is
+      let through as the probe while every other caller stays on the
+      fallback.  A fast success closes the breaker; anything else re-opens
+      it for another cooldown.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold: int = 3, slow_ms: float = 250, cooldown: float = 60,
+                 clock=time.monotonic):
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.slow = float(slow_ms) / 1000
+        self.cooldown = float(cooldown)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.state = self.CLOSED
+        self.failures = 0        # consecutive
+        self.opened_count = 0    # times the breaker tripped
+        self.short_circuited = 0  # calls kept off Redis while open / probing
+        self._opened_at = 0.0
+        self._probing = False
+
+    def allow(self) -> bool:
+        """May this call go to Redis?  Claims the single probe slot when half-open."""
+        if self.state == self.CLOSED:
+            return True
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and self._clock() - self._opened_at >= self.cooldown:
+                self.state = self.HALF_OPEN
+            if self.state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            self.short_circuited += 1
+            return False
+
+    def record(self, elapsed: float, ok: bool = True) -> str | None:
+        """Report one Redis call; returns the new state when this call changed it."""
+        failed = not ok or elapsed > self.slow
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self._probing = False
+            if not failed:
+                self.failures = 0
+                # Only the probe closes an open breaker, not a straggler from before it opened.
+                if self.state == self.HALF_OPEN:
+                    self.state = self.CLOSED
+                    return self.CLOSED
+                return None
+            self.failures += 1
+            if self.state == self.HALF_OPEN or (
+                self.state == self.CLOSED and self.failures >= self.failure_threshold
+            ):
+                self.state = self.OPEN
+                self._opened_at = self._clock()
+                self.opened_count += 1
+                return self.OPEN
+            return None
+
+    @property
+    def stats(self) -> dict:
+        with self._lock:
+            retry_in = 0.0
+            if self.state == self.OPEN:
+                retry_in = max(0.0, self.cooldown - (self._clock() - self._opened_at))
+            return {
+                "state": self.state,
+                "consecutive_failures": self.failures,
+                "opened_count": self.opened_count,
+                "short_circuited": self.short_circuited,
+                "retry_in": round(retry_in, 3),
+            }
+
+
+class NearCache:
+    """
+    Per-process LRU of Redis values, bounded by ``max_entries`` and by a
+    ``ttl`` in seconds that caps staleness should an invalidation be lost.
+
+    Only trusted while ``subscribed`` — i.e. while the owning
+    ``FallbackCache`` is listening for invalidations; every (re)subscribe
+    and every disconnect empties it.  ``epoch`` moves on each invalidation
+    so a read that raced one does not store the value it fetched.
+
+    Values are shared between callers, not copied: callers must treat
+    near-cached values as read-only.
+    """
+
+    def __init__(self, prefixes=(), max_entries: int = 2000, ttl: float = 30, clock=time.monotonic):
+        self.prefixes = tuple(prefixes)
+        self.max_entries = max(1, int(max_entries))
+        self.ttl = float(ttl)
+        self._clock = clock
+        self._data: OrderedDict[str, tuple[float, object]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.epoch = 0
+        self.subscribed = False
+
+    def covers(self, key) -> bool:
+        return bool(self.prefixes) and isinstance(key, str) and key.startswith(self.prefixes)
+
+    def get(self, key: str):
+        """Cached value, or ``_MISS``."""
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return _MISS
+            if item[0] <= self._clock():
+                del self._data[key]
+                return _MISS
+            self._data.move_to_end(key)
+            return item[1]
+
+    def put(self, key: str, value, epoch: int) -> None:
+        """Store ``value`` unless an invalidation arrived since ``epoch`` was read."""
+        with self._lock:
+            if epoch != self.epoch or not self.subscribed:
+                return
+            self._data[key] = (self._clock() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def invalidate(self, keys) -> None:
+        with self._lock:
+            self.epoch += 1
+            for key in keys:
+                self._data.pop(key, None)
+
+    def reset(self, subscribed: bool) -> None:
+        with self._lock:
+            self.epoch += 1
+            self._data.clear()
+            self.subscribed = subscribed
+
+    def __len__(self):
+        return len(self._data)
+
+
 class FallbackCache:
     """
     A thin proxy that delegates to ``django_redis.cache.RedisCache``
     but catches connection-level failures and replays the same operation
     against a per-process ``LocMemCache`` fallback.
 
+    Every Redis call goes through a ``CircuitBreaker`` and is bounded by
+    the socket timeouts below, so a slow or dead Redis is detected after a
+    few calls and then skipped until a single probe finds it healthy.
+
+    Reads of near-cache keys are served from ``NearCache`` while its
+    listener thread is subscribed to the invalidation channel and the
+    breaker is closed; otherwise they go to Redis as usual.
+
     This is **not** a Django cache backend subclass — it implements the
     same public interface via ``__getattr__`` delegation so that every
     current and future cache method is automatically supported.
@@ -73,11 +259,22 @@ class FallbackCache:
     def __init__(self, location: str, params: dict):
         from django_redis.cache import RedisCache
 
+        # Bounded per-operation socket timeouts unless OPTIONS sets its own.
+        options = dict(params.get("OPTIONS") or {})
+        options.setdefault("SOCKET_CONNECT_TIMEOUT", float(params.get("FALLBACK_CONNECT_TIMEOUT", 0.5)))
+        options.setdefault("SOCKET_TIMEOUT", float(params.get("FALLBACK_SOCKET_TIMEOUT", 0.25)))
+        params = {**params, "OPTIONS": options}
+
         self._location = location
         self._params = params
 
-        # Cooldown in seconds before retrying a failed Redis connection.
+        # Cooldown in seconds before a half-open probe retries Redis.
         self._cooldown: int = int(params.get("FALLBACK_COOLDOWN", 60))
+        self._breaker = CircuitBreaker(
+            failure_threshold=params.get("FALLBACK_FAILURE_THRESHOLD", 3),
+            slow_ms=params.get("FALLBACK_SLOW_MS", 250),
+            cooldown=self._cooldown,
+        )
 
         # Primary: Redis
         self._redis = RedisCache(location, params)
@@ -90,219 +287,456 @@ class FallbackCache:
             },
         )
 
-        # State
-        self._using_fallback = False
-        self._last_failure: float = 0.0
+        # Outage journal: Redis key -> pending INCRBY delta, or None for DEL.
+        self._journal: OrderedDict[str, int | None] = OrderedDict()
+        self._journal_size: int = int(params.get("FALLBACK_JOURNAL_SIZE", 10000))
+        self._journal_lock = threading.Lock()
+        self._journal_dropped: int = 0
+
+        # L1: per-process near cache, invalidated over pub/sub.
+        self._near = NearCache(
+            prefixes=params.get("FALLBACK_NEAR_PREFIXES") or (),
+            max_entries=params.get("FALLBACK_NEAR_SIZE", 2000),
+            ttl=params.get("FALLBACK_NEAR_TTL", 30),
+        )
+        self._near_channel = f"{params.get('KEY_PREFIX') or 'cache'}:near:invalidate"
+        self._near_listener: threading.Thread | None = None
+        self._near_listener_lock = threading.Lock()
 
-        # Hit/miss counters (thread-safe via lock).
+        # Hit/miss counters per tier (thread-safe via lock).
         self._lock = threading.Lock()
         self._hits: int = 0
         self._misses: int = 0
+        self._tiers = {tier: {"hits": 0, "misses": 0} for tier in ("near", "redis", "locmem")}
+
+        # Per-thread round-trip counter for ``count_round_trips``.
+        self._trips = threading.local()
 
     # ──────────────────────────────────────────────
     #  Internal helpers
     # ──────────────────────────────────────────────
 
-    def _should_retry_redis(self) -> bool:
-        """Return True if enough time has elapsed since the last failure."""
-        if not self._using_fallback:
-            return False
-        return (time.monotonic() - self._last_failure) >= self._cooldown
+    @property
+    def _using_fallback(self) -> bool:
+        return self._breaker.state != CircuitBreaker.CLOSED
 
-    def _mark_redis_down(self, exc: Exception) -> None:
-        if not self._using_fallback:
+    def _report(self, transition: str | None, exc: Exception | None = None) -> None:
+        if transition == CircuitBreaker.OPEN:
             logger.warning(
-                "Redis cache unavailable (%s). Falling back to in-memory cache.",
-                exc,
+                "Redis cache unavailable (%s). Falling back to in-memory cache for %ss.",
+                exc or "too slow", self._cooldown,
             )
             # Attempt Sentry capture if available.
             try:
                 import sentry_sdk
                 sentry_sdk.capture_message(
-                    f"Redis cache unavailable: {exc}",
+                    f"Redis cache unavailable: {exc or 'too slow'}",
                     level="warning",
                 )
             except Exception:
                 pass
-        self._using_fallback = True
-        self._last_failure = time.monotonic()
-
-    def _mark_redis_up(self) -> None:
-        if self._using_fallback:
+        elif transition == CircuitBreaker.CLOSED:
             logger.info("Redis cache is back online — switching from fallback.")
-        self._using_fallback = False
-        self._last_failure = 0.0
 
-    def _try_redis(self, method_name: str, *args, **kwargs):
+    def _guarded(self, call):
         """
-        Attempt an operation on Redis.  On success, return the result.
-        On a connection-level failure, mark Redis as down and return a
-        sentinel ``_MISS`` to signal the caller to use LocMem instead.
+        Run ``call()`` against Redis if the breaker allows it.  Returns the
+        result, or the sentinel ``_MISS`` when the breaker is open or the
+        call failed at the connection level — the caller then uses LocMem.
         """
+        self._trips.count = getattr(self._trips, "count", 0) + 1
+        if not self._breaker.allow():
+            return _MISS
+        if self._journal and not self._replay_journal():
+            return _MISS
+        started = time.monotonic()
         try:
-            result = getattr(self._redis, method_name)(*args, **kwargs)
-            # If we were in fallback mode and this succeeded, Redis is back.
-            if self._using_fallback:
-                self._mark_redis_up()
-            return result
+            result = call()
         except _get_redis_exceptions() as exc:
-            self._mark_redis_down(exc)
+            self._report(self._breaker.record(time.monotonic() - started, ok=False), exc)
             return _MISS
+        except BaseException:
+            # Not a connection problem (bad value, bug): Redis answered.
+            self._report(self._breaker.record(time.monotonic() - started))
+            raise
+        self._report(self._breaker.record(time.monotonic() - started))
+        return result
+
+    def _journal_invalidation(self, key, version=None, delta=None) -> None:
+        """Remember a DEL (``delta=None``) or INCRBY that did not reach Redis."""
+        redis_key = str(self._redis.make_key(key, version=version))
+        with self._journal_lock:
+            self._journal_add(redis_key, delta)
+
+    def _journal_add(self, redis_key: str, delta: int | None) -> None:
+        # Caller holds ``_journal_lock``.  A DEL supersedes earlier INCRs.
+        pending = self._journal.pop(redis_key, 0)
+        if delta is not None and pending is not None:
+            delta += pending
+        self._journal[redis_key] = delta
+        while len(self._journal) > self._journal_size:
+            self._journal.popitem(last=False)
+            self._journal_dropped += 1
+
+    def _replay_journal(self) -> bool:
+        """
+        Apply the outage journal to Redis in one pipeline.  Returns False
+        (journal kept, failure recorded on the breaker) if Redis is still
+        unreachable.
+        """
+        with self._journal_lock:
+            journal, self._journal = self._journal, OrderedDict()
+            dropped, self._journal_dropped = self._journal_dropped, 0
+        if not journal:
+            return True
+        started = time.monotonic()
+        try:
+            pipe = self._redis.client.get_client(write=True).pipeline(transaction=False)
+            for redis_key, delta in journal.items():
+                if delta is None:
+                    pipe.delete(redis_key)
+                else:
+                    pipe.incrby(redis_key, delta)
+            # Per-command errors (INCRBY on a non-integer) must not block recovery.
+            pipe.execute(raise_on_error=False)
+        except _get_redis_exceptions() as exc:
+            with self._journal_lock:
+                # Older entries go back in front of anything journaled meanwhile.
+                journal, self._journal = self._journal, journal
+                self._journal_dropped += dropped
+                for redis_key, delta in journal.items():
+                    self._journal_add(redis_key, delta)
+            self._report(self._breaker.record(time.monotonic() - started, ok=False), exc)
+            return False
+        logger.info(
+            "cache.fallback action=journal_replay keys=%d dropped=%d ms=%.1f",
+            len(journal), dropped, (time.monotonic() - started) * 1000,
+        )
+        if dropped:
+            logger.warning(
+                "Outage journal overflowed: %d invalidations were not replayed to Redis.", dropped,
+            )
+        return True
+
+    def _try_redis(self, method_name: str, *args, **kwargs):
+        return self._guarded(lambda: getattr(self._redis, method_name)(*args, **kwargs))
+
+    def _near_key(self, key, version=None) -> str | None:
+        """Near-cache key for ``key``, or None when it is not near-cached right now."""
+        if not self._near.covers(key):
+            return None
+        if self._near_listener is None:
+            self._start_near_listener()
+        if not self._near.subscribed or self._using_fallback:
+            return None
+        return str(self._redis.make_key(key, version=version))
+
+    def _near_publish(self, keys, version=None) -> None:
+        """Drop near-cached ``keys`` here and tell every other worker to drop them."""
+        near_keys = [str(self._redis.make_key(key, version=version)) for key in keys if self._near.covers(key)]
+        if not near_keys:
+            return
+        self._near.invalidate(near_keys)
+        message = "\n".join(near_keys)
+        # A lost message leaves other workers stale for at most FALLBACK_NEAR_TTL.
+        self._guarded(lambda: self._redis.client.get_client(write=True).publish(self._near_channel, message))
+
+    def _start_near_listener(self) -> None:
+        with self._near_listener_lock:
+            if self._near_listener is None:
+                self._near_listener = threading.Thread(
+                    target=self._near_listen, name="near-cache-invalidation", daemon=True,
+                )
+                self._near_listener.start()
+
+    def _near_listen(self) -> None:
+        """Listener thread: apply invalidations; the near cache is off while disconnected."""
+        backoff = 1.0
+        while True:
+            pubsub = None
+            try:
+                pubsub = self._redis.client.get_client(write=False).pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self._near_channel)
+                self._near.reset(subscribed=True)
+                backoff = 1.0
+                while True:
+                    # Polling keeps each socket read within SOCKET_TIMEOUT.
+                    message = pubsub.get_message(timeout=0.2)
+                    if message is None:
+                        continue
+                    data = message["data"]
+                    data = data.decode() if isinstance(data, bytes) else str(data)
+                    if data == "*":
+                        self._near.reset(subscribed=True)
+                    else:
+                        self._near.invalidate(data.split("\n"))
+            except Exception as exc:
+                # Log the drop once; retries while Redis stays down are debug noise.
+                log = logger.info if self._near.subscribed else logger.debug
+                self._near.reset(subscribed=False)
+                log("Near-cache listener disconnected (%s); retrying in %.0fs.", exc, backoff)
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 60.0)
 
     # ──────────────────────────────────────────────
     #  Public cache API — explicit for the hot-path
     # ──────────────────────────────────────────────
 
     def get(self, key, default=None, version=None):
-        if self._using_fallback:
-            if self._should_retry_redis():
-                result = self._try_redis("get", key, default=default, version=version)
-                if result is not _MISS:
-                    self._record_hit()
-                    return result
-            value = self._locmem.get(key, default=default, version=version)
-        else:
-            result = self._try_redis("get", key, default=default, version=version)
-            if result is not _MISS:
-                self._record_hit()
-                return result
-            value = self._locmem.get(key, default=default, version=version)
-
-        if value is None or value == default:
-            self._record_miss()
-        else:
-            self._record_hit()
+        near_key = self._near_key(key, version)
+        if near_key is not None:
+            value = self._near.get(near_key)
+            if value is not _MISS:
+                self._record("near", hit=True)
+                return value
+            self._record("near", hit=False, final=False)
+            epoch = self._near.epoch
+
+        result = self._try_redis("get", key, default=default, version=version)
+        if result is not _MISS:
+            hit = not (result is None or result == default)
+            self._record("redis", hit)
+            if hit and near_key is not None:
+                self._near.put(near_key, result, epoch)
+            return result
+        value = self._locmem.get(key, default=default, version=version)
+        self._record("locmem", hit=not (value is None or value == default))
         return value
 
-    def _record_hit(self):
-        with self._lock:
-            self._hits += 1
-
-    def _record_miss(self):
+    def _record(self, tier: str, hit: bool, final: bool = True):
+        """Count a lookup on ``tier``; ``final`` lookups also count towards the totals."""
         with self._lock:
-            self._misses += 1
+            self._tiers[tier]["hits" if hit else "misses"] += 1
+            if final:
+                if hit:
+                    self._hits += 1
+                else:
+                    self._misses += 1
 
     @property
     def stats(self) -> dict:
-        """Return current hit/miss counters for monitoring."""
+        """Return hit/miss counters (overall and per tier) and breaker state for monitoring."""
         with self._lock:
             total = self._hits + self._misses
-            return {
+            counters = {
                 "hits": self._hits,
                 "misses": self._misses,
                 "hit_rate": round(self._hits / total, 4) if total else 0.0,
-                "using_fallback": self._using_fallback,
+                "tiers": {tier: dict(counts) for tier, counts in self._tiers.items()},
             }
+        counters["tiers"]["near"].update(entries=len(self._near), subscribed=self._near.subscribed)
+        with self._journal_lock:
+            journal = {"pending": len(self._journal), "dropped": self._journal_dropped}
+        return {
+            **counters,
+            "using_fallback": self._using_fallback,
+            "breaker": self._breaker.stats,
+            "journal": journal,
+        }
 
     def set(self, key, value, timeout=None, version=None):
         # Always write to locmem so fallback reads work.
         self._locmem.set(key, value, timeout=timeout, version=version)
-
-        if self._using_fallback:
-            if self._should_retry_redis():
-                result = self._try_redis("set", key, value, timeout=timeout, version=version)
-                if result is not _MISS:
-                    return result
-            return  # locmem write is enough
-        
         result = self._try_redis("set", key, value, timeout=timeout, version=version)
+        self._near_publish([key], version)
         if result is not _MISS:
             return result
 
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        result = self._try_redis("add", key, value, timeout=timeout, version=version)
+        if result is _MISS:
+            result = self._locmem.add(key, value, timeout=timeout, version=version)
+        if result:
+            self._near_publish([key], version)
+        return result
+
     def delete(self, key, version=None):
         self._locmem.delete(key, version=version)
-
-        if self._using_fallback:
-            if self._should_retry_redis():
-                result = self._try_redis("delete", key, version=version)
-                if result is not _MISS:
-                    return result
-            return
-        
         result = self._try_redis("delete", key, version=version)
+        self._near_publish([key], version)
         if result is not _MISS:
             return result
+        self._journal_invalidation(key, version=version)
+
+    def delete_many(self, keys, version=None):
+        self._locmem.delete_many(keys, version=version)
+        result = self._try_redis("delete_many", keys, version=version)
+        self._near_publish(keys, version)
+        if result is not _MISS:
+            return result
+        for key in keys:
+            self._journal_invalidation(key, version=version)
 
     def clear(self):
         self._locmem.clear()
-
-        if self._using_fallback:
-            if self._should_retry_redis():
-                result = self._try_redis("clear")
-                if result is not _MISS:
-                    return result
-            return
-
         result = self._try_redis("clear")
+        self._near.reset(self._near.subscribed)
+        if self._near.prefixes:
+            self._guarded(lambda: self._redis.client.get_client(write=True).publish(self._near_channel, "*"))
         if result is not _MISS:
             return result
 
     def get_many(self, keys, version=None):
-        if self._using_fallback:
-            if self._should_retry_redis():
-                result = self._try_redis("get_many", keys, version=version)
-                if result is not _MISS:
-                    return result
-            return self._locmem.get_many(keys, version=version)
-
-        result = self._try_redis("get_many", keys, version=version)
-        if result is not _MISS:
-            return result
-        return self._locmem.get_many(keys, version=version)
+        found, remaining, near_keys = {}, [], {}
+        epoch = self._near.epoch
+        for key in keys:
+            near_key = self._near_key(key, version)
+            if near_key is not None:
+                value = self._near.get(near_key)
+                if value is not _MISS:
+                    found[key] = value
+                    self._record("near", hit=True)
+                    continue
+                self._record("near", hit=False, final=False)
+                near_keys[key] = near_key
+            remaining.append(key)
+        if not remaining:
+            return found
+
+        result = self._try_redis("get_many", remaining, version=version)
+        if result is _MISS:
+            result = self._locmem.get_many(remaining, version=version)
+        else:
+            for key, near_key in near_keys.items():
+                if key in result:
+                    self._near.put(near_key, result[key], epoch)
+        found.update(result)
+        return found
 
     def set_many(self, mapping, timeout=None, version=None):
         self._locmem.set_many(mapping, timeout=timeout, version=version)
-
-        if self._using_fallback:
-            if self._should_retry_redis():
-                result = self._try_redis("set_many", mapping, timeout=timeout, version=version)
-                if result is not _MISS:
-                    return result
-            return
-
         result = self._try_redis("set_many", mapping, timeout=timeout, version=version)
+        self._near_publish(list(mapping), version)
         if result is not _MISS:
             return result
 
     def has_key(self, key, version=None):
-        if self._using_fallback:
-            if self._should_retry_redis():
-                result = self._try_redis("has_key", key, version=version)
-                if result is not _MISS:
-                    return result
-            return self._locmem.has_key(key, version=version)
-
         result = self._try_redis("has_key", key, version=version)
         if result is not _MISS:
             return result
         return self._locmem.has_key(key, version=version)
 
     def incr(self, key, delta=1, version=None):
-        if self._using_fallback:
-            if self._should_retry_redis():
-                result = self._try_redis("incr", key, delta=delta, version=version)
-                if result is not _MISS:
-                    return result
-            return self._locmem.incr(key, delta=delta, version=version)
-
         result = self._try_redis("incr", key, delta=delta, version=version)
+        self._near_publish([key], version)
         if result is not _MISS:
             return result
+        self._journal_invalidation(key, version=version, delta=delta)
         return self._locmem.incr(key, delta=delta, version=version)
 
     def decr(self, key, delta=1, version=None):
-        if self._using_fallback:
-            if self._should_retry_redis():
-                result = self._try_redis("decr", key, delta=delta, version=version)
-                if result is not _MISS:
-                    return result
-            return self._locmem.decr(key, delta=delta, version=version)
-
         result = self._try_redis("decr", key, delta=delta, version=version)
+        self._near_publish([key], version)
         if result is not _MISS:
             return result
+        self._journal_invalidation(key, version=version, delta=-delta)
         return self._locmem.decr(key, delta=delta, version=version)
 
+    def pipeline(self) -> "CachePipeline":
+        return CachePipeline(self)
+
+    def execute_pipeline(self, ops: list) -> list:
+        """Run queued ``CachePipeline`` ops in one Redis round trip (see ``_redis_pipeline``)."""
+        results = self._guarded(lambda: self._redis_pipeline(ops))
+        if results is _MISS:
+            results = _run_sequential(self._locmem, ops)
+            for name, key, _, version in ops:
+                if name == "delete":
+                    self._journal_invalidation(key, version=version)
+        else:
+            # Keep LocMem in step so fallback reads work, as ``set`` does.
+            _run_sequential(self._locmem, [op for op in ops if op[0] != "get"])
+        tier = "locmem" if self._using_fallback else "redis"
+        for name, key, args, version in ops:
+            if name != "get":
+                self._near_publish([key], version)
+        for (name, _, args, _), result in zip(ops, results):
+            if name == "get":
+                self._record(tier, hit=not (result is None or result == args[0]))
+        return results
+
+    def _redis_pipeline(self, ops: list) -> list:
+        client = self._redis.client
+        pipe = client.get_client(write=True).pipeline(transaction=False)
+        for name, key, args, version in ops:
+            redis_key = client.make_key(key, version=version)
+            if name == "get":
+                pipe.get(redis_key)
+            elif name == "delete":
+                pipe.delete(redis_key)
+            else:  # set / add
+                value, timeout = args
+                if timeout is DEFAULT_TIMEOUT:
+                    timeout = self._redis.default_timeout
+                if timeout is not None and timeout <= 0:
+                    # Django semantics: expire immediately.
+                    pipe.delete(redis_key)
+                else:
+                    px = int(timeout * 1000) if timeout is not None else None
+                    pipe.set(redis_key, client.encode(value), px=px, nx=name == "add")
+        results = []
+        for (name, _, args, _), raw in zip(ops, pipe.execute()):
+            if name == "get":
+                results.append(args[0] if raw is None else client.decode(raw))
+            else:
+                results.append(bool(raw))
+        return results
+
+    def run_script(self, script: "CacheScript", keys, args=()):
+        """
+        Run ``script`` on Redis in one round trip; on fallback run its
+        Python equivalent against LocMem.  ``keys`` get ``KEY_PREFIX``
+        and version applied, like every other cache key.
+        """
+        keys, args = list(keys), list(args)
+
+        def call():
+            client = self._redis.client.get_client(write=True)
+            if script.registered is None:
+                script.registered = client.register_script(script.lua)
+            redis_keys = [str(self._redis.make_key(key)) for key in keys]
+            return script.registered(keys=redis_keys, args=args, client=client)
+
+        result = self._guarded(call)
+        return script.fallback(self._locmem, keys, args) if result is _MISS else result
+
+    @contextmanager
+    def count_round_trips(self):
+        """
+        Count the cache calls made by this thread inside the block — one per
+        method call, pipeline or script, whichever tier served it::
+
+            with cache.count_round_trips() as trips:
+                WorkingMemoryBuffer.append(user_id, q, a)
+            trips.count
+        """
+        trips = RoundTrips()
+        start = getattr(self._trips, "count", 0)
+        try:
+            yield trips
+        finally:
+            trips.count = getattr(self._trips, "count", 0) - start
+
+    def run_redis(self, fn, fallback):
+        """
+        Run ``fn(client)`` against the raw redis-py client.
+
+        Used for data-structure commands (HINCRBY, ZADD, PFADD, ...) that the
+        Django cache API does not expose.  Keys passed to the raw client are
+        used verbatim — no ``KEY_PREFIX`` / version is applied.
+
+        When Redis is down (or the breaker is open) the zero-argument
+        ``fallback`` callable is invoked instead and its result returned,
+        mirroring the LocMem replay of the cache methods.
+        """
+        result = self._guarded(lambda: fn(self._redis.client.get_client(write=True)))
+        return fallback() if result is _MISS else result
+
     def close(self, **kwargs):
         try:
             self._redis.close(**kwargs)
@@ -324,13 +758,6 @@ class FallbackCache:
             raise AttributeError(name)
 
         def _proxy(*args, **kwargs):
-            if self._using_fallback:
-                if self._should_retry_redis():
-                    result = self._try_redis(name, *args, **kwargs)
-                    if result is not _MISS:
-                        return result
-                return getattr(self._locmem, name)(*args, **kwargs)
-
             result = self._try_redis(name, *args, **kwargs)
             if result is not _MISS:
                 return result
@@ -342,6 +769,106 @@ class FallbackCache:
         return self.has_key(key)
 
 
+def run_redis(fn, fallback, backend=None):
+    """
+    ``backend.run_redis(fn, fallback)`` when ``backend`` (default:
+    ``django.core.cache.cache``) is a ``FallbackCache``; any other backend
+    has no raw client, so ``fallback()`` runs directly.
+    """
+    if backend is None:
+        from django.core.cache import cache as backend
+    runner = getattr(backend, "run_redis", None)
+    if runner is None:
+        return fallback()
+    return runner(fn, fallback)
+
+
+class RoundTrips:
+    """Result of ``FallbackCache.count_round_trips``; ``count`` is set when the block exits."""
+
+    __slots__ = ("count",)
+
+    def __init__(self):
+        self.count = 0
+
+
+def _run_sequential(backend, ops: list) -> list:
+    return [getattr(backend, name)(key, *args, version=version) for name, key, args, version in ops]
+
+
+class CachePipeline:
+    """
+    Cache calls queued and sent together by ``execute()``, which returns
+    their results in order.  On ``FallbackCache`` that is one Redis
+    pipeline (not a transaction); on any other cache the calls run one by
+    one.  Queue methods return the pipeline, so calls chain::
+
+        buf, session = cache_pipeline().get(buf_key, []).get(session_key).execute()
+    """
+
+    def __init__(self, backend):
+        self._backend = backend
+        self._ops: list = []
+
+    def get(self, key, default=None, version=None):
+        self._ops.append(("get", key, (default,), version))
+        return self
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self._ops.append(("set", key, (value, timeout), version))
+        return self
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self._ops.append(("add", key, (value, timeout), version))
+        return self
+
+    def delete(self, key, version=None):
+        self._ops.append(("delete", key, (), version))
+        return self
+
+    def __len__(self):
+        return len(self._ops)
+
+    def execute(self) -> list:
+        ops, self._ops = self._ops, []
+        if not ops:
+            return []
+        runner = getattr(self._backend, "execute_pipeline", None)
+        return runner(ops) if runner is not None else _run_sequential(self._backend, ops)
+
+
+def cache_pipeline(backend=None) -> CachePipeline:
+    """A ``CachePipeline`` on ``backend`` (default: ``django.core.cache.cache``)."""
+    if backend is None:
+        from django.core.cache import cache as backend
+    return CachePipeline(backend)
+
+
+class CacheScript:
+    """
+    A Lua script registered once per process and run server-side in one
+    round trip.  It works on raw Redis data types (sorted sets, hashes,
+    ...), not on serialized cache values.
+
+    ``fallback(backend, keys, args)`` is the Python equivalent, run against
+    LocMem when Redis is down and against any other cache directly.  It
+    must return the same shape as the script.
+    """
+
+    def __init__(self, lua: str, fallback):
+        self.lua = lua
+        self.fallback = fallback
+        self.registered = None  # redis-py ``Script``: EVALSHA, loading on NOSCRIPT
+
+    def __call__(self, keys, args=(), backend=None):
+        if backend is None:
+            from django.core.cache import cache as backend
+        runner = getattr(backend, "run_script", None)
+        if runner is None:
+            return self.fallback(backend, list(keys), list(args))
+        return runner(self, keys, args)
+
+
 # Sentinel object — NOT the same as None (which is a valid cache value).
 class _MissSentinel:
     __slots__ = ()
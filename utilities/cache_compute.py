@@ -0,0 +1,209 @@
+"""
+Stampede-proof cache reads.
+
+``get_or_compute(key, builder, ttl, stale_ttl, tags)`` returns the cached
+value for ``key``, calling ``builder()`` only when it has to:
+
+* **Fresh** — served as-is.  Entries are the ``tagged_set`` shape
+  (``{"tags", "value"}``) plus ``soft`` (wall-clock end of freshness) and
+  ``delta`` (seconds the last build took), so ``tagged_get`` can still
+  read them.
+* **Early refresh (XFetch)** — as ``soft`` approaches, each read refreshes
+  with probability rising towards 1, weighted by ``delta``: an expensive
+  value is rebuilt a little before it expires instead of by every worker
+  at once when it does.
+* **Stale-while-revalidate** — an entry past ``soft`` is kept for another
+  ``stale_ttl`` seconds.  The one caller that wins the lock rebuilds it;
+  everyone else gets the stale value without waiting.  A failed rebuild
+  is logged and the stale value served.
+* **Hard miss** (nothing cached, or a tag was bumped) — within a process,
+  concurrent callers share one build; across workers, the holder of
+  ``compute_lock(key)`` builds while the others poll for its result for
+  up to ``lock_wait`` seconds, then build uncached rather than fail.
+
+A bumped tag is always a hard miss: stale values are only served for
+time-based expiry, never after an edit.
+
+A builder may return ``WithTTL(value, ttl)`` to shorten that value's life
+(e.g. a list that changes when its first row expires); such a value gets
+no stale window.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import random
+import threading
+import time
+from dataclasses import dataclass
+
+from django.core.cache import cache
+
+from utilities.cache_keys import compute_lock, tag_generations, tagged_entries, tagged_entry
+
+logger = logging.getLogger("utilities.cache_compute")
+
+LOCK_TIMEOUT = 30   # Seconds a rebuild may hold the cross-worker lock
+LOCK_WAIT = 2.0     # Seconds a hard miss waits for another worker's rebuild
+XFETCH_BETA = 1.0   # >1 refreshes earlier, <1 later
+
+
+@dataclass(frozen=True)
+class WithTTL:
+    """Builder result that carries its own lifetime in seconds."""
+
+    value: object
+    ttl: int
+
+
+class _Flight:
+    """One in-process build that concurrent callers for the same key wait on."""
+
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+_flights: dict[str, _Flight] = {}
+_flights_lock = threading.Lock()
+
+
+def get_or_compute(key: str, builder, ttl: int | None, stale_ttl: int = 0, tags=(),
+                   lock_wait: float = LOCK_WAIT):
+    """Cached value of ``builder()`` under ``key`` — see the module docstring."""
+    tags = list(tags)
+    entry, _ = tagged_entry(key, tags)
+    if entry is not None:
+        if not _refresh_due(entry):
+            return entry["value"]
+        return _revalidate(key, builder, ttl, stale_ttl, tags, entry["value"])
+    return _coalesced(key, builder, ttl, stale_ttl, tags, lock_wait)
+
+
+def get_first(candidates, ttl: int | None, stale_ttl: int = 0, tags=()):
+    """
+    First truthy value of ``get_or_compute(key, builder, ...)`` over
+    ``candidates`` (``(key, builder)`` pairs sharing ``ttl`` and ``tags``),
+    in order.  Every key is read in one round trip up front; only keys that
+    are missing or due for refresh fall through to ``get_or_compute``.
+    """
+    tags = list(tags)
+    entries, _ = tagged_entries([key for key, _ in candidates], tags)
+    for key, builder in candidates:
+        entry = entries[key]
+        if entry is not None and not _refresh_due(entry):
+            value = entry["value"]
+        else:
+            value = get_or_compute(key, builder, ttl, stale_ttl, tags)
+        if value:
+            return value
+    return None
+
+
+def refresh(key: str, builder, ttl: int | None, stale_ttl: int = 0, tags=()):
+    """Build and store ``key`` unconditionally (cron warmers, management commands)."""
+    tags = list(tags)
+    return _build(key, builder, ttl, stale_ttl, tag_generations(tags) if tags else {})
+
+
+def _refresh_due(entry: dict) -> bool:
+    soft = entry.get("soft")
+    if soft is None:
+        return False
+    # XFetch: now - delta * beta * ln(U) >= expiry, with U in (0, 1].
+    delta = entry.get("delta") or 0.0
+    return time.time() - delta * XFETCH_BETA * math.log(1.0 - random.random()) >= soft
+
+
+def _build(key, builder, ttl, stale_ttl, generations):
+    """Run ``builder`` and store its value stamped with ``generations`` (read beforehand)."""
+    started = time.monotonic()
+    result = builder()
+    delta = time.monotonic() - started
+    if isinstance(result, WithTTL):
+        value, ttl, stale_ttl = result.value, max(1, int(result.ttl)), 0
+    else:
+        value = result
+    entry = {
+        "tags": generations,
+        "value": value,
+        "soft": time.time() + ttl if ttl is not None else None,
+        "delta": round(delta, 4),
+    }
+    cache.set(key, entry, timeout=ttl + stale_ttl if ttl is not None else None)
+    logger.debug("cache.compute action=build key=%s ms=%.1f", key, delta * 1000)
+    return value
+
+
+def _revalidate(key, builder, ttl, stale_ttl, tags, stale):
+    """Entry is due: the lock holder rebuilds, everyone else keeps serving ``stale``."""
+    lock = compute_lock(key)
+    if not cache.add(lock, "1", timeout=LOCK_TIMEOUT):
+        return stale
+    try:
+        # Generations re-read under the lock, so an edit racing the build still wins.
+        _, generations = tagged_entry(key, tags)
+        return _build(key, builder, ttl, stale_ttl, generations)
+    except Exception:
+        logger.exception("cache.compute action=revalidate_failed key=%s", key)
+        return stale
+    finally:
+        cache.delete(lock)
+
+
+def _coalesced(key, builder, ttl, stale_ttl, tags, lock_wait):
+    """Hard miss: one build per process, shared by every concurrent caller."""
+    with _flights_lock:
+        flight = _flights.get(key)
+        leader = flight is None
+        if leader:
+            flight = _flights[key] = _Flight()
+
+    if not leader:
+        if flight.done.wait(LOCK_TIMEOUT):
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+        return _unwrap(builder())
+
+    try:
+        flight.value = _single_flight(key, builder, ttl, stale_ttl, tags, lock_wait)
+        return flight.value
+    except Exception as exc:
+        flight.error = exc
+        raise
+    finally:
+        with _flights_lock:
+            _flights.pop(key, None)
+        flight.done.set()
+
+
+def _single_flight(key, builder, ttl, stale_ttl, tags, lock_wait):
+    """Hard miss across workers: the lock holder builds, the rest wait for its entry."""
+    lock = compute_lock(key)
+    if cache.add(lock, "1", timeout=LOCK_TIMEOUT):
+        try:
+            # Another worker may have stored the entry since our first read.
+            entry, generations = tagged_entry(key, tags)
+            if entry is not None:
+                return entry["value"]
+            return _build(key, builder, ttl, stale_ttl, generations)
+        finally:
+            cache.delete(lock)
+
+    deadline = time.monotonic() + lock_wait
+    while time.monotonic() < deadline:
+        time.sleep(0.05)
+        entry, _ = tagged_entry(key, tags)
+        if entry is not None:
+            return entry["value"]
+    logger.info("cache.compute action=wait_timeout key=%s", key)
+    return _unwrap(builder())
+
+
+def _unwrap(result):
+    return result.value if isinstance(result, WithTTL) else result
@@ -10,8 +10,120 @@ All keys use the "ahara:" prefix so they're easy to locate in Redis:
 
 The KEY_PREFIX in settings.CACHES adds a second prefix at the backend
 layer; these functions only manage the *logical* key portion.
+
+Tag-based invalidation
+----------------------
+Entries written with ``tagged_set`` embed the generation of every tag
+they depend on (``content:recipe``, ``user:42:plan`` …).  ``bump_tags``
+increments a tag's counter — one ``INCR`` regardless of how many
+entries carry the tag — and ``tagged_get`` treats any entry whose
+embedded generations no longer match as a miss.  Model signals bump the
+tags, so tagged entries can live for hours without ever being served
+stale after an edit.
+
+``utilities.cache_compute.get_or_compute`` builds on the same entries,
+adding stampede protection and stale-while-revalidate.
 """
 
+import time
+
+from django.core.cache import cache
+
+
+# ── Tags ───────────────────────────────────────────────────────────────
+
+def content_tag(resource: str) -> str:
+    """Tag for every cached view of one content type, e.g. ``content:recipe``."""
+    return f"content:{resource}"
+
+
+def user_plan_tag(user_id: int) -> str:
+    """Tag for cached views of one user's plan items."""
+    return f"user:{user_id}:plan"
+
+
+def tag_key(tag: str) -> str:
+    """Generation counter backing ``tag``."""
+    return f"ahara:tag:{tag}"
+
+
+def _fresh_generation() -> int:
+    # Time-based so a counter that was evicted (or never existed) restarts
+    # above any generation an old entry could still carry.
+    return time.time_ns() // 1000
+
+
+def tag_generations(tags) -> dict[str, int]:
+    """Current generation of each tag, creating missing counters."""
+    keys = {tag: tag_key(tag) for tag in tags}
+    found = cache.get_many(list(keys.values()))
+    generations = {}
+    for tag, key in keys.items():
+        generation = found.get(key)
+        if generation is None:
+            generation = _fresh_generation()
+            if not cache.add(key, generation, timeout=None):
+                generation = cache.get(key, generation)
+        generations[tag] = generation
+    return generations
+
+
+def bump_tags(*tags: str) -> None:
+    """Invalidate every entry carrying any of ``tags`` — one ``INCR`` per tag."""
+    for tag in tags:
+        try:
+            cache.incr(tag_key(tag))
+        except ValueError:
+            cache.set(tag_key(tag), _fresh_generation(), timeout=None)
+
+
+def tagged_entry(key: str, tags) -> tuple[dict | None, dict[str, int]]:
+    """
+    Return ``(entry, generations)``: the stored ``{"tags", "value", ...}``
+    dict, read together with its tag counters in one round trip, or
+    ``None`` on a miss or when any tag was bumped since it was written.
+    """
+    entries, generations = tagged_entries([key], tags)
+    return entries[key], generations
+
+
+def tagged_entries(keys, tags) -> tuple[dict[str, dict | None], dict[str, int]]:
+    """``tagged_entry`` for several keys sharing ``tags``, still one round trip."""
+    keys, tags = list(keys), list(tags)
+    found = cache.get_many([*keys, *(tag_key(tag) for tag in tags)])
+    current = {tag: found.get(tag_key(tag)) for tag in tags}
+    if any(generation is None for generation in current.values()):
+        return dict.fromkeys(keys), tag_generations(tags)
+
+    entries = {}
+    for key in keys:
+        entry = found.get(key)
+        valid = isinstance(entry, dict) and "value" in entry and entry.get("tags") == current
+        entries[key] = entry if valid else None
+    return entries, current
+
+
+def tagged_get(key: str, tags) -> tuple[object, dict[str, int]]:
+    """
+    Return ``(value, generations)`` for a tagged entry, reading the entry
+    and its tag counters in one round trip.  ``value`` is ``None`` on a
+    miss or when any tag was bumped since the entry was written; pass
+    ``generations`` to ``tagged_set`` so a bump that races the rebuild
+    invalidates the freshly written entry too.
+    """
+    entry, generations = tagged_entry(key, tags)
+    return (entry["value"] if entry is not None else None), generations
+
+
+def tagged_set(key: str, value, generations: dict[str, int], timeout=None) -> None:
+    """Store ``value`` stamped with the tag ``generations`` read before it was built."""
+    cache.set(key, {"tags": generations, "value": value}, timeout=timeout)
+
+
+def compute_lock(key: str) -> str:
+    """Single-flight lock held by the worker rebuilding ``key`` (see ``get_or_compute``)."""
+    return f"ahara:lock:{key}"
+
 
 # ── Daily Tip ──────────────────────────────────────────────────────────
 
@@ -52,9 +164,47 @@ def featured_playlists() -> str:
     return getattr(settings, "FEATURED_KEY", "ahara:pl:featured:v1:default")
 
 
-def featured_lock() -> str:
-    """Mutex lock key used during featured-playlist cache regeneration."""
-    return "ahara:pl:featured:lock"
+def static_content(resource: str, fieldset: str = "") -> str:
+    """Small, rarely edited list or config (breathwork, ambient sounds, search config)."""
+    suffix = f":{fieldset}" if fieldset else ""
+    return f"ahara:static:{resource}{suffix}"
+
+
+def playlist_counter_pending() -> str:
+    """Redis hash of buffered playlist counter deltas, fields ``"<pk>:<counter>"``."""
+    return "ahara:pl:ctr:pending"
+
+
+def playlist_counter_flushing(token: str) -> str:
+    """Snapshot of the pending hash renamed away while a flusher applies it."""
+    return f"ahara:pl:ctr:flushing:{token}"
+
+
+def playlist_counter_snapshots() -> str:
+    """Set of the ``playlist_counter_flushing`` keys that still hold unapplied deltas."""
+    return "ahara:pl:ctr:snapshots"
+
+
+def playlist_trending(generation: int, playlist_type: str = "", language: str = "") -> str:
+    """Decayed trending sorted set for one epoch generation and type/language scope."""
+    return f"ahara:pl:trend:{generation}:{playlist_type or '_'}:{language or '_'}"
+
+
+def playlist_viewers(pk: int, day) -> str:
+    """HyperLogLog of user ids that viewed one playlist on one UTC day."""
+    return f"ahara:pl:uv:{pk}:{day:%Y%m%d}"
+
+
+def playlist_viewers_active() -> str:
+    """Sorted set of playlist ids scored by when a viewer was last recorded."""
+    return "ahara:pl:uv:active"
+
+
+# ── User Plan ──────────────────────────────────────────────────────────
+
+def user_plan_day(user_id: int, date_str: str) -> str:
+    """One user's plan items for an ISO date (tagged ``user:{id}:plan``)."""
+    return f"ahara:plan:{user_id}:{date_str}"
 
 
 # ── Intelligence / Memory ──────────────────────────────────────────────
@@ -74,3 +224,27 @@ def memory_snapshot(user_id: int) -> str:
 def search_result(resource: str, digest: str) -> str:
     """Cached search/filter result set."""
     return f"ahara:search:{resource}:{digest}"
+
+
+def list_fragment(resource: str, pk: int, version: int, fieldset: str = "") -> str:
+    """
+    JSON-encoded list item (text) for one row at one ``updated_at``
+    version; ``fieldset`` is the sparse-fieldset digest (``""`` = full shape).
+    """
+    suffix = f":{fieldset}" if fieldset else ""
+    return f"ahara:frag:v2:{resource}:{pk}:{version}{suffix}"
+
+
+def facet_counts(resource: str) -> str:
+    """Per-field value counts for one content type (tagged ``content:<resource>``)."""
+    return f"ahara:facets:{resource}"
+
+
+def query_count(digest: str) -> str:
+    """Cached COUNT(*) for one queryset (``?count=estimated`` pagination)."""
+    return f"ahara:count:{digest}"
+
+
+def autocomplete_source(source: str) -> str:
+    """Autocomplete entry list for one source (tagged ``content:<source>``)."""
+    return f"ahara:ac:src:{source}"
@@ -0,0 +1,73 @@
+"""
+Small ORM helpers for hot write paths.
+"""
+
+from django.db import connections, transaction
+from django.db.models.sql import UpdateQuery
+
+
+def update_returning(queryset, fields=None, **updates) -> list:
+    """
+    Apply ``queryset.update(**updates)`` and return the updated rows as
+    model instances, read back *in the same statement* via
+    ``UPDATE ... RETURNING`` (PostgreSQL, SQLite >= 3.35).
+
+    ``updates`` accepts everything ``QuerySet.update`` does, including
+    ``F()`` expressions, so counters can be bumped and their new values
+    returned without a follow-up ``refresh_from_db``.  ``fields`` limits
+    the returned columns (the primary key is always included); the
+    remaining fields are deferred on the returned instances.
+
+    Backends without ``RETURNING`` fall back to UPDATE + SELECT inside one
+    transaction.
+    """
+    model = queryset.model
+    db = queryset.db
+    connection = connections[db]
+    opts = model._meta
+
+    # Keep model field order — Model.from_db() expects it for deferred loading.
+    wanted = None if fields is None else {opts.pk.name, *fields}
+    targets = [f for f in opts.concrete_fields if wanted is None or f.name in wanted]
+
+    if not connection.features.can_return_columns_from_insert:
+        with transaction.atomic(using=db):
+            pks = list(queryset.values_list("pk", flat=True))
+            model._default_manager.using(db).filter(pk__in=pks).update(**updates)
+            return list(
+                model._default_manager.using(db)
+                .filter(pk__in=pks)
+                .only(*[f.attname for f in targets]),
+            )
+
+    query = queryset.query.chain(UpdateQuery)
+    query.add_update_values(updates)
+    query.annotations = {}
+    compiler = query.get_compiler(db)
+    compiler.pre_sql_setup()
+    sql, params = compiler.as_sql()
+    if not sql:
+        return []
+
+    qn = connection.ops.quote_name
+    returning = ", ".join(qn(f.column) for f in targets)
+    with transaction.mark_for_rollback_on_error(using=db), connection.cursor() as cursor:
+        cursor.execute(f"{sql} RETURNING {returning}", params)
+        rows = cursor.fetchall()
+
+    # Apply the same DB → Python converters the ORM uses on SELECT.
+    columns = [f.get_col(opts.db_table) for f in targets]
+    converters = [
+        connection.ops.get_db_converters(col) + col.get_db_converters(connection)
+        for col in columns
+    ]
+    attnames = [f.attname for f in targets]
+    instances = []
+    for row in rows:
+        values = []
+        for value, col, col_converters in zip(row, columns, converters):
+            for converter in col_converters:
+                value = converter(value, col, connection)
+            values.append(value)
+        instances.append(model.from_db(db, attnames, values))
+    return instances
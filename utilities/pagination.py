@@ -1,19 +1,21 @@
+import base64
+import binascii
+import hashlib
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+from uuid import UUID
+
 from django.conf import settings
+from django.db import connections
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
 
+COUNT_MODES = ("exact", "estimated", "none")
 
-def paginate_queryset(qs, request):
-    """
-    Slice *qs* according to ``?page`` and ``?page_size`` query params.
 
-    Limits are read from ``settings.PAGINATION`` so they can be tuned per
-    environment without touching view code:
-        PAGINATION = {"PAGE_SIZE_DEFAULT": 20, "PAGE_SIZE_MAX": 100}
-
-    Returns ``(page_queryset, meta_dict)`` where *meta_dict* has the shape:
-        { page, page_size, total, has_next }
-
-    Both params are clamped to safe ranges — invalid input never raises.
-    """
+def page_params(request) -> tuple[int, int]:
+    """Return the clamped ``(page, page_size)`` from the request query params."""
     config = getattr(settings, "PAGINATION", {})
     default_size: int = config.get("PAGE_SIZE_DEFAULT", 20)
     max_size: int = config.get("PAGE_SIZE_MAX", 100)
@@ -31,13 +33,197 @@ def paginate_queryset(qs, request):
     except (ValueError, TypeError):
         page_size = default_size
 
-    total = qs.count()
+    return page, page_size
+
+
+def count_mode(request, default: str = "exact") -> str:
+    """``?count=exact|estimated|none`` (unknown values fall back to ``default``)."""
+    mode = request.query_params.get("count", default)
+    return mode if mode in COUNT_MODES else default
+
+
+def paginate_queryset(qs, request):
+    """
+    Slice *qs* according to ``?page`` and ``?page_size`` query params.
+
+    Limits are read from ``settings.PAGINATION`` so they can be tuned per
+    environment without touching view code:
+        PAGINATION = {"PAGE_SIZE_DEFAULT": 20, "PAGE_SIZE_MAX": 100}
+
+    Returns ``(page_queryset, meta_dict)`` where *meta_dict* has the shape:
+        { page, page_size, total, has_next }
+
+    Both params are clamped to safe ranges — invalid input never raises.
+
+    ``?count=estimated`` or ``?count=none`` skip the exact COUNT (``total``
+    is then an estimate or ``None``).  Sending ``?cursor=`` (empty for the
+    first page) switches to keyset pagination — see ``keyset_paginate``.
+    """
+    if "cursor" in request.query_params:
+        return keyset_paginate(qs, request)
+
+    page, page_size = page_params(request)
+    mode = count_mode(request)
     start = (page - 1) * page_size
     end = start + page_size
 
-    return qs[start:end], {
+    if mode == "exact":
+        total = qs.count()
+        return qs[start:end], {
+            "page": page,
+            "page_size": page_size,
+            "total": total,
+            "has_next": end < total,
+        }
+
+    # Fetch one extra row instead of counting to learn whether a next page exists.
+    rows = list(qs[start:end + 1])
+    return rows[:page_size], {
         "page": page,
         "page_size": page_size,
-        "total": total,
-        "has_next": end < total,
+        "total": estimate_count(qs) if mode == "estimated" else None,
+        "has_next": len(rows) > page_size,
+    }
+
+
+# ── Counting ───────────────────────────────────────────────────────────
+
+def estimate_count(qs) -> int:
+    """
+    Cheap row-count estimate for *qs*.
+
+    An unfiltered PostgreSQL table uses the planner statistic
+    ``pg_class.reltuples``; anything else is counted exactly once and
+    cached for ``PAGINATION["COUNT_CACHE_TTL"]`` seconds, keyed by the
+    query's SQL.
+    """
+    connection = connections[qs.db]
+    if connection.vendor == "postgresql" and not qs.query.where:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [qs.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        # reltuples is -1 until the table has been vacuumed/analyzed once.
+        if row and row[0] >= 0:
+            return int(row[0])
+
+    from utilities.cache_compute import get_or_compute
+    from utilities.cache_keys import query_count
+
+    sql, params = qs.order_by().query.sql_with_params()
+    digest = hashlib.sha256(f"{qs.db}:{sql}:{params!r}".encode()).hexdigest()[:24]
+    ttl = getattr(settings, "PAGINATION", {}).get("COUNT_CACHE_TTL", 300)
+    # An estimate may be a little stale anyway: serve the old count while one request recounts.
+    return get_or_compute(query_count(digest), qs.count, ttl, stale_ttl=ttl)
+
+
+def _count(qs, mode: str):
+    if mode == "exact":
+        return qs.count()
+    if mode == "estimated":
+        return estimate_count(qs)
+    return None
+
+
+# ── Keyset (cursor) pagination ─────────────────────────────────────────
+
+def _keyset_ordering(qs) -> list[tuple[str, object, bool]]:
+    """``[(name, field, descending), ...]`` for *qs*'s ordering plus a pk tiebreak."""
+    opts = qs.model._meta
+    ordering = list(qs.query.order_by) or list(opts.ordering)
+    keys, seen_pk = [], False
+    for item in ordering:
+        if not isinstance(item, str) or "__" in item or item.lstrip("-") == "?":
+            raise ValueError(f"Keyset pagination needs plain field orderings, got {item!r}")
+        name = item.lstrip("-")
+        field = opts.pk if name == "pk" else opts.get_field(name)
+        seen_pk = seen_pk or field.primary_key
+        keys.append((field.attname, field, item.startswith("-")))
+    if not seen_pk:
+        # Follow the last key's direction so a (col DESC, id DESC) index still applies.
+        keys.append((opts.pk.attname, opts.pk, keys[-1][2] if keys else False))
+    return keys
+
+
+def _encode_value(value):
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()  # full precision; DjangoJSONEncoder drops microseconds
+    if isinstance(value, (Decimal, UUID)):
+        return str(value)
+    return value
+
+
+def _encode_cursor(obj, keys, direction: str) -> str:
+    payload = {"d": direction, "v": [_encode_value(getattr(obj, name)) for name, _, _ in keys]}
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(token: str, keys) -> tuple[str, list]:
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        payload = json.loads(raw)
+        direction, values = payload["d"], payload["v"]
+        if direction not in ("n", "p") or len(values) != len(keys):
+            raise ValueError(direction)
+        return direction, [field.to_python(v) for v, (_, field, _) in zip(values, keys)]
+    except (binascii.Error, ValueError, KeyError, TypeError) as exc:
+        raise ValidationError({"cursor": "Invalid cursor."}) from exc
+
+
+def _after(keys, values, forward: bool) -> Q:
+    """Rows strictly after *values* in the ordering (or before when not *forward*)."""
+    condition = Q()
+    for i, (name, _, descending) in enumerate(keys):
+        op = "lt" if descending == forward else "gt"
+        clause = Q(**{f"{name}__{op}": values[i]})
+        for (prev_name, _, _), prev_value in zip(keys[:i], values[:i]):
+            clause &= Q(**{prev_name: prev_value})
+        condition = clause if not condition else condition | clause
+    return condition
+
+
+def keyset_paginate(qs, request):
+    """
+    Cursor pagination over *qs*'s existing ordering (``-created_at``,
+    ``order, -created_at``, ``-updated_at`` …; the primary key is appended
+    as a tiebreak).  Each page is one indexed range query with no OFFSET,
+    so page 1000 costs the same as page 1.
+
+    Returns ``(rows, meta)`` with meta ``{page_size, total, has_next,
+    has_prev, next, prev}`` where ``next``/``prev`` are opaque cursors to
+    pass back as ``?cursor=``.  ``total`` follows ``?count=`` and defaults
+    to ``none`` here — counting would defeat the point of the cursor.
+    Ordering fields must be non-null.
+    """
+    _, page_size = page_params(request)
+    keys = _keyset_ordering(qs)
+    token = request.query_params.get("cursor") or ""
+
+    direction, values = ("n", None)
+    if token:
+        direction, values = _decode_cursor(token, keys)
+    forward = direction == "n"
+
+    page_qs = qs
+    if values is not None:
+        page_qs = page_qs.filter(_after(keys, values, forward))
+    order = [f"{'-' if descending == forward else ''}{name}" for name, _, descending in keys]
+    rows = list(page_qs.order_by(*order)[:page_size + 1])
+    more = len(rows) > page_size
+    rows = rows[:page_size]
+    if not forward:
+        rows.reverse()
+
+    has_next = more if forward else True
+    has_prev = (values is not None) if forward else more
+    return rows, {
+        "page_size": page_size,
+        "total": _count(qs, count_mode(request, default="none")),
+        "has_next": bool(rows) and has_next,
+        "has_prev": bool(rows) and has_prev,
+        "next": _encode_cursor(rows[-1], keys, "n") if rows and has_next else None,
+        "prev": _encode_cursor(rows[0], keys, "p") if rows and has_prev else None,
     }
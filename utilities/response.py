@@ -1,12 +1,34 @@
 # ahara/common/responses.py
 from __future__ import annotations
 
+import json
+import re
+import uuid
 from http import HTTPStatus
 
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
 from django.utils.timezone import now
 from rest_framework import status as drf_status
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
-from rest_framework.views import exception_handler
+from rest_framework.utils import encoders
+
+try:
+    import ujson
+except ImportError:  # stdlib json is used instead
+    ujson = None
+
+_STATUS_TEXT = {s.value: s.phrase for s in HTTPStatus}
+
+# Clients sending ``X-Envelope: compact`` get the envelope without the
+# ``endpoint`` echo of their own request.
+ENVELOPE_HEADER = "X-Envelope"
+_ENVELOPE_META = "HTTP_X_ENVELOPE"
+
+
+def _compact(request) -> bool:
+    return getattr(request, "META", {}).get(_ENVELOPE_META, "").strip().lower() == "compact"
 
 
 def _build_payload(
@@ -18,27 +40,107 @@ def _build_payload(
     errors=None,
     meta=None,
 ):
-    resolver = getattr(request, "resolver_match", None)
-    view_name = getattr(resolver, "view_name", None)
-    return {
-        "endpoint": {
+    payload = {}
+    if not _compact(request):
+        resolver = getattr(request, "resolver_match", None)
+        payload["endpoint"] = {
             "path": getattr(request, "path", None),
             "method": getattr(request, "method", None),
-            "view": view_name,
+            "view": getattr(resolver, "view_name", None),
             "query": getattr(request, "META", {}).get("QUERY_STRING", ""),
-        },
-        "status": {
-            "code": int(status_code),
-            "text": HTTPStatus(status_code).phrase
-            if status_code in HTTPStatus._value2member_map_
-            else "",
-            "message": message or "",
-        },
-        "data": data,
-        "errors": errors,
-        "meta": meta,
-        "timestamp": now().isoformat(),
+        }
+    payload["status"] = {
+        "code": int(status_code),
+        "text": _STATUS_TEXT.get(int(status_code), ""),
+        "message": message or "",
     }
+    payload["data"] = data
+    payload["errors"] = errors
+    payload["meta"] = meta
+    payload["timestamp"] = now().isoformat()
+    return payload
+
+
+# ── Rendering ──────────────────────────────────────────────────────────
+
+class RawJSON:
+    """
+    JSON that is already encoded (a cached fragment or blob).  Place it
+    anywhere inside ``data`` and the renderer splices the bytes in
+    verbatim instead of decoding and re-encoding them.
+    """
+
+    __slots__ = ("data",)
+
+    def __init__(self, data: bytes | str):
+        # Cached fragments are stored as text: the Redis JSON serializer cannot hold bytes.
+        self.data = data.encode() if isinstance(data, str) else data
+
+    def __repr__(self):
+        return f"RawJSON({self.data[:40]!r}...)"
+
+    def decode(self):
+        return json.loads(self.data)
+
+
+_drf_default = encoders.JSONEncoder().default
+
+# Unguessable per-process placeholder, so request-controlled envelope fields
+# (path, query string) can never collide with it.
+_RAW_DATA_TOKEN = f"__raw_data_{uuid.uuid4().hex}__"
+_RAW_TOKEN_RE = re.compile(f'"{_RAW_DATA_TOKEN}(\\d+)"'.encode())
+
+
+def encode_json(value) -> bytes:
+    """
+    Compact UTF-8 JSON, byte-compatible with DRF's ``JSONRenderer``:
+    ``ujson`` when installed, stdlib ``json`` otherwise (or when ujson
+    rejects a value, e.g. NaN or an out-of-range int).
+
+    ``RawJSON`` values are unknown to both encoders, so they reach the
+    ``default`` hook, which swaps in a numbered placeholder; the
+    placeholders are then replaced by the fragments in one regex pass.
+    Nothing walks the payload beforehand.
+    """
+    fragments: list[bytes] = []
+
+    def default(obj):
+        if isinstance(obj, RawJSON):
+            fragments.append(obj.data)
+            return f"{_RAW_DATA_TOKEN}{len(fragments) - 1}"
+        return _drf_default(obj)
+
+    text = None
+    if ujson is not None:
+        try:
+            text = ujson.dumps(value, ensure_ascii=False, escape_forward_slashes=False,
+                               allow_nan=False, default=default)
+        except (OverflowError, TypeError, ValueError):
+            fragments.clear()
+    if text is None:
+        text = json.dumps(value, default=default, ensure_ascii=False,
+                          separators=(",", ":"), allow_nan=False)
+    # Same JS-safety escapes as JSONRenderer.
+    body = text.replace("\u2028", "\\u2028").replace("\u2029", "\\u2029").encode()
+    if fragments:
+        body = _RAW_TOKEN_RE.sub(lambda m: fragments[int(m.group(1))], body)
+    return body
+
+
+class ApiJSONRenderer(JSONRenderer):
+    """
+    ``JSONRenderer`` for the envelope: ujson-backed and ``RawJSON``-aware.
+    Indented output (``Accept: application/json; indent=2``) is kept for
+    debugging and goes through the stock renderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        body = encode_json(data)
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(json.loads(body), accepted_media_type, renderer_context)
+        return body
 
 
 class ApiResponse(Response):
@@ -73,6 +175,7 @@ class ApiResponse(Response):
             headers=headers,
             content_type=content_type,
         )
+        patch_vary_headers(self, (ENVELOPE_HEADER,))
 
 
 def api_response(
@@ -97,12 +200,40 @@ def api_response(
     )
 
 
+def encoded_api_response(
+    request,
+    *,
+    data_bytes: bytes | str,
+    status_code=drf_status.HTTP_200_OK,
+    message: str | None = None,
+    meta=None,
+    headers=None,
+):
+    """
+    Same envelope as ``api_response``, but ``data_bytes`` is JSON that was
+    encoded ahead of time (e.g. stored in cache) and is spliced in
+    verbatim — only the small per-request envelope is rendered.
+    """
+    payload = _build_payload(
+        request, data=RawJSON(data_bytes), status_code=status_code, message=message, meta=meta,
+    )
+    response = HttpResponse(encode_json(payload), status=status_code, content_type="application/json")
+    for name, value in (headers or {}).items():
+        response[name] = value
+    patch_vary_headers(response, (ENVELOPE_HEADER,))
+    return response
+
+
 # Optional: unify error responses into the same template
 def unified_exception_handler(exc, context):
     """
     Plug this into REST_FRAMEWORK['EXCEPTION_HANDLER'] to ensure errors
     also follow the same envelope.
     """
+    # Imported here: rest_framework.views reads DEFAULT_RENDERER_CLASSES,
+    # which points back at this module.
+    from rest_framework.views import exception_handler
+
     drf_resp = exception_handler(exc, context)
     request = context.get("request")
 